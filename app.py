@@ -2,45 +2,146 @@ from flask import Flask
 from flask_cors import CORS
 from config import Config
 from database import db
+from utils.schema import sync_schema
+from utils.sql_instrumentation import init_sql_instrumentation
+from utils.metrics import configure_pool_metrics, init_metrics
+from utils.db_routing import PRIMARY_HEADER, configure_database, init_replica_routing
+from utils.compression import init_compression
+from services.maintenance_forecast import refresh_maintenance_forecasts
+from services.maintenance_rollups import rebuild_maintenance_rollups
+from services.notification_retention import run_notification_retention
+from services.background_jobs import start_periodic_job
+from services.soft_delete import run_soft_delete_purge
+from services.truck_search import rebuild_search_index
 from routes.auth_routes import auth_bp
 from routes.truck_routes import truck_bp
 from routes.maintenance_routes import maintenance_bp
 from routes.notification_routes import notification_bp
 from routes.user_routes import user_bp
+from routes.dashboard_routes import dashboard_bp
+from routes.forecast_routes import forecast_bp
+from routes.report_routes import report_bp
+from routes.assignment_routes import assignment_bp
 
-app = Flask(__name__)
-app.config.from_object(Config)
-
-# 🔴 CORS CONFIGURADO EXPLICITAMENTE
-CORS(
-    app,
-    resources={r"/*": {"origins": [
-        "http://localhost:8080",
-        "http://127.0.0.1:8080",
-        "http://192.168.0.105:8080",   # IP da rede local (Vite Network)
-        "http://26.240.168.24:8080",
-        "http://172.20.10.3:8080", # IP do meu celular
-        "http://192.168.15.68:8080",
-        "http://10.1.170.153:8080/",
-        "http://192.168.0.102:8080"  # IP virtual (se você usar esse)
-    ]}},
-    supports_credentials=True,
-    methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization"],
-)
-
-db.init_app(app)
-
-app.register_blueprint(auth_bp, url_prefix="/auth")
-app.register_blueprint(truck_bp, url_prefix="/trucks")
-app.register_blueprint(maintenance_bp, url_prefix="/maintenances")
-app.register_blueprint(notification_bp, url_prefix="/notifications")
-app.register_blueprint(user_bp, url_prefix="/users")
-
-
-@app.route("/")
-def index():
-    return {"message": "API Gestão de Frota rodando"}
+
+def start_background_jobs(app):
+    """Sobe os jobs periódicos deste processo (com gunicorn: depois do fork, ver gunicorn.conf.py)."""
+    if app.config["NOTIFICATION_RETENTION_ENABLED"]:
+        start_periodic_job(
+            app,
+            "notification-retention",
+            app.config["NOTIFICATION_RETENTION_INTERVAL"],
+            run_notification_retention,
+        )
+    if app.config["SOFT_DELETE_PURGE_ENABLED"]:
+        start_periodic_job(
+            app,
+            "soft-delete-purge",
+            app.config["SOFT_DELETE_PURGE_INTERVAL"],
+            run_soft_delete_purge,
+        )
+
+
+def register_commands(app):
+    """Comandos `flask <comando>` de manutenção (para rodar via cron/deploy)."""
+    @app.cli.command("sync-schema")
+    def sync_schema_command():
+        """Cria tabelas e índices novos declarados em models.py."""
+        created = sync_schema()
+        for item in created:
+            print(f"Criado: {item}")
+        if not created:
+            print("Schema já está atualizado.")
+
+    @app.cli.command("forecast-maintenance")
+    def forecast_maintenance_command():
+        """Recalcula as previsões de manutenção por quilometragem (para rodar via cron)."""
+        total = refresh_maintenance_forecasts(app.config["FORECAST_KM_INTERVAL"])
+        print(f"Previsões recalculadas para {total} caminhões.")
+
+    @app.cli.command("rebuild-rollups")
+    def rebuild_rollups_command():
+        """Recalcula do zero os rollups de manutenção usados pelos relatórios."""
+        trucks, mechanics = rebuild_maintenance_rollups()
+        print(f"Rollups recalculados: {trucks} linhas por caminhão, {mechanics} por mecânico.")
+
+    @app.cli.command("archive-notifications")
+    def archive_notifications_command():
+        """Arquiva notificações lidas e antigas (uma rodada, para cron)."""
+        moved = run_notification_retention(app)
+        print(f"{moved} notificações arquivadas.")
+
+    @app.cli.command("purge-deleted")
+    def purge_deleted_command():
+        """Apaga de vez caminhões e usuários excluídos e seus dependentes (uma rodada, para cron)."""
+        purged = run_soft_delete_purge(app)
+        print(f"{purged} linhas apagadas.")
+
+    @app.cli.command("reindex-search")
+    def reindex_search_command():
+        """Preenche placa_normalizada e recria o índice de termos da busca de caminhões."""
+        total = rebuild_search_index()
+        print(f"Índice de busca recriado para {total} caminhões.")
+
+
+def create_app(config_object=Config):
+    """
+    Monta o app. Compatível com `gunicorn --preload`: nada aqui abre conexão
+    nem thread que não sobreviva ao fork (jobs e pool ficam para o worker).
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+
+    # 🔴 CORS CONFIGURADO EXPLICITAMENTE
+    CORS(
+        app,
+        resources={r"/*": {"origins": [
+            "http://localhost:8080",
+            "http://127.0.0.1:8080",
+            "http://192.168.0.105:8080",   # IP da rede local (Vite Network)
+            "http://26.240.168.24:8080",
+            "http://172.20.10.3:8080", # IP do meu celular
+            "http://192.168.15.68:8080",
+            "http://10.1.170.153:8080/",
+            "http://192.168.0.102:8080"  # IP virtual (se você usar esse)
+        ]}},
+        supports_credentials=True,
+        methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+        allow_headers=["Content-Type", "Authorization", PRIMARY_HEADER],
+        # Read-your-writes sem usuário identificado: o cliente reenvia este header (utils/db_routing.py)
+        expose_headers=[PRIMARY_HEADER],
+    )
+
+    configure_database(app)
+    configure_pool_metrics(app)
+    db.init_app(app)
+    init_replica_routing(app)
+    init_sql_instrumentation(app)
+    init_metrics(app)
+    init_compression(app)
+
+    app.register_blueprint(auth_bp, url_prefix="/auth")
+    app.register_blueprint(truck_bp, url_prefix="/trucks")
+    app.register_blueprint(maintenance_bp, url_prefix="/maintenances")
+    app.register_blueprint(notification_bp, url_prefix="/notifications")
+    app.register_blueprint(user_bp, url_prefix="/users")
+    app.register_blueprint(dashboard_bp, url_prefix="/dashboard")
+    app.register_blueprint(forecast_bp, url_prefix="/forecasts")
+    app.register_blueprint(report_bp, url_prefix="/reports")
+    app.register_blueprint(assignment_bp, url_prefix="/assignments")
+
+    register_commands(app)
+
+    @app.route("/")
+    def index():
+        return {"message": "API Gestão de Frota rodando"}
+
+    if app.config["START_BACKGROUND_JOBS"]:
+        start_background_jobs(app)
+    return app
+
+
+app = create_app()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,364 @@
+"""
+Gerador de dados sintéticos da frota para testes de escala.
+
+Insere em lote (executemany / INSERT multi-linha, sem ORM `add()`):
+usuários, condutores, caminhões, vínculos motorista-caminhão com rotatividade,
+anos de histórico de manutenções e notificações. Tudo determinístico a partir
+de --seed.
+
+Uso (a partir da raiz do backend):
+
+    python -m bench.fleet_generator --database-url sqlite:////tmp/frota.db \\
+        --trucks 5000 --drivers 4000 --years 3 --notifications 1000000
+
+Sem --database-url usa DATABASE_URL / config.py. As tabelas que faltarem são
+criadas. Para rodar duas vezes no mesmo banco, troque --tag (evita colisão de
+e-mail, placa e CNH).
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+DEFAULT_PASSWORD = "frota123"
+
+
+def parse_weights(value):
+    """'liberado=85,pendente=10,bloqueado=5' -> ({'liberado': 85, ...})"""
+    weights = {}
+    for part in value.split(","):
+        key, _, weight = part.partition("=")
+        weights[key.strip()] = float(weight)
+    return weights
+
+
+def parse_range(value):
+    """'-15:120' -> (-15, 120)"""
+    low, _, high = value.partition(":")
+    return int(low), int(high)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Gera uma frota sintética em lote")
+    parser.add_argument("--database-url", help="URL do banco (padrão: DATABASE_URL)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tag", default="s", help="sufixo para e-mails/placas/CNHs (runs repetidas)")
+    parser.add_argument("--trucks", type=int, default=1000)
+    parser.add_argument("--admins", type=int, default=5)
+    parser.add_argument("--mechanics", type=int, default=20)
+    parser.add_argument("--managers", type=int, default=5)
+    parser.add_argument("--drivers", type=int, default=800)
+    parser.add_argument("--years", type=float, default=3, help="anos de histórico")
+    parser.add_argument("--maintenances-per-year", type=float, default=6, help="por caminhão")
+    parser.add_argument("--corrective-ratio", type=float, default=0.3)
+    parser.add_argument("--notifications", type=int, default=100_000, help="total de notificações")
+    parser.add_argument("--read-ratio", type=float, default=0.8)
+    parser.add_argument("--status-weights", type=parse_weights, default=parse_weights("liberado=85,pendente=10,bloqueado=5"))
+    parser.add_argument("--due-days", type=parse_range, default=parse_range("-15:120"),
+                        help="intervalo (dias a partir de hoje) da próxima manutenção")
+    parser.add_argument("--assignment-churn", type=float, default=2.0,
+                        help="média de trocas de caminhão por motorista no período")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--skip-derived", action="store_true",
+                        help="não recalcula rollups / índice de busca depois da carga")
+    return parser
+
+
+def _insert_batched(connection, table, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        connection.execute(table.insert(), rows[start:start + batch_size])
+
+
+def _insert_rows(connection, table, columns, rows, batch_size):
+    """
+    INSERT em lote direto no driver (tuplas, sem processamento de parâmetros do
+    SQLAlchemy). O PyMySQL reescreve o executemany em INSERT multi-linha.
+    """
+    placeholder = "?" if connection.dialect.paramstyle == "qmark" else "%s"
+    preparer = connection.dialect.identifier_preparer
+    sql = (
+        f"INSERT INTO {preparer.format_table(table)} "
+        f"({', '.join(preparer.quote(c) for c in columns)}) "
+        f"VALUES ({', '.join([placeholder] * len(columns))})"
+    )
+    for start in range(0, len(rows), batch_size):
+        connection.exec_driver_sql(sql, rows[start:start + batch_size])
+
+
+def _new_ids(connection, table, pk, after_id):
+    from sqlalchemy import select
+
+    return connection.execute(
+        select(table.c[pk]).where(table.c[pk] > after_id).order_by(table.c[pk])
+    ).scalars().all()
+
+
+def _max_id(connection, table, pk):
+    from sqlalchemy import func, select
+
+    return connection.execute(select(func.coalesce(func.max(table.c[pk]), 0))).scalar()
+
+
+def generate_fleet(db, options, log=print):
+    """
+    Gera a frota no banco do `db` (precisa de app context).
+    Retorna um resumo com os ids criados e as contagens por tabela.
+    """
+    from werkzeug.security import generate_password_hash
+    from models import Usuario, Condutor, Caminhao, CaminhaoCondutor, Manutencao, Notificacao
+
+    rng = random.Random(options.seed)
+    tag = options.tag
+    today = date.today()
+    history_days = max(1, int(options.years * 365))
+    history_start = today - timedelta(days=history_days)
+    batch = options.batch_size
+    timings = {}
+
+    users_t = Usuario.__table__
+    drivers_t = Condutor.__table__
+    trucks_t = Caminhao.__table__
+    links_t = CaminhaoCondutor.__table__
+    maint_t = Manutencao.__table__
+    notif_t = Notificacao.__table__
+
+    connection = db.session.connection()
+
+    # --- Usuários -------------------------------------------------------
+    started = time.perf_counter()
+    password_hash = generate_password_hash(options.password)
+    profiles = (
+        [("administrador", options.admins), ("mecanico", options.mechanics),
+         ("gestor", options.managers), ("motorista", options.drivers)]
+    )
+    users = []
+    for perfil, amount in profiles:
+        for i in range(amount):
+            users.append({
+                "nome": f"{perfil.capitalize()} {i} {tag}",
+                "email": f"{perfil}{i}.{tag}@frota.test",
+                "senha": password_hash,
+                "perfil": perfil,
+                "status": True,
+            })
+    last_user = _max_id(connection, users_t, "id_usuario")
+    _insert_batched(connection, users_t, users, batch)
+    user_ids = _new_ids(connection, users_t, "id_usuario", last_user)
+    staff_count = options.admins + options.mechanics + options.managers
+    staff_ids, driver_user_ids = user_ids[:staff_count], user_ids[staff_count:]
+    timings["usuarios"] = time.perf_counter() - started
+
+    # --- Caminhões ------------------------------------------------------
+    started = time.perf_counter()
+    statuses = list(options.status_weights)
+    status_weights = [options.status_weights[s] for s in statuses]
+    due_low, due_high = options.due_days
+    models = ["Volvo FH 540", "Scania R450", "Mercedes Actros 2651", "DAF XF 480",
+              "Iveco S-Way", "Volvo VM 270", "Scania P320", "Mercedes Atego 2430"]
+
+    truck_profiles = []  # (km inicial, km/dia) para manter o histórico coerente
+    trucks = []
+    for i in range(options.trucks):
+        km_per_day = rng.uniform(80, 600)
+        start_km = rng.randint(0, 300_000)
+        truck_profiles.append((start_km, km_per_day))
+        plate = f"{tag[:2].upper()}{i:07d}"[:10]
+        trucks.append({
+            "placa": plate,
+            "placa_normalizada": plate,
+            "modelo": rng.choice(models),
+            "quilometragem_atual": int(start_km + km_per_day * history_days),
+            "status": rng.choices(statuses, status_weights)[0],
+            "data_ultima_manutencao": today - timedelta(days=rng.randint(1, 180)),
+            "data_proxima_manutencao": today + timedelta(days=rng.randint(due_low, due_high)),
+        })
+    last_truck = _max_id(connection, trucks_t, "id_caminhao")
+    _insert_batched(connection, trucks_t, trucks, batch)
+    truck_ids = _new_ids(connection, trucks_t, "id_caminhao", last_truck)
+    timings["caminhoes"] = time.perf_counter() - started
+
+    # --- Condutores e vínculos com rotatividade ---------------------------
+    started = time.perf_counter()
+    driver_plans = []
+    drivers = []
+    for i, user_id in enumerate(driver_user_ids):
+        changes = min(50, int(rng.expovariate(1 / options.assignment_churn))) if options.assignment_churn > 0 else 0
+        # Datas de troca ordenadas dentro do período; último vínculo fica em aberto
+        cut_days = sorted(rng.sample(range(1, history_days), min(changes, history_days - 1)))
+        periods = []
+        begin = history_start + timedelta(days=rng.randint(0, max(0, history_days // 4)))
+        for cut in cut_days:
+            end = history_start + timedelta(days=cut)
+            if end <= begin:
+                continue
+            periods.append((begin, end))
+            begin = end + timedelta(days=1)
+        periods.append((begin, None))
+        plan = [(rng.choice(truck_ids), start, end) for start, end in periods] if truck_ids else []
+        driver_plans.append(plan)
+        drivers.append({
+            "nome": f"Motorista {i} {tag}",
+            "cnh": f"{tag[:4]}{i:010d}"[:20],
+            "telefone": f"119{rng.randint(10_000_000, 99_999_999)}",
+            "email": f"motorista{i}.{tag}@frota.test",
+            "id_usuario": user_id,
+            "id_caminhao": plan[-1][0] if plan else None,
+        })
+    last_driver = _max_id(connection, drivers_t, "id_condutor")
+    _insert_batched(connection, drivers_t, drivers, batch)
+    driver_ids = _new_ids(connection, drivers_t, "id_condutor", last_driver)
+
+    links = []
+    for driver_id, plan in zip(driver_ids, driver_plans):
+        for truck_id, start, end in plan:
+            links.append({
+                "id_caminhao": truck_id,
+                "id_condutor": driver_id,
+                "data_inicio": start,
+                "data_fim": end,
+                "ativo": end is None,
+            })
+    _insert_batched(connection, links_t, links, batch)
+    timings["condutores/vinculos"] = time.perf_counter() - started
+
+    # --- Manutenções ----------------------------------------------------
+    started = time.perf_counter()
+    # SQLite não tem tipo data nativo: grava no mesmo formato texto do SQLAlchemy
+    as_sql_date = (lambda d: d.isoformat()) if connection.dialect.name == "sqlite" else (lambda d: d)
+
+    maintenances = []
+    per_truck = max(0, int(options.maintenances_per_year * options.years))
+    mechanics = [f"Mecânico {i}" for i in range(max(1, options.mechanics))]
+    for truck_id, (start_km, km_per_day) in zip(truck_ids, truck_profiles):
+        for offset in sorted(rng.randint(0, history_days) for _ in range(per_truck)):
+            maintenances.append((
+                truck_id,
+                as_sql_date(history_start + timedelta(days=offset)),
+                "corretiva" if rng.random() < options.corrective_ratio else "preventiva",
+                int(start_km + km_per_day * offset),
+                "Manutenção gerada para teste de escala",
+                rng.choice(mechanics),
+            ))
+    _insert_rows(
+        connection,
+        maint_t,
+        ("id_caminhao", "data_manutencao", "tipo", "quilometragem", "descricao", "nome_mecanico"),
+        maintenances,
+        batch,
+    )
+    timings["manutencoes"] = time.perf_counter() - started
+
+    # --- Notificações ---------------------------------------------------
+    # Volume alto: gerado vetorizado com NumPy (mesma semente => mesmos dados)
+    started = time.perf_counter()
+    np_rng = np.random.default_rng(options.seed)
+    history_start_np = np.datetime64(history_start.isoformat(), "s")
+    history_seconds = history_days * 86400
+    recipients = np.array(user_ids or [None], dtype=object)
+    kinds = [
+        ("manutencao", "Caminhão bloqueado - {p}", "O caminhão {p} foi bloqueado por manutenção vencida."),
+        ("alerta", "Manutenção próxima - Caminhão {p}", "A manutenção do caminhão {p} vence em breve."),
+        ("info", "Dia de manutenção - Caminhão {p}", "Hoje é o dia da manutenção do caminhão {p}."),
+    ]
+    plates = [truck["placa"] for truck in trucks]
+    kind_types = np.array([k[0] for k in kinds], dtype=object)
+    # Tabelas (tipo x caminhão) de título/mensagem já formatados
+    titles = np.array([[title.format(p=p) for p in plates] for _, title, _ in kinds], dtype=object)
+    messages = np.array([[message.format(p=p) for p in plates] for _, _, message in kinds], dtype=object)
+    truck_ids_np = np.array(truck_ids, dtype=object)
+
+    remaining = options.notifications
+    total_notifications = 0
+    # Cada lote ocupa uma fatia do período, com datas crescentes: assim o id
+    # autoincremento acompanha data_envio, como em produção
+    slice_seconds = max(1, history_seconds * batch // max(1, options.notifications))
+    slice_start = 0
+    while remaining > 0 and truck_ids:
+        size = min(batch, remaining)
+        truck_idx = np_rng.integers(0, len(truck_ids), size)
+        kind_idx = np_rng.integers(0, len(kinds), size)
+        slice_end = min(history_seconds, slice_start + slice_seconds)
+        seconds = np.sort(np_rng.integers(slice_start, max(slice_start + 1, slice_end), size))
+        slice_start = min(history_seconds - 1, slice_end)
+        sent_at = np.char.replace(
+            (history_start_np + seconds.astype("timedelta64[s]")).astype(str), "T", " "
+        )
+        chunk = list(zip(
+            np_rng.choice(recipients, size).tolist(),
+            truck_ids_np[truck_idx].tolist(),
+            titles[kind_idx, truck_idx].tolist(),
+            messages[kind_idx, truck_idx].tolist(),
+            kind_types[kind_idx].tolist(),
+            sent_at.tolist(),
+            (np_rng.random(size) < options.read_ratio).tolist(),
+        ))
+        _insert_rows(
+            connection,
+            notif_t,
+            ("id_usuario", "id_caminhao", "titulo", "mensagem", "tipo", "data_envio", "visualizado"),
+            chunk,
+            batch,
+        )
+        remaining -= size
+        total_notifications += size
+    timings["notificacoes"] = time.perf_counter() - started
+
+    db.session.commit()
+
+    if not options.skip_derived:
+        from services.maintenance_rollups import rebuild_maintenance_rollups
+        from services.truck_search import rebuild_search_index
+
+        started = time.perf_counter()
+        rebuild_maintenance_rollups()
+        rebuild_search_index()
+        timings["rollups/busca"] = time.perf_counter() - started
+
+    for step, seconds in timings.items():
+        log(f"  {step:<22}{seconds:8.2f}s")
+
+    return {
+        "staff_user_ids": staff_ids,
+        "driver_user_ids": driver_user_ids,
+        "truck_ids": truck_ids,
+        "counts": {
+            "usuarios": len(user_ids),
+            "caminhoes": len(truck_ids),
+            "condutores": len(driver_ids),
+            "vinculos": len(links),
+            "manutencoes": len(maintenances),
+            "notificacoes": total_notifications,
+        },
+    }
+
+
+def main(argv=None):
+    options = build_parser().parse_args(argv)
+    if options.database_url:
+        os.environ["DATABASE_URL"] = options.database_url
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app import app  # noqa: E402
+    from database import db  # noqa: E402
+    from utils.schema import sync_schema  # noqa: E402
+
+    with app.app_context():
+        sync_schema()
+        started = time.perf_counter()
+        summary = generate_fleet(db, options)
+        elapsed = time.perf_counter() - started
+
+    for table, count in summary["counts"].items():
+        print(f"{table:<14}{count:>12,}")
+    print(f"Total: {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Benchmark do caminho de leitura projetado (services/read_models.py).
+
+Para cada listagem compara, sobre as mesmas N linhas, o caminho antigo
+(`Model.query...all()` + `to_dict()`) com o projetado (só colunas + dicts
+direto das tuplas). Mede tempo de CPU (melhor de --repeat) e pico de memória
+(tracemalloc), e confere que os dois produzem o mesmo JSON.
+
+Uso (a partir da raiz do backend):
+
+    python -m bench.read_models --rows 10000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ORM + to_dict x leitura projetada")
+    parser.add_argument("--database-url", help="URL do banco (padrão: SQLite temporário populado)")
+    parser.add_argument("--rows", type=int, default=10_000, help="linhas por listagem")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+
+def boot(args):
+    database_url = args.database_url
+    seed = not database_url
+    if seed:
+        tmp_dir = tempfile.mkdtemp(prefix="frota-read-")
+        database_url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["START_BACKGROUND_JOBS"] = "false"
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app import app  # noqa: E402
+    from database import db  # noqa: E402
+
+    if seed:
+        from bench.fleet_generator import build_parser, generate_fleet
+
+        options = build_parser().parse_args([
+            "--seed", str(args.seed),
+            "--trucks", str(args.rows),
+            "--drivers", str(args.rows // 2),
+            "--admins", str(args.rows // 4), "--mechanics", str(args.rows // 4),
+            "--years", "1", "--maintenances-per-year", "1.2",
+            "--notifications", str(args.rows),
+            "--skip-derived",
+        ])
+        print(f"Populando banco ({args.rows} linhas por tabela)...")
+        with app.app_context():
+            db.create_all()
+            generate_fleet(db, options, log=lambda *_: None)
+    return app, db
+
+
+def build_cases(db, rows):
+    from models import Caminhao, Manutencao, Notificacao, Usuario
+    from services.read_models import MAINTENANCES, NOTIFICATIONS, TRUCKS, USERS
+
+    def orm(query):
+        return lambda: [obj.to_dict() for obj in query.limit(rows).all()]
+
+    def projected(read_model, order_by):
+        stmt = read_model.select().order_by(order_by).limit(rows)
+        return lambda: read_model.to_dicts(db.session.execute(stmt))
+
+    return {
+        "trucks": (
+            orm(Caminhao.query.order_by(Caminhao.id_caminhao.desc())),
+            projected(TRUCKS, Caminhao.id_caminhao.desc()),
+        ),
+        "users": (
+            orm(Usuario.query.order_by(Usuario.id_usuario)),
+            projected(USERS, Usuario.id_usuario),
+        ),
+        "maintenances": (
+            orm(Manutencao.query.order_by(Manutencao.id_manutencao)),
+            projected(MAINTENANCES, Manutencao.id_manutencao),
+        ),
+        "notifications": (
+            orm(Notificacao.query.order_by(Notificacao.id_notificacao)),
+            projected(NOTIFICATIONS, Notificacao.id_notificacao),
+        ),
+    }
+
+
+def measure(db, func, repeat):
+    """Melhor tempo de CPU em `repeat` rodadas e pico de memória de uma rodada."""
+    best = None
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.process_time()
+        func()
+        elapsed = time.process_time() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    db.session.expunge_all()
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / 1024 / 1024, result
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app, db = boot(args)
+
+    with app.app_context():
+        print(f"\n{'listagem':<15}{'linhas':>8}{'ORM ms':>10}{'proj ms':>10}{'ORM MiB':>10}{'proj MiB':>10}  igual")
+        for name, (orm, projected) in build_cases(db, args.rows).items():
+            orm_ms, orm_mib, expected = measure(db, orm, args.repeat)
+            proj_ms, proj_mib, got = measure(db, projected, args.repeat)
+            print(f"{name:<15}{len(got):>8}{orm_ms:>10.1f}{proj_ms:>10.1f}"
+                  f"{orm_mib:>10.1f}{proj_mib:>10.1f}  {'sim' if got == expected else 'NÃO'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Microbenchmark do overhead Python por chamada das queries quentes.
+
+Compara, para a mesma consulta e o mesmo banco pequeno, a forma antiga
+(um `Model.query...` novo a cada chamada) com os statements montados uma vez
+em services/maintenance_alerts.py e routes/notification_routes.py. Mede:
+
+- build: só montar a consulta (sem executar);
+- call: montar + executar + carregar o resultado;
+- cache: resultado do cache de compilação do SQLAlchemy nas execuções.
+
+Uso (a partir da raiz do backend):
+
+    python -m bench.statement_cache --iterations 5000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmark dos statements em cache")
+    parser.add_argument("--iterations", type=int, default=3000)
+    return parser.parse_args(argv)
+
+
+def boot_app():
+    tmp_dir = tempfile.mkdtemp(prefix="frota-stmt-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    os.environ["START_BACKGROUND_JOBS"] = "false"
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from app import app  # noqa: E402
+
+    return app
+
+
+def seed(db):
+    from models import Caminhao, CaminhaoCondutor, Condutor, Notificacao, Usuario
+
+    today = date.today()
+    admin = Usuario(nome="Admin", email="admin@bench", senha="-", perfil="administrador")
+    driver = Usuario(nome="Motorista", email="driver@bench", senha="-", perfil="motorista")
+    truck = Caminhao(placa="BEN-0001", modelo="Bench", status="liberado", data_proxima_manutencao=today)
+    db.session.add_all([admin, driver, truck])
+    db.session.flush()
+    condutor = Condutor(nome="Motorista", cnh="0", id_usuario=driver.id_usuario, id_caminhao=truck.id_caminhao)
+    db.session.add(condutor)
+    db.session.flush()
+    db.session.add(CaminhaoCondutor(
+        id_caminhao=truck.id_caminhao, id_condutor=condutor.id_condutor, data_inicio=today - timedelta(days=10)
+    ))
+    for i in range(20):
+        db.session.add(Notificacao(
+            id_usuario=admin.id_usuario, id_caminhao=truck.id_caminhao,
+            titulo=f"Aviso {i}", mensagem="bench", tipo="alerta",
+        ))
+    db.session.commit()
+    return admin.id_usuario, truck.id_caminhao
+
+
+def build_cases(db, user_id, truck_id):
+    from sqlalchemy import or_
+
+    from models import CaminhaoCondutor, Condutor, Notificacao, Usuario
+    from routes.notification_routes import notification_list_statement
+    from services.read_models import NOTIFICATIONS
+    from services.maintenance_alerts import TRUCK_DRIVER_USERS, UNREAD_NOTIFICATION_EXISTS
+
+    cutoff = date.today() - timedelta(days=30)
+    user_notifications = notification_list_statement(tuple(NOTIFICATIONS.fields), "user")
+    dedup_params = {"user_id": user_id, "truck_id": truck_id, "tipo": "alerta", "titulo": "Aviso 7"}
+
+    def legacy_dedup():
+        return (
+            Notificacao.query.filter_by(
+                id_usuario=user_id, id_caminhao=truck_id, tipo="alerta", titulo="Aviso 7"
+            )
+            .filter(Notificacao.visualizado == False)  # noqa: E712
+        )
+
+    def legacy_drivers():
+        return (
+            CaminhaoCondutor.query.join(Condutor).join(Usuario)
+            .filter(
+                CaminhaoCondutor.id_caminhao == truck_id,
+                or_(
+                    CaminhaoCondutor.ativo == True,  # noqa: E712
+                    CaminhaoCondutor.data_fim.is_(None),
+                    CaminhaoCondutor.data_fim >= cutoff,
+                ),
+            )
+        )
+
+    def legacy_list():
+        return Notificacao.query.filter_by(id_usuario=user_id).order_by(Notificacao.data_envio.desc())
+
+    return {
+        "dedup lookup": {
+            "legacy_build": legacy_dedup,
+            "legacy_call": lambda: legacy_dedup().first(),
+            "cached_build": lambda: (UNREAD_NOTIFICATION_EXISTS, dict(dedup_params)),
+            "cached_call": lambda: db.session.scalar(UNREAD_NOTIFICATION_EXISTS, dedup_params),
+        },
+        "driver users": {
+            "legacy_build": legacy_drivers,
+            "legacy_call": lambda: [v.condutor.usuario for v in legacy_drivers().all()],
+            "cached_build": lambda: (TRUCK_DRIVER_USERS, {"truck_id": truck_id, "cutoff": cutoff}),
+            "cached_call": lambda: db.session.scalars(
+                TRUCK_DRIVER_USERS, {"truck_id": truck_id, "cutoff": cutoff}
+            ).all(),
+        },
+        "notification list": {
+            "legacy_build": legacy_list,
+            "legacy_call": lambda: legacy_list().all(),
+            "cached_build": lambda: notification_list_statement(tuple(NOTIFICATIONS.fields), "user"),
+            "cached_call": lambda: db.session.execute(user_notifications, {"user_id": user_id}).all(),
+        },
+    }
+
+
+def time_per_call(func, iterations):
+    for _ in range(min(100, iterations)):
+        func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app = boot_app()
+
+    from sqlalchemy import event
+
+    from database import db
+
+    cache_results = Counter()
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None and context.compiled is not None:
+            cache_results[context.cache_hit.name.lower()] += 1
+
+    with app.app_context():
+        db.create_all()
+        user_id, truck_id = seed(db)
+        event.listen(db.engine, "after_cursor_execute", on_execute)
+
+        print(f"{'consulta':<20}{'variante':<10}{'build µs':>10}{'call µs':>10}  cache")
+        for name, case in build_cases(db, user_id, truck_id).items():
+            results = {}
+            for variant in ("legacy", "cached"):
+                cache_results.clear()
+                build_us = time_per_call(case[f"{variant}_build"], args.iterations)
+                call_us = time_per_call(case[f"{variant}_call"], args.iterations)
+                results[variant] = call_us
+                hits = ", ".join(f"{k}={v}" for k, v in sorted(cache_results.items()))
+                print(f"{name:<20}{variant:<10}{build_us:>10.1f}{call_us:>10.1f}  {hits}")
+                db.session.expire_all()
+            saved = results["legacy"] - results["cached"]
+            print(f"{'':<20}{'economia':<10}{'':>10}{saved:>10.1f}  ({saved / results['legacy']:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
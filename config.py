@@ -3,6 +3,9 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Usados para dimensionar o pool por processo (mesmas variáveis do gunicorn.conf.py)
+_WORKER_THREADS = int(os.getenv("GUNICORN_THREADS", 1))
+
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv(
         "DATABASE_URL",
@@ -20,3 +23,88 @@ class Config:
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER", MAIL_USERNAME)
 
     FRONTEND_BASE_URL = os.getenv("FRONTEND_BASE_URL", "http://localhost:8080")
+
+    # Tempo (segundos) que o resumo do dashboard fica em cache
+    DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", 30))
+
+    # Intervalo padrão (km) entre preventivas usado na previsão por quilometragem
+    FORECAST_KM_INTERVAL = int(os.getenv("FORECAST_KM_INTERVAL", 10000))
+
+    # Retenção de notificações: lidas há mais de N dias vão para notificacoes_arquivo
+    NOTIFICATION_RETENTION_ENABLED = os.getenv("NOTIFICATION_RETENTION_ENABLED", "false").lower() in ("true", "1", "yes")
+    NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", 30))
+    NOTIFICATION_RETENTION_INTERVAL = int(os.getenv("NOTIFICATION_RETENTION_INTERVAL", 3600))
+    NOTIFICATION_ARCHIVE_BATCH_SIZE = int(os.getenv("NOTIFICATION_ARCHIVE_BATCH_SIZE", 500))
+    NOTIFICATION_ARCHIVE_MAX_BATCHES = int(os.getenv("NOTIFICATION_ARCHIVE_MAX_BATCHES", 200))
+    NOTIFICATION_ARCHIVE_PAUSE_SECONDS = float(os.getenv("NOTIFICATION_ARCHIVE_PAUSE_SECONDS", 0.2))
+
+    # Equipe (admins, gestores, mecânicos) recebe um resumo diário por usuário com
+    # os caminhões em alerta, em vez de uma notificação por caminhão. Motoristas
+    # continuam recebendo uma por caminhão.
+    NOTIFICATION_DIGEST_ENABLED = os.getenv("NOTIFICATION_DIGEST_ENABLED", "true").lower() in ("true", "1", "yes")
+
+    # Armazenamento das notificações:
+    # - "rows": uma linha em notificacoes por destinatário (padrão);
+    # - "events": cada alerta gravado uma vez em eventos_notificacao e resolvido
+    #   por perfil/caminhão na leitura, com o estado de leitura por usuário em
+    #   leituras_notificacao. O resumo diário acima vale só para "rows".
+    NOTIFICATION_STORAGE_MODE = os.getenv("NOTIFICATION_STORAGE_MODE", "rows").lower()
+    # Janela do feed no modo "events" (eventos mais antigos não aparecem)
+    NOTIFICATION_FEED_DAYS = int(os.getenv("NOTIFICATION_FEED_DAYS", 30))
+    # A marca de leitura só avança sobre eventos com mais de N segundos: um id
+    # menor ainda pode estar numa transação aberta (varredura) e aparecer depois
+    NOTIFICATION_READ_GRACE_SECONDS = int(os.getenv("NOTIFICATION_READ_GRACE_SECONDS", 60))
+
+    # Exclusão lógica de caminhões/usuários: o purgador apaga dependentes em lotes
+    SOFT_DELETE_PURGE_ENABLED = os.getenv("SOFT_DELETE_PURGE_ENABLED", "true").lower() in ("true", "1", "yes")
+    SOFT_DELETE_PURGE_INTERVAL = int(os.getenv("SOFT_DELETE_PURGE_INTERVAL", 300))
+    SOFT_DELETE_PURGE_BATCH_SIZE = int(os.getenv("SOFT_DELETE_PURGE_BATCH_SIZE", 500))
+    SOFT_DELETE_PURGE_MAX_BATCHES = int(os.getenv("SOFT_DELETE_PURGE_MAX_BATCHES", 200))
+    SOFT_DELETE_PURGE_PAUSE_SECONDS = float(os.getenv("SOFT_DELETE_PURGE_PAUSE_SECONDS", 0.2))
+
+    # Instrumentação de SQL por requisição (Server-Timing + log estruturado)
+    SQL_INSTRUMENTATION_ENABLED = os.getenv("SQL_INSTRUMENTATION_ENABLED", "false").lower() in ("true", "1", "yes")
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+    SQL_TOP_STATEMENTS = int(os.getenv("SQL_TOP_STATEMENTS", 3))
+
+    # Pool de conexões, por processo: no total o banco recebe até
+    # WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW) conexões (o dobro com réplica).
+    # Padrão: uma conexão por thread do worker + uma para os jobs em background.
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", _WORKER_THREADS + 1))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", _WORKER_THREADS))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 10))
+    # Abaixo do wait_timeout do MySQL / timeout de ociosidade de proxies
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 280))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("true", "1", "yes")
+    # Entradas do cache de statements compilados por engine (padrão do SQLAlchemy: 500)
+    DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", 1200))
+
+    # Réplica de leitura (opcional) para os GET de caminhões, usuários, manutenções e notificações
+    DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+    # Após uma escrita, o mesmo cliente lê do primário por N segundos (read-your-writes;
+    # o cliente precisa reenviar o header X-DB-Primary-Until, ver utils/db_routing.py)
+    DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", 5))
+
+    # Jobs periódicos sobem junto com o app; o gunicorn.conf.py desliga e sobe depois do fork
+    START_BACKGROUND_JOBS = os.getenv("START_BACKGROUND_JOBS", "true").lower() in ("true", "1", "yes")
+    # Rotas chamadas no aquecimento (compilam os statements quentes antes do 1º request).
+    # Só rotas de leitura pura e que não leem tabelas inteiras: as listagens
+    # (/trucks/, /notifications/, /maintenances/, /users/) ficam de fora e
+    # utils/warmup.py aquece os statements delas direto, sem ler linhas
+    WARMUP_PATHS = [
+        path.strip()
+        for path in os.getenv(
+            "WARMUP_PATHS", "/trucks/due,/trucks/search?q=a,/maintenances/calendar"
+        ).split(",")
+        if path.strip()
+    ]
+
+    # Compressão das respostas JSON (brotli se o pacote estiver instalado, senão gzip)
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("true", "1", "yes")
+    COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 5))
+    # Snapshots já serializados/comprimidos das listagens, válidos até a próxima escrita
+    SNAPSHOT_CACHE_ENABLED = os.getenv("SNAPSHOT_CACHE_ENABLED", "true").lower() in ("true", "1", "yes")
+    SNAPSHOT_CACHE_TTL = int(os.getenv("SNAPSHOT_CACHE_TTL", 300))
+    SNAPSHOT_CACHE_MAX_ENTRIES = int(os.getenv("SNAPSHOT_CACHE_MAX_ENTRIES", 64))
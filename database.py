@@ -1,4 +1,6 @@
 # database.py
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
+from utils.db_routing import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
@@ -0,0 +1,57 @@
+# gunicorn.conf.py
+# Uso: gunicorn -c gunicorn.conf.py app:app   (ou "app:create_app()")
+import glob
+import os
+import time
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+threads = int(os.getenv("GUNICORN_THREADS", 1))
+# Com preload o app é importado e aquecido uma vez no master; os workers herdam via fork
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("true", "1", "yes")
+
+# Threads não sobrevivem ao fork: os jobs periódicos sobem em post_worker_init
+os.environ["START_BACKGROUND_JOBS"] = "false"
+
+_config_loaded_at = time.perf_counter()
+
+
+def on_starting(server):
+    """Limpa os arquivos de métricas de execuções anteriores (modo multiprocess)."""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        return
+    os.makedirs(path, exist_ok=True)
+    for leftover in glob.glob(os.path.join(path, "*.db")):
+        os.remove(leftover)
+
+
+def child_exit(server, worker):
+    """Descarta os gauges 'live' do worker que morreu."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def when_ready(server):
+    """Com --preload: aquece o app no master, antes de criar os workers."""
+    if not server.cfg.preload_app:
+        return
+    from utils.warmup import warm_up_app
+
+    server.log.info("App importado em %.0f ms", (time.perf_counter() - _config_loaded_at) * 1000)
+    report = warm_up_app(server.app.wsgi())
+    server.log.info("Warmup: %s", report)
+
+
+def post_worker_init(worker):
+    """Já no worker: abre o pool deste processo e sobe os jobs em background."""
+    from app import start_background_jobs
+    from utils.warmup import warm_up_app, warm_up_worker
+
+    app = worker.wsgi
+    if not worker.cfg.preload_app:
+        worker.log.info("Warmup: %s", warm_up_app(app))
+    worker.log.info("Warmup do worker: %s", warm_up_worker(app))
+    start_background_jobs(app)
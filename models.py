@@ -1,5 +1,14 @@
 from database import db
 from datetime import datetime, date
+from sqlalchemy.orm import validates
+import re
+
+
+def normalize_plate(value):
+    """Placa em maiúsculas e só com letras/números (ex.: 'abc-1d23' -> 'ABC1D23')."""
+    if not value:
+        return None
+    return re.sub(r"[^0-9A-Za-z]", "", value).upper() or None
 
 class Usuario(db.Model):
     __tablename__ = 'usuarios'
@@ -9,6 +18,13 @@ class Usuario(db.Model):
     senha = db.Column(db.String(255), nullable=False)
     perfil = db.Column(db.Enum('administrador', 'gestor', 'motorista', 'mecanico'), nullable=False)
     status = db.Column(db.Boolean, default=True)
+    # Exclusão lógica: some de todas as consultas na hora (services/soft_delete.py)
+    # e o purgador em background apaga dependentes e a linha depois
+    excluido_em = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_usuarios_excluido_em", "excluido_em"),
+    )
 
     def to_dict(self):
         return {
@@ -28,6 +44,22 @@ class Caminhao(db.Model):
     status = db.Column(db.Enum('liberado', 'bloqueado', 'pendente'), default='liberado')
     data_ultima_manutencao = db.Column(db.Date, nullable=True)
     data_proxima_manutencao = db.Column(db.Date, nullable=True)
+    # Mantida automaticamente a partir de `placa` (busca por prefixo)
+    placa_normalizada = db.Column(db.String(10), nullable=True)
+    # Exclusão lógica (ver Usuario.excluido_em)
+    excluido_em = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # Range scan para "caminhões que vencem entre A e B" (GET /trucks/due)
+        db.Index("ix_caminhoes_proxima_manutencao", "data_proxima_manutencao", "id_caminhao"),
+        db.Index("ix_caminhoes_placa_normalizada", "placa_normalizada"),
+        db.Index("ix_caminhoes_excluido_em", "excluido_em"),
+    )
+
+    @validates("placa")
+    def _sync_normalized_plate(self, key, value):
+        self.placa_normalizada = normalize_plate(value)
+        return value
 
     def to_dict(self):
         return {
@@ -111,6 +143,14 @@ class CaminhaoCondutor(db.Model):
         backref=db.backref("vinculos_condutor", cascade="all, delete-orphan"),
     )
 
+    __table_args__ = (
+        # Consultas por intervalo: igualdade no dono + range em data_inicio,
+        # com data_fim no próprio índice (vínculo aberto = data_fim NULL)
+        db.Index("ix_vinculos_caminhao_periodo", "id_caminhao", "data_inicio", "data_fim"),
+        db.Index("ix_vinculos_condutor_periodo", "id_condutor", "data_inicio", "data_fim"),
+        db.Index("ix_vinculos_periodo", "data_inicio", "data_fim"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id_vinculo,
@@ -133,6 +173,13 @@ class Manutencao(db.Model):
 
     caminhao = db.relationship('Caminhao', backref='manutencoes')
 
+    __table_args__ = (
+        # Última manutenção de um caminhão sem varrer o histórico inteiro
+        db.Index("ix_manutencoes_caminhao_data", "id_caminhao", "data_manutencao"),
+        # Contagem por dia/tipo num range de datas (GET /maintenances/calendar)
+        db.Index("ix_manutencoes_data_tipo", "data_manutencao", "tipo"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id_manutencao,
@@ -194,9 +241,135 @@ class Notificacao(db.Model):
     data_envio = db.Column(db.DateTime, default=datetime.utcnow)
     visualizado = db.Column(db.Boolean, default=False)
 
+    # Resumo diário (services/notification_digest.py): dia do resumo e a lista
+    # de alertas agregados. Nulos nas notificações comuns.
+    data_resumo = db.Column(db.Date, nullable=True)
+    detalhes = db.Column(db.JSON, nullable=True)
+
     usuario = db.relationship("Usuario", backref=db.backref("notificacoes", lazy=True))
     caminhao = db.relationship("Caminhao", backref=db.backref("notificacoes", lazy=True))
 
+    __table_args__ = (
+        # Seleção dos lotes de arquivamento (lidas e antigas)
+        db.Index("ix_notificacoes_lidas_data", "visualizado", "data_envio"),
+        # Um resumo por usuário por dia (NULL não conflita: notificações comuns)
+        db.Index("uq_notificacoes_resumo_usuario_dia", "id_usuario", "data_resumo", unique=True),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id_notificacao,
+            "userId": self.id_usuario,
+            "truckId": self.id_caminhao,
+            "title": self.titulo,
+            "message": self.mensagem,
+            "type": self.tipo,
+            "date": self.data_envio.isoformat() if self.data_envio else None,
+            "read": self.visualizado,
+            "digestDate": self.data_resumo.isoformat() if self.data_resumo else None,
+            "items": self.detalhes,
+        }
+
+
+class PrevisaoManutencao(db.Model):
+    """Previsão de manutenção por quilometragem (gerada em lote pelo motor de previsão)."""
+    __tablename__ = "previsoes_manutencao"
+
+    id_caminhao = db.Column(
+        db.Integer,
+        db.ForeignKey("caminhoes.id_caminhao"),
+        primary_key=True,
+    )
+    km_por_dia = db.Column(db.Float, nullable=True)
+    quilometragem_base = db.Column(db.Integer, nullable=True)
+    quilometragem_alvo = db.Column(db.Integer, nullable=True)
+    intervalo_km = db.Column(db.Integer, nullable=False)
+    data_prevista = db.Column(db.Date, nullable=True, index=True)
+    amostras = db.Column(db.Integer, nullable=False, default=0)
+    calculado_em = db.Column(db.DateTime, default=datetime.utcnow)
+
+    caminhao = db.relationship("Caminhao", backref=db.backref("previsao", uselist=False))
+
+    def to_dict(self):
+        return {
+            "truckId": self.id_caminhao,
+            "kmPerDay": round(self.km_por_dia, 2) if self.km_por_dia is not None else None,
+            "baseMileage": self.quilometragem_base,
+            "targetMileage": self.quilometragem_alvo,
+            "intervalKm": self.intervalo_km,
+            "projectedDate": self.data_prevista.isoformat() if self.data_prevista else None,
+            "samples": self.amostras,
+            "computedAt": self.calculado_em.isoformat() if self.calculado_em else None,
+        }
+
+
+class ResumoManutencaoMensal(db.Model):
+    """Rollup de manutenções por (caminhão, mês, tipo). Mantido incrementalmente."""
+    __tablename__ = "resumo_manutencoes_mensal"
+
+    id_caminhao = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    mes = db.Column(db.Date, primary_key=True)  # sempre o dia 1º do mês
+    tipo = db.Column(db.Enum('preventiva', 'corretiva'), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("ix_resumo_manutencoes_mes", "mes"),
+    )
+
+    def to_dict(self):
+        return {
+            "truckId": self.id_caminhao,
+            "month": self.mes.strftime("%Y-%m"),
+            "type": self.tipo,
+            "total": self.total,
+        }
+
+
+class ResumoMecanicoMensal(db.Model):
+    """Rollup de carga de trabalho por (mecânico, mês). Mantido incrementalmente."""
+    __tablename__ = "resumo_mecanicos_mensal"
+
+    nome_mecanico = db.Column(db.String(100), primary_key=True)
+    mes = db.Column(db.Date, primary_key=True)
+    preventivas = db.Column(db.Integer, nullable=False, default=0)
+    corretivas = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("ix_resumo_mecanicos_mes", "mes"),
+    )
+
+    def to_dict(self):
+        return {
+            "mechanicName": self.nome_mecanico,
+            "month": self.mes.strftime("%Y-%m"),
+            "preventive": self.preventivas,
+            "corrective": self.corretivas,
+            "total": self.preventivas + self.corretivas,
+        }
+
+
+class NotificacaoArquivo(db.Model):
+    """Notificações lidas e antigas movidas para fora da tabela quente."""
+    __tablename__ = "notificacoes_arquivo"
+
+    id_notificacao = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    id_usuario = db.Column(db.Integer, nullable=False)
+    id_caminhao = db.Column(db.Integer, nullable=True)
+
+    titulo = db.Column(db.String(150), nullable=False)
+    mensagem = db.Column(db.Text, nullable=False)
+    tipo = db.Column(db.Enum('alerta', 'info', 'manutencao', 'sistema'), default='info')
+    data_envio = db.Column(db.DateTime)
+    visualizado = db.Column(db.Boolean, default=True)
+    data_resumo = db.Column(db.Date, nullable=True)
+    detalhes = db.Column(db.JSON, nullable=True)
+    arquivado_em = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_notificacoes_arquivo_usuario_data", "id_usuario", "data_envio"),
+        db.Index("ix_notificacoes_arquivo_caminhao_data", "id_caminhao", "data_envio"),
+    )
+
     def to_dict(self):
         return {
             "id": self.id_notificacao,
@@ -207,4 +380,127 @@ class Notificacao(db.Model):
             "type": self.tipo,
             "date": self.data_envio.isoformat() if self.data_envio else None,
             "read": self.visualizado,
+            "digestDate": self.data_resumo.isoformat() if self.data_resumo else None,
+            "items": self.detalhes,
+            "archived": True,
+            "archivedAt": self.arquivado_em.isoformat() if self.arquivado_em else None,
+        }
+
+
+class EventoNotificacao(db.Model):
+    """
+    Alerta gravado uma única vez (NOTIFICATION_STORAGE_MODE=events). Quem recebe
+    é resolvido na leitura (services/notification_feed.py): a equipe, os
+    motoristas do caminhão e/ou um usuário específico.
+    """
+    __tablename__ = "eventos_notificacao"
+
+    id_evento = db.Column(db.Integer, primary_key=True)
+    id_caminhao = db.Column(db.Integer, db.ForeignKey("caminhoes.id_caminhao"), nullable=True)
+    id_usuario = db.Column(db.Integer, db.ForeignKey("usuarios.id_usuario"), nullable=True)
+
+    titulo = db.Column(db.String(150), nullable=False)
+    mensagem = db.Column(db.Text, nullable=False)
+    tipo = db.Column(db.Enum('alerta', 'info', 'manutencao', 'sistema'), default='info')
+    data_envio = db.Column(db.DateTime, default=datetime.utcnow)
+
+    para_equipe = db.Column(db.Boolean, nullable=False, default=False)
+    para_motoristas = db.Column(db.Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        db.Index("ix_eventos_notificacao_data", "data_envio"),
+        db.Index("ix_eventos_notificacao_caminhao_data", "id_caminhao", "data_envio"),
+        db.Index("ix_eventos_notificacao_usuario_data", "id_usuario", "data_envio"),
+    )
+
+
+class LeituraNotificacao(db.Model):
+    """
+    Estado de leitura de um usuário sobre os eventos: tudo até `ultimo_lido`
+    está lido, e `excecoes` guarda os ids acima dele lidos fora de ordem.
+    `ocultos` são os eventos que o usuário removeu do próprio feed (o evento é
+    compartilhado e continua para os outros destinatários).
+    """
+    __tablename__ = "leituras_notificacao"
+
+    id_usuario = db.Column(db.Integer, db.ForeignKey("usuarios.id_usuario"), primary_key=True)
+    ultimo_lido = db.Column(db.Integer, nullable=False, default=0)
+    excecoes = db.Column(db.JSON, nullable=False, default=list)
+    ocultos = db.Column(db.JSON, nullable=True, default=list)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class HistoricoStatusCaminhao(db.Model):
+    """
+    Log só de inserção das mudanças de status dos caminhões (gravado pelos hooks
+    de sessão em services/status_history.py). Sem FK: o histórico sobrevive à
+    exclusão do caminhão.
+    """
+    __tablename__ = "historico_status_caminhao"
+
+    id_historico = db.Column(db.Integer, primary_key=True)
+    id_caminhao = db.Column(db.Integer, nullable=False)
+    status_anterior = db.Column(db.Enum('liberado', 'bloqueado', 'pendente'), nullable=True)
+    status_novo = db.Column(db.Enum('liberado', 'bloqueado', 'pendente'), nullable=False)
+    alterado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Quem mudou: varredura, rota (endpoint) ou comando
+    origem = db.Column(db.String(60), nullable=False)
+
+    __table_args__ = (
+        # Períodos por caminhão e "status vigente em T" (último registro antes de T)
+        db.Index("ix_historico_status_caminhao_data", "id_caminhao", "alterado_em"),
+        db.Index("ix_historico_status_data", "alterado_em"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id_historico,
+            "truckId": self.id_caminhao,
+            "from": self.status_anterior,
+            "to": self.status_novo,
+            "changedAt": self.alterado_em.isoformat() if self.alterado_em else None,
+            "origin": self.origem,
         }
+
+
+class CaminhaoTermoBusca(db.Model):
+    """
+    Índice invertido de palavras do modelo do caminhão e do nome do motorista
+    atual, normalizadas (minúsculas, sem acento). A PK começa por `termo`, então
+    buscas por prefixo (`termo LIKE 'vol%'`) viram range scan.
+    Mantido pelos hooks de sessão em services/truck_search.py.
+    """
+    __tablename__ = "caminhoes_termos_busca"
+
+    termo = db.Column(db.String(50), primary_key=True)
+    id_caminhao = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    origem = db.Column(db.Enum('modelo', 'motorista'), primary_key=True)
+
+    __table_args__ = (
+        db.Index("ix_caminhoes_termos_caminhao", "id_caminhao", "termo"),
+    )
+
+
+class VersaoColecao(db.Model):
+    """
+    Versão de cada coleção servida em snapshot (caminhões, manutenções,
+    notificações). Incrementada na mesma transação de qualquer escrita nas
+    tabelas de origem pelos hooks de services/collection_versions.py.
+    """
+    __tablename__ = "versoes_colecao"
+
+    colecao = db.Column(db.String(50), primary_key=True)
+    versao = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class FixacaoPrimario(db.Model):
+    """
+    Read-your-writes com réplica: até quando as leituras do usuário vão para o
+    primário depois de uma escrita dele (utils/db_routing.py). Fica no
+    primário, então vale para todos os workers e clientes do usuário. Sem FK:
+    uma linha por usuário, sobrescrita a cada escrita.
+    """
+    __tablename__ = "fixacoes_primario"
+
+    id_usuario = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    fixado_ate = db.Column(db.Float, nullable=False)
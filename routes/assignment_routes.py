@@ -0,0 +1,119 @@
+from flask import Blueprint, request, jsonify
+from models import CaminhaoCondutor, Caminhao, Condutor
+from database import db
+from datetime import datetime, date
+from sqlalchemy import or_
+
+assignment_bp = Blueprint("assignments", __name__, url_prefix="/assignments")
+
+
+def parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _base_query():
+    """Vínculo + nome do motorista + placa do caminhão numa única consulta."""
+    return db.session.query(
+        CaminhaoCondutor,
+        Condutor.nome,
+        Condutor.id_usuario,
+        Caminhao.placa,
+    ).join(
+        Condutor, Condutor.id_condutor == CaminhaoCondutor.id_condutor
+    ).join(
+        Caminhao, Caminhao.id_caminhao == CaminhaoCondutor.id_caminhao
+    )
+
+
+def _overlaps(start, end):
+    """Vínculo [data_inicio, data_fim] (data_fim NULL = em aberto) intersecta [start, end]."""
+    return [
+        CaminhaoCondutor.data_inicio <= end,
+        or_(CaminhaoCondutor.data_fim.is_(None), CaminhaoCondutor.data_fim >= start),
+    ]
+
+
+def _serialize(row):
+    vinculo, driver_name, user_id, plate = row
+    payload = vinculo.to_dict()
+    payload.update(
+        {
+            "driverName": driver_name,
+            "driverUserId": user_id,
+            "truckPlate": plate,
+        }
+    )
+    return payload
+
+
+@assignment_bp.route("/", methods=["GET"])
+def get_assignments():
+    """
+    Vínculos motorista-caminhão que se sobrepõem a [from, to].
+
+    Parâmetros: ?from= e ?to= (YYYY-MM-DD, obrigatórios), ?truckId=, ?driverId=,
+    ?limit= (padrão 500, teto 5000) e ?offset=.
+    """
+    start = parse_date(request.args.get("from"))
+    end = parse_date(request.args.get("to"))
+    if not start or not end:
+        return jsonify({"error": "Parâmetros 'from' e 'to' são obrigatórios (YYYY-MM-DD)"}), 400
+    if end < start:
+        return jsonify({"error": "'to' deve ser maior ou igual a 'from'"}), 400
+
+    limit = max(1, min(request.args.get("limit", default=500, type=int) or 500, 5000))
+    offset = max(0, request.args.get("offset", default=0, type=int) or 0)
+
+    query = _base_query().filter(*_overlaps(start, end))
+
+    truck_id = request.args.get("truckId", type=int)
+    if truck_id:
+        query = query.filter(CaminhaoCondutor.id_caminhao == truck_id)
+
+    driver_id = request.args.get("driverId", type=int)
+    if driver_id:
+        query = query.filter(CaminhaoCondutor.id_condutor == driver_id)
+
+    rows = (
+        query.order_by(CaminhaoCondutor.data_inicio.asc(), CaminhaoCondutor.id_vinculo.asc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    return jsonify([_serialize(row) for row in rows])
+
+
+@assignment_bp.route("/at", methods=["GET"])
+def get_assignment_at():
+    """
+    Quem dirigia o caminhão ?truckId= na data ?date= (padrão: hoje).
+    Com ?driverId= no lugar de truckId, responde qual caminhão o motorista usava.
+    """
+    truck_id = request.args.get("truckId", type=int)
+    driver_id = request.args.get("driverId", type=int)
+    if not truck_id and not driver_id:
+        return jsonify({"error": "Informe truckId ou driverId"}), 400
+
+    when = parse_date(request.args.get("date")) if request.args.get("date") else date.today()
+    if when is None:
+        return jsonify({"error": "Parâmetro 'date' inválido"}), 400
+
+    query = _base_query().filter(*_overlaps(when, when))
+    if truck_id:
+        query = query.filter(CaminhaoCondutor.id_caminhao == truck_id)
+    if driver_id:
+        query = query.filter(CaminhaoCondutor.id_condutor == driver_id)
+
+    # Varre o índice de trás pra frente a partir de `when`: o vínculo mais recente vence
+    row = query.order_by(
+        CaminhaoCondutor.data_inicio.desc(), CaminhaoCondutor.id_vinculo.desc()
+    ).first()
+
+    if not row:
+        return jsonify({"error": "Nenhum vínculo encontrado nessa data"}), 404
+    return jsonify(_serialize(row))
@@ -0,0 +1,106 @@
+from flask import Blueprint, jsonify, current_app
+from models import Caminhao, Manutencao, Notificacao, Usuario
+from database import db
+from datetime import date, timedelta
+from sqlalchemy import func, case
+from services.notification_feed import events_mode, unread_counts_by_role
+from utils.cache import TTLCache
+
+dashboard_bp = Blueprint("dashboard", __name__, url_prefix="/dashboard")
+
+# Janelas (em dias) usadas nos contadores de "vence em até N dias"
+DUE_WINDOWS = (2, 7, 30)
+
+_summary_cache = TTLCache()
+
+
+def _count_when(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _truck_summary(today):
+    """Contagem por status + vencidos / a vencer, numa única consulta agrupada."""
+    next_date = Caminhao.data_proxima_manutencao
+    columns = [
+        Caminhao.status,
+        func.count(Caminhao.id_caminhao),
+        _count_when(next_date < today),
+    ]
+    for days in DUE_WINDOWS:
+        columns.append(
+            _count_when(next_date.between(today, today + timedelta(days=days)))
+        )
+
+    rows = db.session.query(*columns).group_by(Caminhao.status).all()
+
+    by_status = {"liberado": 0, "bloqueado": 0, "pendente": 0}
+    overdue = 0
+    due = {days: 0 for days in DUE_WINDOWS}
+    for status, total, overdue_count, *due_counts in rows:
+        by_status[status or "liberado"] = by_status.get(status or "liberado", 0) + int(total)
+        overdue += int(overdue_count)
+        for days, count in zip(DUE_WINDOWS, due_counts):
+            due[days] += int(count)
+
+    return {
+        "total": sum(by_status.values()),
+        "byStatus": by_status,
+        "overdue": overdue,
+        "dueWithin": {f"{days}d": count for days, count in due.items()},
+    }
+
+
+def _maintenance_summary(today):
+    """Total de manutenções por tipo e quantas nos últimos 30 dias."""
+    since = today - timedelta(days=30)
+    rows = (
+        db.session.query(
+            Manutencao.tipo,
+            func.count(Manutencao.id_manutencao),
+            _count_when(Manutencao.data_manutencao >= since),
+        )
+        .group_by(Manutencao.tipo)
+        .all()
+    )
+
+    by_type = {"preventiva": 0, "corretiva": 0}
+    last_30_days = {"preventiva": 0, "corretiva": 0}
+    for tipo, total, recent in rows:
+        by_type[tipo] = int(total)
+        last_30_days[tipo] = int(recent)
+
+    return {"byType": by_type, "last30DaysByType": last_30_days}
+
+
+def _unread_notifications_by_role():
+    """Notificações não lidas agrupadas pelo perfil do destinatário."""
+    if events_mode():
+        # Sem linha por destinatário: conta os feeds em memória
+        return unread_counts_by_role()
+
+    rows = (
+        db.session.query(Usuario.perfil, func.count(Notificacao.id_notificacao))
+        .join(Usuario, Usuario.id_usuario == Notificacao.id_usuario)
+        .filter(Notificacao.visualizado == False)  # noqa: E712
+        .group_by(Usuario.perfil)
+        .all()
+    )
+    return {perfil: int(total) for perfil, total in rows}
+
+
+def build_dashboard_summary():
+    today = date.today()
+    return {
+        "date": today.isoformat(),
+        "trucks": _truck_summary(today),
+        "maintenances": _maintenance_summary(today),
+        "unreadNotificationsByRole": _unread_notifications_by_role(),
+    }
+
+
+@dashboard_bp.route("/summary", methods=["GET"])
+def get_dashboard_summary():
+    """Resumo agregado da frota para o dashboard (cacheado por alguns segundos)."""
+    ttl = current_app.config.get("DASHBOARD_CACHE_TTL", 30)
+    summary = _summary_cache.get_or_set("summary", build_dashboard_summary, ttl)
+    return jsonify(summary)
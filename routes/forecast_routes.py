@@ -0,0 +1,66 @@
+from flask import Blueprint, request, jsonify, current_app
+from models import PrevisaoManutencao, Caminhao
+from database import db
+from datetime import datetime
+from services.maintenance_forecast import refresh_maintenance_forecasts
+
+forecast_bp = Blueprint("forecasts", __name__, url_prefix="/forecasts")
+
+
+def parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).date()
+    except (TypeError, ValueError):
+        return None
+
+
+@forecast_bp.route("/", methods=["GET"])
+def get_forecasts():
+    """
+    Lista as previsões de manutenção por quilometragem, da mais próxima para a
+    mais distante. Filtros opcionais: ?truckId= e ?dueBefore=YYYY-MM-DD.
+    """
+    query = db.session.query(PrevisaoManutencao, Caminhao.placa).join(
+        Caminhao, Caminhao.id_caminhao == PrevisaoManutencao.id_caminhao
+    )
+
+    truck_id = request.args.get("truckId", type=int)
+    if truck_id:
+        query = query.filter(PrevisaoManutencao.id_caminhao == truck_id)
+
+    due_before = parse_date(request.args.get("dueBefore"))
+    if due_before:
+        query = query.filter(PrevisaoManutencao.data_prevista <= due_before)
+
+    rows = query.order_by(
+        PrevisaoManutencao.data_prevista.is_(None),
+        PrevisaoManutencao.data_prevista.asc(),
+    ).all()
+
+    response = []
+    for forecast, plate in rows:
+        payload = forecast.to_dict()
+        payload["truckPlate"] = plate
+        response.append(payload)
+    return jsonify(response)
+
+
+@forecast_bp.route("/refresh", methods=["POST"])
+def refresh_forecasts():
+    """Recalcula as previsões. Aceita {"intervalKm": <km>} para sobrescrever a config."""
+    data = request.get_json(silent=True) or {}
+
+    interval_km = data.get("intervalKm")
+    if interval_km is None:
+        interval_km = current_app.config["FORECAST_KM_INTERVAL"]
+    try:
+        interval_km = int(interval_km)
+    except (TypeError, ValueError):
+        return jsonify({"error": "intervalKm inválido"}), 400
+    if interval_km <= 0:
+        return jsonify({"error": "intervalKm deve ser positivo"}), 400
+
+    total = refresh_maintenance_forecasts(interval_km)
+    return jsonify({"message": "Previsões recalculadas", "trucks": total, "intervalKm": interval_km})
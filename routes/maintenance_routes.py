@@ -3,15 +3,51 @@ from models import Manutencao, Caminhao
 from database import db
 from datetime import datetime, date
 from services.maintenance_alerts import update_truck_status_and_notifications
+from services.read_models import MAINTENANCES
+from services.collection_versions import collection_version
+from services.maintenance_calendar import calendar_version, maintenance_calendar, parse_month
+from utils.compression import snapshot_response
+from services.maintenance_rollups import (
+    rollup_key,
+    record_maintenance_created,
+    record_maintenance_updated,
+    record_maintenance_deleted,
+)
 
 maintenance_bp = Blueprint("maintenance", __name__, url_prefix="/maintenances")
 
 
 @maintenance_bp.route("/", methods=["GET"])
 def get_maintenances():
-    """Retorna todas as manutenções cadastradas."""
-    maints = Manutencao.query.all()
-    return jsonify([m.to_dict() for m in maints])
+    """Retorna todas as manutenções cadastradas (?fields= / ?exclude= limitam os campos)."""
+    try:
+        keys = MAINTENANCES.keys_from_args(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    def build():
+        rows = db.session.execute(MAINTENANCES.select(keys).order_by(Manutencao.id_manutencao))
+        return MAINTENANCES.to_dicts(rows, keys)
+
+    return snapshot_response(("maintenances", collection_version("maintenances")), build)
+
+
+@maintenance_bp.route("/calendar", methods=["GET"])
+def get_maintenance_calendar():
+    """
+    Manutenções previstas e realizadas por dia do mês (?month=YYYY-MM, padrão:
+    mês atual), por tipo. Guardado por mês até uma escrita mexer nele.
+    """
+    month = request.args.get("month")
+    try:
+        month_start = parse_month(month) if month else date.today().replace(day=1)
+    except ValueError:
+        return jsonify({"error": "month deve estar no formato YYYY-MM"}), 400
+
+    return snapshot_response(
+        ("calendar", month_start, calendar_version(month_start)),
+        lambda: maintenance_calendar(month_start),
+    )
 
 
 @maintenance_bp.route("/", methods=["POST"])
@@ -67,6 +103,7 @@ def create_maintenance():
         nome_mecanico=mechanic_name,
     )
     db.session.add(manutencao)
+    record_maintenance_created(manutencao)
 
     # 2) Atualizar dados do caminhão
 
@@ -84,8 +121,8 @@ def create_maintenance():
     db.session.commit()
 
     # 3) Recalcular status + gerar notificações automáticas
-    # (usa data_proxima_manutencao de todos os caminhões)
-    update_truck_status_and_notifications()
+    # (usa data_proxima_manutencao de todos os caminhões; fresh: precisa ver o commit acima)
+    update_truck_status_and_notifications(fresh=True)
 
     return jsonify(manutencao.to_dict()), 201
 
@@ -94,6 +131,7 @@ def update_maintenance(maintenance_id):
     """Atualiza um registro de manutenção existente."""
     manutencao = Manutencao.query.get_or_404(maintenance_id)
     data = request.get_json() or {}
+    old_rollup_key = rollup_key(manutencao)
 
     # Atualiza campos básicos da manutenção
     maintenance_date = parse_date(data.get("date"))
@@ -141,6 +179,7 @@ def update_maintenance(maintenance_id):
             else:
                 caminhao.data_ultima_manutencao = maintenance_date
 
+    record_maintenance_updated(old_rollup_key, manutencao)
     db.session.commit()
     return jsonify(manutencao.to_dict())
 
@@ -148,6 +187,7 @@ def update_maintenance(maintenance_id):
 def delete_maintenance(maintenance_id):
     """Remove um registro de manutenção pelo ID."""
     manutencao = Manutencao.query.get_or_404(maintenance_id)
+    record_maintenance_deleted(manutencao)
     db.session.delete(manutencao)
     db.session.commit()
     return jsonify({"message": "Manutenção removida com sucesso"})
@@ -1,11 +1,26 @@
 from flask import Blueprint, request, jsonify
-from models import Notificacao, Usuario, Condutor
+from models import EventoNotificacao, Notificacao, NotificacaoArquivo, Usuario, Condutor
 from database import db
-from sqlalchemy import or_
+from sqlalchemy import or_, and_, bindparam
+from datetime import datetime
+from functools import lru_cache
 
 
 # serviço que atualiza status e gera notificações automáticas
 from services.maintenance_alerts import update_truck_status_and_notifications
+from services.notification_feed import (
+    driver_truck_ids,
+    event_to_dict,
+    events_mode,
+    hide_event,
+    list_feed,
+    mark_all_read,
+    mark_event_read,
+)
+from services.read_models import NOTIFICATIONS
+from services.collection_versions import collection_version
+from utils.compression import snapshot_response
+from utils.metrics import record_notifications
 
 notification_bp = Blueprint("notifications", __name__, url_prefix="/notifications")
 
@@ -77,66 +92,180 @@ notification_bp = Blueprint("notifications", __name__, url_prefix="/notification
 #     notifs = Notificacao.query.order_by(Notificacao.data_envio.desc()).all()
 #     return jsonify([n.to_dict() for n in notifs])
 
-@notification_bp.route("/", methods=["GET"])
-def get_notifications():
-    # Atualiza status / gera novas notificações
-    update_truck_status_and_notifications()
+# Listagens só com as colunas do JSON (ver services/read_models.py); cada
+# combinação de campos é montada uma vez e reaproveitada
+_LIST_FILTERS = {
+    "all": None,
+    "user": Notificacao.id_usuario == bindparam("user_id"),
+    "driver": or_(
+        Notificacao.id_usuario == bindparam("user_id"),
+        Notificacao.id_caminhao.in_(bindparam("truck_ids", expanding=True)),
+    ),
+}
+
+
+@lru_cache(maxsize=128)
+def notification_list_statement(keys, scope):
+    stmt = NOTIFICATIONS.select(keys).order_by(Notificacao.data_envio.desc())
+    criteria = _LIST_FILTERS[scope]
+    return stmt if criteria is None else stmt.where(criteria)
 
-    user_id = request.args.get("userId", type=int)
 
+def _list_notifications(keys, user_id):
     # Se não vier userId, devolve tudo (ex: teste no Insomnia)
     if not user_id:
-        notifs = Notificacao.query.order_by(Notificacao.data_envio.desc()).all()
-        return jsonify([n.to_dict() for n in notifs])
+        rows = db.session.execute(notification_list_statement(keys, "all"))
+        return NOTIFICATIONS.to_dicts(rows, keys)
 
     user = Usuario.query.get(user_id)
     if not user:
-        return jsonify([])
+        return []
 
     # --- MOTORISTA: só notificações do caminhão vinculado ---
     if user.perfil == "motorista":
-        condutor = Condutor.query.filter_by(id_usuario=user_id).first()
+        truck_ids = driver_truck_ids(user_id)
 
-        if not condutor:
-            notifs = (
-                Notificacao.query
-                .filter_by(id_usuario=user.id_usuario)
-                .order_by(Notificacao.data_envio.desc())
-                .all()
+        if truck_ids is None:
+            rows = db.session.execute(
+                notification_list_statement(keys, "user"), {"user_id": user.id_usuario}
             )
-            return jsonify([n.to_dict() for n in notifs])
+            return NOTIFICATIONS.to_dicts(rows, keys)
+
+        # IN vazio não casa nada: equivale a filtrar só pelo usuário
+        rows = db.session.execute(
+            notification_list_statement(keys, "driver"),
+            {"user_id": user.id_usuario, "truck_ids": sorted(truck_ids)},
+        )
+        return NOTIFICATIONS.to_dicts(rows, keys)
+
+    # --- Outros perfis: filtra só pelo usuário (admin, mecânico, gestor) ---
+    rows = db.session.execute(
+        notification_list_statement(keys, "user"), {"user_id": user.id_usuario}
+    )
+    return NOTIFICATIONS.to_dicts(rows, keys)
+
+
+@notification_bp.route("/", methods=["GET"])
+def get_notifications():
+    try:
+        keys = NOTIFICATIONS.keys_from_args(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    # Atualiza status / gera novas notificações
+    update_truck_status_and_notifications()
+
+    user_id = request.args.get("userId", type=int)
+    list_notifications = _list_feed if events_mode() else _list_notifications
+    return snapshot_response(
+        ("notifications", collection_version("notifications")),
+        lambda: list_notifications(keys, user_id),
+    )
+
+
+def _list_feed(keys, user_id):
+    if not user_id:
+        return list_feed(None, keys)
+    user = Usuario.query.get(user_id)
+    return list_feed(user, keys) if user else []
 
-        truck_ids = {v.id_caminhao for v in condutor.vinculos}
-        if not truck_ids and condutor.id_caminhao:
-            truck_ids.add(condutor.id_caminhao)
 
-        filters = [Notificacao.id_usuario == user.id_usuario]
-        if truck_ids:
-            filters.append(Notificacao.id_caminhao.in_(truck_ids))
+def _feed_user():
+    """Usuário do feed (modo events): ?userId= ou "userId" no corpo."""
+    data = request.get_json(silent=True) or {}
+    user_id = request.args.get("userId", type=int) or data.get("userId")
+    return Usuario.query.get(user_id) if user_id else None
 
-        notifs = (
-            Notificacao.query
-            .filter(or_(*filters))
-            .order_by(Notificacao.data_envio.desc())
-            .all()
+
+@notification_bp.route("/history", methods=["GET"])
+def get_notification_history():
+    """
+    Histórico de notificações arquivadas (lidas e antigas), paginado por cursor.
+
+    Parâmetros: ?userId= (obrigatório), ?truckId=, ?limit= (padrão 50, teto 200)
+    e ?cursor= (valor de "nextCursor" da página anterior).
+    """
+    user_id = request.args.get("userId", type=int)
+    if not user_id:
+        return jsonify({"error": "userId é obrigatório"}), 400
+
+    user = Usuario.query.get(user_id)
+    if not user:
+        return jsonify({"items": [], "nextCursor": None})
+
+    limit = max(1, min(request.args.get("limit", default=50, type=int) or 50, 200))
+
+    filters = [NotificacaoArquivo.id_usuario == user.id_usuario]
+    # Motorista também vê o histórico dos caminhões vinculados a ele
+    if user.perfil == "motorista":
+        condutor = Condutor.query.filter_by(id_usuario=user_id).first()
+        if condutor:
+            truck_ids = {v.id_caminhao for v in condutor.vinculos}
+            if not truck_ids and condutor.id_caminhao:
+                truck_ids.add(condutor.id_caminhao)
+            if truck_ids:
+                filters.append(NotificacaoArquivo.id_caminhao.in_(truck_ids))
+
+    query = NotificacaoArquivo.query.filter(or_(*filters))
+
+    truck_id = request.args.get("truckId", type=int)
+    if truck_id:
+        query = query.filter(NotificacaoArquivo.id_caminhao == truck_id)
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            cursor_date, cursor_id = cursor.rsplit("|", 1)
+            cursor_date = datetime.fromisoformat(cursor_date)
+            cursor_id = int(cursor_id)
+        except (TypeError, ValueError):
+            return jsonify({"error": "cursor inválido"}), 400
+        query = query.filter(
+            or_(
+                NotificacaoArquivo.data_envio < cursor_date,
+                and_(
+                    NotificacaoArquivo.data_envio == cursor_date,
+                    NotificacaoArquivo.id_notificacao < cursor_id,
+                ),
+            )
         )
-        return jsonify([n.to_dict() for n in notifs])
 
-    # --- Outros perfis: filtra só pelo usuário (admin, mecânico, gestor) ---
-    else:
-        notifs = (
-            Notificacao.query
-            .filter_by(id_usuario=user.id_usuario)
-            .order_by(Notificacao.data_envio.desc())
-            .all()
+    notifs = (
+        query.order_by(
+            NotificacaoArquivo.data_envio.desc(),
+            NotificacaoArquivo.id_notificacao.desc(),
         )
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(notifs) > limit:
+        notifs = notifs[:limit]
+        last = notifs[-1]
+        next_cursor = f"{last.data_envio.isoformat()}|{last.id_notificacao}"
+
+    return jsonify({"items": [n.to_dict() for n in notifs], "nextCursor": next_cursor})
 
-    return jsonify([n.to_dict() for n in notifs])
 
 @notification_bp.route("/", methods=["POST"])
 def create_notification():
     data = request.get_json() or {}
 
+    if events_mode():
+        # Sem userId vira um aviso para a equipe
+        event = EventoNotificacao(
+            id_usuario=data.get("userId"),
+            para_equipe=not data.get("userId"),
+            titulo=data.get("title"),
+            mensagem=data.get("message"),
+            tipo=data.get("type", "info"),
+        )
+        db.session.add(event)
+        db.session.commit()
+        record_notifications("manual", inserted=1)
+        return jsonify(event_to_dict(event, event.id_usuario, False)), 201
+
     notif = Notificacao(
         id_usuario=data.get("userId"),   # pode ser None para notificação global
         titulo=data.get("title"),
@@ -146,20 +275,60 @@ def create_notification():
 
     db.session.add(notif)
     db.session.commit()
+    record_notifications("manual", inserted=1)
 
     return jsonify(notif.to_dict()), 201
 
 
 @notification_bp.route("/<int:notif_id>/read", methods=["PATCH"])
 def mark_notification_as_read(notif_id):
+    if events_mode():
+        # O estado de leitura é por usuário: precisa saber de quem
+        user = _feed_user()
+        if not user:
+            return jsonify({"error": "userId é obrigatório"}), 400
+        item = mark_event_read(user, notif_id)
+        if item is None:
+            return jsonify({"error": "Notificação não encontrada"}), 404
+        db.session.commit()
+        return jsonify(item)
+
     notif = Notificacao.query.get_or_404(notif_id)
     notif.visualizado = True
     db.session.commit()
     return jsonify(notif.to_dict())
 
 
+@notification_bp.route("/read-all", methods=["PATCH"])
+def mark_all_notifications_as_read():
+    """Marca como lidas todas as notificações do usuário (?userId= ou corpo)."""
+    user = _feed_user()
+    if not user:
+        return jsonify({"error": "userId é obrigatório"}), 400
+
+    if events_mode():
+        mark_all_read(user)
+    else:
+        Notificacao.query.filter(
+            Notificacao.id_usuario == user.id_usuario,
+            Notificacao.visualizado == False,  # noqa: E712
+        ).update({Notificacao.visualizado: True}, synchronize_session=False)
+    db.session.commit()
+    return jsonify({"message": "Notificações marcadas como lidas"})
+
+
 @notification_bp.route("/<int:notif_id>", methods=["DELETE"])
 def delete_notification(notif_id):
+    if events_mode():
+        # O evento é um só para todos os destinatários: some só do feed de quem pediu
+        user = _feed_user()
+        if not user:
+            return jsonify({"error": "userId é obrigatório"}), 400
+        if not hide_event(user, notif_id):
+            return jsonify({"error": "Notificação não encontrada"}), 404
+        db.session.commit()
+        return jsonify({"message": "Notificação removida com sucesso"}), 200
+
     notif = Notificacao.query.get_or_404(notif_id)
     db.session.delete(notif)
     db.session.commit()
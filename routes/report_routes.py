@@ -0,0 +1,102 @@
+from flask import Blueprint, request, jsonify
+from models import ResumoManutencaoMensal, ResumoMecanicoMensal
+from database import db
+from datetime import date
+from sqlalchemy import func
+
+report_bp = Blueprint("reports", __name__, url_prefix="/reports")
+
+# Os relatórios leem SOMENTE os rollups (resumo_*), nunca a tabela manutencoes.
+
+
+def parse_month(value):
+    """Converte 'YYYY-MM' no dia 1º do mês. Retorna None se inválido."""
+    if not value:
+        return None
+    try:
+        year, month = value.split("-")[:2]
+        return date(int(year), int(month), 1)
+    except (TypeError, ValueError):
+        return None
+
+
+def _month_range(model):
+    """Aplica ?from=YYYY-MM&to=YYYY-MM. Retorna (filtros, erro)."""
+    filters = []
+    for param, op in (("from", "__ge__"), ("to", "__le__")):
+        raw = request.args.get(param)
+        if not raw:
+            continue
+        month = parse_month(raw)
+        if month is None:
+            return None, (jsonify({"error": f"Parâmetro '{param}' inválido (use YYYY-MM)"}), 400)
+        filters.append(getattr(model.mes, op)(month))
+    return filters, None
+
+
+@report_bp.route("/maintenances/monthly", methods=["GET"])
+def get_monthly_maintenances():
+    """Manutenções por caminhão, mês e tipo. Filtros: ?truckId=, ?from=, ?to=."""
+    filters, error = _month_range(ResumoManutencaoMensal)
+    if error:
+        return error
+
+    query = ResumoManutencaoMensal.query.filter(ResumoManutencaoMensal.total > 0, *filters)
+    truck_id = request.args.get("truckId", type=int)
+    if truck_id:
+        query = query.filter(ResumoManutencaoMensal.id_caminhao == truck_id)
+
+    rows = query.order_by(
+        ResumoManutencaoMensal.mes,
+        ResumoManutencaoMensal.id_caminhao,
+        ResumoManutencaoMensal.tipo,
+    ).all()
+    return jsonify([r.to_dict() for r in rows])
+
+
+@report_bp.route("/maintenances/types", methods=["GET"])
+def get_maintenance_type_ratio():
+    """Proporção corretiva x preventiva no período (?from=, ?to=, ?truckId=)."""
+    filters, error = _month_range(ResumoManutencaoMensal)
+    if error:
+        return error
+
+    query = db.session.query(
+        ResumoManutencaoMensal.tipo, func.sum(ResumoManutencaoMensal.total)
+    ).filter(*filters)
+    truck_id = request.args.get("truckId", type=int)
+    if truck_id:
+        query = query.filter(ResumoManutencaoMensal.id_caminhao == truck_id)
+
+    totals = {"preventiva": 0, "corretiva": 0}
+    for tipo, total in query.group_by(ResumoManutencaoMensal.tipo).all():
+        totals[tipo] = int(total or 0)
+
+    overall = totals["preventiva"] + totals["corretiva"]
+    return jsonify(
+        {
+            "preventive": totals["preventiva"],
+            "corrective": totals["corretiva"],
+            "total": overall,
+            "correctiveRatio": round(totals["corretiva"] / overall, 4) if overall else None,
+        }
+    )
+
+
+@report_bp.route("/mechanics", methods=["GET"])
+def get_mechanic_workload():
+    """Carga de trabalho por mecânico e mês (?from=, ?to=, ?mechanic=)."""
+    filters, error = _month_range(ResumoMecanicoMensal)
+    if error:
+        return error
+
+    query = ResumoMecanicoMensal.query.filter(
+        (ResumoMecanicoMensal.preventivas + ResumoMecanicoMensal.corretivas) > 0,
+        *filters,
+    )
+    mechanic = request.args.get("mechanic")
+    if mechanic:
+        query = query.filter(ResumoMecanicoMensal.nome_mecanico == mechanic.strip())
+
+    rows = query.order_by(ResumoMecanicoMensal.mes, ResumoMecanicoMensal.nome_mecanico).all()
+    return jsonify([r.to_dict() for r in rows])
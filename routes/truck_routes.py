@@ -1,8 +1,24 @@
 from flask import Blueprint, request, jsonify
 from models import Caminhao, Manutencao, Notificacao, Usuario, Condutor
 from database import db
-from datetime import datetime, date
-from services.maintenance_alerts import send_unlock_notification, get_truck_driver_users
+import time
+from collections import Counter
+from datetime import datetime, date, timedelta
+from sqlalchemy import select, func, insert, update
+from services.maintenance_alerts import send_unlock_notification, get_drivers_by_truck
+from services.maintenance_rollups import record_maintenance_created
+from services.notification_digest import DigestBatch, digest_enabled
+from services.notification_feed import EventBatch, events_mode
+from services.truck_search import search_trucks, matched_on
+from services.read_models import TRUCKS
+from services.soft_delete import soft_delete
+from services.status_history import availability, record_status_changes, status_history, status_origin
+from services.truck_timeline import truck_timeline
+from services.collection_versions import collection_version
+from utils.compression import snapshot_response
+from utils.metrics import record_sweep, record_notifications
+from utils.db_routing import primary_only
+from utils.singleflight import sweeps
 
 truck_bp = Blueprint("trucks", __name__, url_prefix="/trucks")
 
@@ -42,53 +58,110 @@ def parse_date(value):
 #             )
 #             db.session.add(notificacao)
 
-def create_system_notification(title, message, db_type, truck_id=None):
+def create_system_notification(title, message, db_type, truck_id=None, dedupe=True):
     """
     Cria uma notificação para todos os usuários ADMIN e GESTOR
     e, se truck_id for informado, também para o motorista vinculado
     àquele caminhão.
     """
+    create_system_notifications([(title, message, db_type, truck_id)], dedupe=dedupe)
+
+
+def create_system_notifications(alerts, source="system", dedupe=True):
+    """
+    Versão em lote: `alerts` é uma lista de (title, message, db_type, truck_id).
+    Destinatários, duplicidade e gravação saem em poucas consultas, qualquer
+    que seja o número de alertas; nada é commitado aqui.
+
+    - modo events: um evento por alerta, no máximo um por caminhão e título
+      por dia (`dedupe=False` para ações manuais, que saem sempre);
+    - resumo diário (NOTIFICATION_DIGEST_ENABLED): a equipe recebe no resumo
+      do dia (alerta repetido só entra com `dedupe=False`) e só os motoristas
+      ganham linha por caminhão;
+    - senão: uma linha por destinatário, sem repetir título ainda não lido.
+    """
+    if not alerts:
+        return
+
+    if events_mode():
+        events = EventBatch(source, dedupe)
+        for title, message, db_type, truck_id in alerts:
+            events.add(title, message, db_type, truck_id)
+        events.flush()
+        return
+
     admins = Usuario.query.filter(
         Usuario.perfil.in_(["administrador", "gestor", "mecanico"])
     ).all()
 
-    recipients = list(admins)
+    digest = DigestBatch(source, dedupe=dedupe) if digest_enabled() else None
+    staff = [] if digest is not None else admins
 
     # Inclui motoristas vinculados (atuais ou recentes)
-    if truck_id is not None:
-        motoristas = get_truck_driver_users(truck_id, include_history_days=90)
-        for motorista in motoristas:
-            if all(u.id_usuario != motorista.id_usuario for u in recipients):
-                recipients.append(motorista)
-
-    for user in recipients:
-        exists = Notificacao.query.filter(
-            Notificacao.id_usuario == user.id_usuario,
-            Notificacao.titulo == title,
-            Notificacao.visualizado == False,
-        ).first()
-
-        if not exists:
-            notificacao = Notificacao(
-                id_usuario=user.id_usuario,
-                id_caminhao=truck_id,
-                titulo=title,
-                mensagem=message,
-                tipo=db_type,
-                data_envio=datetime.now(),
-            )
-            db.session.add(notificacao)
+    drivers = get_drivers_by_truck(
+        [truck_id for *_, truck_id in alerts], include_history_days=90
+    )
 
+    candidates = []
+    for title, message, db_type, truck_id in alerts:
+        if digest is not None:
+            digest.add(admins, title, message, db_type, truck_id)
+        recipients = {user.id_usuario for user in staff}
+        recipients.update(user.id_usuario for user in drivers.get(truck_id, ()))
+        candidates.extend((user_id, title, message, db_type, truck_id) for user_id in recipients)
+
+    if digest is not None:
+        digest.flush()
+    if not candidates:
+        return
+
+    unread = {
+        (user_id, title)
+        for user_id, title in db.session.execute(
+            select(Notificacao.id_usuario, Notificacao.titulo).where(
+                Notificacao.id_usuario.in_(sorted({c[0] for c in candidates})),
+                Notificacao.titulo.in_(sorted({c[1] for c in candidates})),
+                Notificacao.visualizado == False,  # noqa: E712
+            )
+        )
+    }
 
+    now = datetime.now()
+    rows = []
+    for user_id, title, message, db_type, truck_id in candidates:
+        if (user_id, title) in unread:
+            continue
+        unread.add((user_id, title))
+        rows.append({
+            "id_usuario": user_id,
+            "id_caminhao": truck_id,
+            "titulo": title,
+            "mensagem": message,
+            "tipo": db_type,
+            "data_envio": now,
+        })
+    if rows:
+        db.session.execute(insert(Notificacao), rows)
+
+    record_notifications(source, len(rows), len(candidates) - len(rows))
+
+
+@sweeps.wrap("sweep:fleet_listing")
+@primary_only
+@status_origin("sweep:fleet_listing")
 def refresh_truck_status_by_next_maintenance():
     """
     Atualiza status baseado na data e GERA NOTIFICAÇÕES NO BANCO.
     """
+    started = time.perf_counter()
+    transitions = Counter()
     today = date.today()
     trucks = Caminhao.query.filter(
         Caminhao.data_proxima_manutencao.isnot(None)
     ).all()
     status_changed = False
+    # Notificações da varredura inteira saem juntas em create_system_notifications
+    alerts = []
 
     for truck in trucks:
         diff_days = (truck.data_proxima_manutencao - today).days
@@ -98,16 +171,17 @@ def refresh_truck_status_by_next_maintenance():
             if truck.status != "bloqueado":
                 truck.status = "bloqueado"
                 status_changed = True
+                transitions["bloqueado"] += 1
                 # Cria notificação de erro/bloqueio
-                create_system_notification(
-                    title=f"Bloqueio: {truck.placa}",
-                    message=(
+                alerts.append((
+                    f"Bloqueio: {truck.placa}",
+                    (
                         f"O caminhão {truck.placa} foi bloqueado automaticamente. "
                         f"Manutenção vencida em {truck.data_proxima_manutencao}."
                     ),
-                    db_type="manutencao",
-                    truck_id=truck.id_caminhao,  # No model.py isso vira 'error' se tiver 'Bloqueio' no título
-                )
+                    "manutencao",
+                    truck.id_caminhao,  # No model.py isso vira 'error' se tiver 'Bloqueio' no título
+                ))
 
         # 2. PERTO DE VENCER (0 a 2 dias) -> PENDENTE (Warning)
         elif 0 <= diff_days <= 2:
@@ -115,32 +189,284 @@ def refresh_truck_status_by_next_maintenance():
             if truck.status == "liberado":
                 truck.status = "pendente"
                 status_changed = True
-                create_system_notification(
-                    title=f"Manutenção Próxima: {truck.placa}",
-                    message=(
+                transitions["pendente"] += 1
+                alerts.append((
+                    f"Manutenção Próxima: {truck.placa}",
+                    (
                         f"Atenção: A manutenção do veículo vence em {diff_days} dias "
                         f"({truck.data_proxima_manutencao})."
                     ),
-                    db_type="alerta",  # No model.py isso vira 'warning'
-                )
+                    "alerta",  # No model.py isso vira 'warning'
+                    None,
+                ))
 
         # 3. PRAZO LONGE -> LIBERA (se estava pendente)
         else:
             if truck.status == "pendente":
                 truck.status = "liberado"
                 status_changed = True
+                transitions["liberado"] += 1
 
     if status_changed:
+        create_system_notifications(alerts)
         db.session.commit()
 
+    record_sweep("fleet_listing", started, transitions)
+
 
 @truck_bp.route("/", methods=["GET"])
 def get_trucks():
+    """Lista a frota. ?fields=plate,status / ?exclude=driverName limitam os campos."""
+    try:
+        keys = TRUCKS.keys_from_args(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
     # Roda a verificação toda vez que alguém lista a frota
     refresh_truck_status_by_next_maintenance()
 
-    trucks = Caminhao.query.order_by(Caminhao.id_caminhao.desc()).all()
-    return jsonify([t.to_dict() for t in trucks])
+    def build():
+        rows = db.session.execute(TRUCKS.select(keys).order_by(Caminhao.id_caminhao.desc()))
+        return TRUCKS.to_dicts(rows, keys)
+
+    return snapshot_response(("trucks", collection_version("trucks")), build)
+
+
+@truck_bp.route("/search", methods=["GET"])
+def search_trucks_route():
+    """
+    Busca para typeahead: ?q= casa prefixo da placa (ignorando hífen e caixa)
+    e prefixo de palavras do modelo ou do nome do motorista.
+    Paginação: ?page= (padrão 1) e ?pageSize= (padrão 20, teto 100).
+    """
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"error": "Parâmetro 'q' é obrigatório"}), 400
+
+    page = max(1, request.args.get("page", default=1, type=int) or 1)
+    page_size = max(1, min(request.args.get("pageSize", default=20, type=int) or 20, 100))
+
+    rows, has_more = search_trucks(q, page=page, page_size=page_size)
+
+    items = []
+    for caminhao, rank in rows:
+        payload = caminhao.to_dict()
+        payload["matchedOn"] = matched_on(rank)
+        items.append(payload)
+
+    return jsonify({"items": items, "page": page, "pageSize": page_size, "hasMore": has_more})
+
+
+@truck_bp.route("/due", methods=["GET"])
+def get_trucks_due():
+    """
+    Caminhões com próxima manutenção entre ?from= e ?to= (inclusive),
+    do mais próximo para o mais distante.
+
+    Parâmetros opcionais:
+      - from / to: YYYY-MM-DD (padrão: hoje até hoje + 30 dias)
+      - status: liberado | bloqueado | pendente (aceita lista separada por vírgula)
+      - limit: máximo de registros (padrão 100, teto 1000)
+
+    Usa o índice ix_caminhoes_proxima_manutencao para o range scan e traz o
+    motorista atual e a última manutenção na mesma consulta.
+    """
+    today = date.today()
+    start = parse_date(request.args.get("from")) if request.args.get("from") else today
+    if start is None:
+        return jsonify({"error": "Parâmetro 'from' inválido"}), 400
+
+    end = (
+        parse_date(request.args.get("to"))
+        if request.args.get("to")
+        else start + timedelta(days=30)
+    )
+    if end is None:
+        return jsonify({"error": "Parâmetro 'to' inválido"}), 400
+    if end < start:
+        return jsonify({"error": "'to' deve ser maior ou igual a 'from'"}), 400
+
+    statuses = [s.strip() for s in (request.args.get("status") or "").split(",") if s.strip()]
+    if any(s not in ("liberado", "bloqueado", "pendente") for s in statuses):
+        return jsonify({"error": "Status inválido"}), 400
+
+    limit = request.args.get("limit", default=100, type=int)
+    limit = max(1, min(limit or 100, 1000))
+
+    # Subconsultas correlacionadas: um motorista por caminhão e a última manutenção
+    driver_id = (
+        select(func.min(Condutor.id_condutor))
+        .where(Condutor.id_caminhao == Caminhao.id_caminhao)
+        .correlate(Caminhao)
+        .scalar_subquery()
+    )
+    last_maintenance_id = (
+        select(Manutencao.id_manutencao)
+        .where(Manutencao.id_caminhao == Caminhao.id_caminhao)
+        .order_by(Manutencao.data_manutencao.desc(), Manutencao.id_manutencao.desc())
+        .limit(1)
+        .correlate(Caminhao)
+        .scalar_subquery()
+    )
+
+    query = (
+        db.session.query(
+            Caminhao.id_caminhao,
+            Caminhao.placa,
+            Caminhao.modelo,
+            Caminhao.quilometragem_atual,
+            Caminhao.status,
+            Caminhao.data_ultima_manutencao,
+            Caminhao.data_proxima_manutencao,
+            Condutor.id_condutor,
+            Condutor.nome,
+            Manutencao.id_manutencao,
+            Manutencao.data_manutencao,
+            Manutencao.tipo,
+            Manutencao.quilometragem,
+            Manutencao.nome_mecanico,
+        )
+        .outerjoin(Condutor, Condutor.id_condutor == driver_id)
+        .outerjoin(Manutencao, Manutencao.id_manutencao == last_maintenance_id)
+        .filter(Caminhao.data_proxima_manutencao.between(start, end))
+    )
+    if statuses:
+        query = query.filter(Caminhao.status.in_(statuses))
+
+    rows = (
+        query.order_by(Caminhao.data_proxima_manutencao.asc(), Caminhao.id_caminhao.asc())
+        .limit(limit)
+        .all()
+    )
+
+    response = []
+    for row in rows:
+        response.append(
+            {
+                "id": row.id_caminhao,
+                "plate": row.placa,
+                "model": row.modelo,
+                "mileage": row.quilometragem_atual,
+                "status": row.status,
+                "lastMaintenance": row.data_ultima_manutencao.isoformat()
+                if row.data_ultima_manutencao
+                else None,
+                "nextMaintenance": row.data_proxima_manutencao.isoformat(),
+                "daysUntilDue": (row.data_proxima_manutencao - today).days,
+                "driverName": row.nome,
+                "driverId": row.id_condutor,
+                "lastMaintenanceRecord": {
+                    "id": row.id_manutencao,
+                    "date": row.data_manutencao.isoformat() if row.data_manutencao else None,
+                    "type": row.tipo,
+                    "mileage": row.quilometragem,
+                    "mechanicName": row.nome_mecanico,
+                }
+                if row.id_manutencao
+                else None,
+            }
+        )
+
+    return jsonify(response)
+
+
+def _parse_period():
+    """
+    ?from= / ?to= (YYYY-MM-DD, inclusive; padrão: últimos 30 dias) como
+    datetimes [início, fim) em UTC. Retorna (start, end, erro).
+    """
+    today = date.today()
+    end_day = parse_date(request.args.get("to")) if request.args.get("to") else today
+    if end_day is None:
+        return None, None, "Parâmetro 'to' inválido"
+    start_day = (
+        parse_date(request.args.get("from"))
+        if request.args.get("from")
+        else end_day - timedelta(days=29)
+    )
+    if start_day is None:
+        return None, None, "Parâmetro 'from' inválido"
+    if end_day < start_day:
+        return None, None, "'to' deve ser maior ou igual a 'from'"
+    start = datetime.combine(start_day, datetime.min.time())
+    end = datetime.combine(end_day + timedelta(days=1), datetime.min.time())
+    return start, end, None
+
+
+@truck_bp.route("/availability", methods=["GET"])
+def get_trucks_availability():
+    """
+    Disponibilidade e tempo parado por caminhão no período, calculados a partir
+    do histórico de status (historico_status_caminhao).
+
+    Parâmetros: ?from= / ?to= (YYYY-MM-DD, padrão últimos 30 dias) e
+    ?truckIds=1,2 (opcional, padrão todos).
+    """
+    start, end, error = _parse_period()
+    if error:
+        return jsonify({"error": error}), 400
+
+    truck_ids = None
+    if request.args.get("truckIds"):
+        try:
+            truck_ids = [int(i) for i in request.args["truckIds"].split(",") if i.strip()]
+        except ValueError:
+            return jsonify({"error": "Parâmetro 'truckIds' inválido"}), 400
+
+    return jsonify(availability(start, end, truck_ids))
+
+
+@truck_bp.route("/<int:truck_id>/status-history", methods=["GET"])
+def get_truck_status_history(truck_id):
+    """Transições de status do caminhão no período (?from=, ?to=, ?limit= padrão 100, teto 1000)."""
+    start, end, error = _parse_period()
+    if error:
+        return jsonify({"error": error}), 400
+    limit = max(1, min(request.args.get("limit", default=100, type=int) or 100, 1000))
+    return jsonify([item.to_dict() for item in status_history(truck_id, start, end, limit)])
+
+
+@truck_bp.route("/<int:truck_id>/timeline", methods=["GET"])
+def get_truck_timeline(truck_id):
+    """
+    Manutenções, notificações e vínculos de motorista do caminhão, mais recentes
+    primeiro. ?limit= (padrão 50, teto 200) e ?cursor= ("nextCursor" da página anterior).
+    """
+    if db.session.get(Caminhao, truck_id) is None:
+        return jsonify({"error": "Caminhão não encontrado"}), 404
+    limit = max(1, min(request.args.get("limit", default=50, type=int) or 50, 200))
+    try:
+        items, next_cursor = truck_timeline(truck_id, limit, request.args.get("cursor"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify({"items": items, "nextCursor": next_cursor})
+
+
+_STATUSES = ("liberado", "bloqueado", "pendente")
+
+
+def _manual_status_alert(truck_id, plate, status):
+    """Notificação de alteração manual de status: (title, message, db_type, truck_id)."""
+    if status == "bloqueado":
+        return (
+            f"Bloqueio manual: {plate}",
+            f"O caminhão {plate} foi bloqueado manualmente.",
+            "manutencao",
+            truck_id,
+        )
+    if status == "liberado":
+        return (
+            f"Liberação manual: {plate}",
+            f"O caminhão {plate} foi liberado manualmente para uso.",
+            "info",
+            truck_id,
+        )
+    return (
+        f"Status pendente: {plate}",
+        f"O caminhão {plate} foi marcado manualmente como pendente de manutenção.",
+        "alerta",
+        None,
+    )
 
 
 @truck_bp.route("/<int:truck_id>/status", methods=["PATCH"])
@@ -149,7 +475,7 @@ def update_truck_status(truck_id):
     data = request.get_json() or {}
 
     status = data.get("status")
-    if status not in ("liberado", "bloqueado", "pendente"):
+    if status not in _STATUSES:
         return jsonify({"error": "Status inválido"}), 400
 
     old_status = caminhao.status
@@ -157,39 +483,131 @@ def update_truck_status(truck_id):
 
     # Gera notificação específica para alteração manual de status
     if status != old_status:
-        if status == "bloqueado":
-            create_system_notification(
-                title=f"Bloqueio manual: {caminhao.placa}",
-                message=f"O caminhão {caminhao.placa} foi bloqueado manualmente.",
-                db_type="manutencao",
-                truck_id=caminhao.id_caminhao,
-            )
-        elif status == "liberado":
-            create_system_notification(
-                title=f"Liberação manual: {caminhao.placa}",
-                message=(
-                    f"O caminhão {caminhao.placa} foi liberado manualmente para uso."
-                ),
-                db_type="info",
-                truck_id=caminhao.id_caminhao,
-            )
-        elif status == "pendente":
-            create_system_notification(
-                title=f"Status pendente: {caminhao.placa}",
-                message=(
-                    f"O caminhão {caminhao.placa} foi marcado manualmente como "
-                    f"pendente de manutenção."
-                ),
-                db_type="alerta",
-            )
+        create_system_notification(
+            *_manual_status_alert(caminhao.id_caminhao, caminhao.placa, status), dedupe=False
+        )
 
     db.session.commit()
     return jsonify(caminhao.to_dict())
 
 
+def _bulk_status_criteria(data):
+    """
+    Filtro do PATCH /trucks/status: "ids" (lista) ou "filter" com status,
+    model, dueFrom e/ou dueTo (próxima manutenção, YYYY-MM-DD). Retorna
+    (critérios, erro).
+    """
+    if ("ids" in data) == ("filter" in data):
+        return None, "Informe 'ids' ou 'filter'"
+
+    if "ids" in data:
+        ids = data["ids"]
+        if not isinstance(ids, list) or not ids or not all(isinstance(i, int) for i in ids):
+            return None, "'ids' deve ser uma lista de inteiros"
+        return [Caminhao.id_caminhao.in_(sorted(set(ids)))], None
+
+    filters = data["filter"]
+    if not isinstance(filters, dict) or not filters:
+        return None, "'filter' deve ter ao menos um critério"
+    unknown = sorted(set(filters) - {"status", "model", "dueFrom", "dueTo"})
+    if unknown:
+        return None, f"Filtros inválidos: {', '.join(unknown)}"
+
+    criteria = []
+    if "status" in filters:
+        statuses = filters["status"] if isinstance(filters["status"], list) else [filters["status"]]
+        if not statuses or any(s not in _STATUSES for s in statuses):
+            return None, "Status inválido no filtro"
+        criteria.append(Caminhao.status.in_(statuses))
+    if "model" in filters:
+        criteria.append(Caminhao.modelo == filters["model"])
+    if "dueFrom" in filters:
+        due_from = parse_date(filters["dueFrom"])
+        if due_from is None:
+            return None, "'dueFrom' inválido"
+        criteria.append(Caminhao.data_proxima_manutencao >= due_from)
+    if "dueTo" in filters:
+        due_to = parse_date(filters["dueTo"])
+        if due_to is None:
+            return None, "'dueTo' inválido"
+        criteria.append(Caminhao.data_proxima_manutencao <= due_to)
+    return criteria, None
+
+
+@truck_bp.route("/status", methods=["PATCH"])
+def update_trucks_status():
+    """
+    Altera o status de vários caminhões de uma vez.
+
+    Corpo: {"status": "bloqueado", "ids": [1, 2]} ou
+           {"status": "liberado", "filter": {"status": "pendente", "dueTo": "2025-01-31"}}
+
+    Uma única transação: trava as linhas, aplica um UPDATE, grava o histórico de
+    status e as notificações de todos os caminhões em lote.
+    """
+    data = request.get_json() or {}
+    status = data.get("status")
+    if status not in _STATUSES:
+        return jsonify({"error": "Status inválido"}), 400
+
+    criteria, error = _bulk_status_criteria(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    # Ordem fixa de travamento (evita deadlock entre dois PATCH em lote)
+    matched = db.session.execute(
+        select(Caminhao.id_caminhao, Caminhao.placa, Caminhao.status)
+        .where(*criteria)
+        .order_by(Caminhao.id_caminhao)
+        .with_for_update()
+    ).all()
+    changed = [row for row in matched if row.status != status]
+
+    if changed:
+        truck_ids = [row.id_caminhao for row in changed]
+        db.session.execute(
+            update(Caminhao)
+            .where(Caminhao.id_caminhao.in_(truck_ids))
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+        record_status_changes(
+            db.session.connection(),
+            [(row.id_caminhao, row.status, status) for row in changed],
+        )
+        create_system_notifications(
+            [_manual_status_alert(row.id_caminhao, row.placa, status) for row in changed],
+            source="bulk_status",
+            dedupe=False,
+        )
+    db.session.commit()
+
+    return jsonify({
+        "status": status,
+        "matched": len(matched),
+        "updated": len(changed),
+        "truckIds": [row.id_caminhao for row in changed],
+    })
+
+
+def _plate_taken(plate, truck_id=None):
+    """
+    Placa já usada por outro caminhão, incluindo os excluídos ainda não
+    purgados (a linha continua lá e a coluna é única).
+    """
+    if not plate:
+        return False
+    query = Caminhao.query.filter(Caminhao.placa == plate)
+    if truck_id is not None:
+        query = query.filter(Caminhao.id_caminhao != truck_id)
+    return query.execution_options(include_deleted=True).first() is not None
+
+
 @truck_bp.route("/", methods=["POST"])
 def create_truck():
     data = request.get_json()
+    if _plate_taken(data.get("plate")):
+        return jsonify({"error": "Placa já cadastrada"}), 400
     caminhao = Caminhao(
         placa=data.get("plate"),
         modelo=data.get("model"),
@@ -210,6 +628,8 @@ def update_truck(truck_id):
 
     old_next_maintenance = caminhao.data_proxima_manutencao
 
+    if "plate" in data and _plate_taken(data["plate"], truck_id):
+        return jsonify({"error": "Placa já cadastrada"}), 400
     if "plate" in data:
         caminhao.placa = data["plate"]
     if "model" in data:
@@ -244,6 +664,7 @@ def update_truck(truck_id):
             nome_mecanico="Sistema",
         )
         db.session.add(manutencao)
+        record_maintenance_created(manutencao)
 
     db.session.commit()
     return jsonify(caminhao.to_dict())
@@ -252,7 +673,8 @@ def update_truck(truck_id):
 @truck_bp.route("/<int:truck_id>", methods=["DELETE"])
 def delete_truck(truck_id):
     caminhao = Caminhao.query.get_or_404(truck_id)
-    db.session.delete(caminhao)
+    # Exclusão lógica: manutenções, notificações e vínculos saem depois, no purgador
+    soft_delete(caminhao)
     db.session.commit()
     return jsonify({"message": "Caminhão removido com sucesso"})
 
@@ -1,8 +1,10 @@
 from flask import Blueprint, request, jsonify
-from models import Usuario, Condutor, Notificacao, CaminhaoCondutor
+from models import Usuario, Condutor, CaminhaoCondutor
 from database import db
 from werkzeug.security import generate_password_hash
 from datetime import date
+from services.read_models import USERS
+from services.soft_delete import soft_delete
 
 user_bp = Blueprint("users", __name__, url_prefix="/users")
 
@@ -101,10 +103,26 @@ def _ensure_link(condutor, truck_id):
                 )
             )
 
+def _cnh_taken(cnh, condutor=None):
+    """
+    CNH já usada por outro condutor, incluindo os de usuários excluídos ainda
+    não purgados (a linha continua lá e a coluna é única).
+    """
+    query = Condutor.query.filter(Condutor.cnh == cnh)
+    if condutor is not None:
+        query = query.filter(Condutor.id_condutor != condutor.id_condutor)
+    return query.execution_options(include_deleted=True).first() is not None
+
+
 @user_bp.route("/", methods=["GET"])
 def get_users():
-    users = Usuario.query.all()
-    return jsonify([u.to_dict() for u in users])
+    try:
+        keys = USERS.keys_from_args(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    rows = db.session.execute(USERS.select(keys).order_by(Usuario.id_usuario))
+    return jsonify(USERS.to_dicts(rows, keys))
 
 # @user_bp.route("/", methods=["POST"])
 # def create_user():
@@ -141,7 +159,8 @@ def create_user():
         return jsonify({"message": "Nome, email e perfil são obrigatórios"}), 400
 
     # Evita email duplicado
-    if Usuario.query.filter_by(email=email).first():
+    # (inclui excluídos ainda não purgados: o email continua reservado até lá)
+    if Usuario.query.filter_by(email=email).execution_options(include_deleted=True).first():
         return jsonify({"message": "Email já cadastrado"}), 400
 
     # Cria o usuário
@@ -163,6 +182,9 @@ def create_user():
         if not cnh:
             db.session.rollback()
             return jsonify({"message": "CNH é obrigatória para motoristas"}), 400
+        if _cnh_taken(cnh):
+            db.session.rollback()
+            return jsonify({"message": "CNH já cadastrada"}), 400
 
         condutor = Condutor(
             nome=nome,
@@ -193,11 +215,11 @@ def update_user(user_id):
     telefone = data.get("telefone")
     id_caminhao = _parse_int(data.get("id_caminhao"))
 
-    # Evita email duplicado
+    # Evita email duplicado (inclui excluídos ainda não purgados)
     if email and Usuario.query.filter(
         Usuario.email == email,
         Usuario.id_usuario != user.id_usuario
-    ).first():
+    ).execution_options(include_deleted=True).first():
         return jsonify({"message": "Email já cadastrado"}), 400
 
     if nome is not None:
@@ -212,6 +234,9 @@ def update_user(user_id):
     # Lógica de condutor (motorista)
     condutor = Condutor.query.filter_by(id_usuario=user.id_usuario).first()
 
+    if cnh and _cnh_taken(cnh, condutor):
+        return jsonify({"message": "CNH já cadastrada"}), 400
+
     # Se mudou o perfil para algo que NÃO é motorista, apaga o condutor
     if profile is not None and profile != "motorista":
         if condutor:
@@ -254,15 +279,8 @@ def update_user(user_id):
 def _delete_user(id_usuario):
     usuario = Usuario.query.get(id_usuario)
     if usuario:
-        condutor = Condutor.query.filter_by(id_usuario=id_usuario).first()
-        if condutor:
-            # Remove vínculos históricos antes da exclusão para evitar erro de FK
-            CaminhaoCondutor.query.filter_by(id_condutor=condutor.id_condutor).delete()
-            condutor.id_caminhao = None
-            db.session.delete(condutor)
-
-        Notificacao.query.filter_by(id_usuario=id_usuario).delete()
-        db.session.delete(usuario)
+        # Exclusão lógica: condutor, vínculos e notificações saem depois, no purgador
+        soft_delete(usuario)
         db.session.commit()
 
         return jsonify({"message": "Motorista e seus vínculos excluídos com sucesso."}), 200
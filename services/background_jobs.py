@@ -0,0 +1,39 @@
+# backend/services/background_jobs.py
+
+import threading
+import time
+
+from database import db
+
+_started = set()
+_lock = threading.Lock()
+
+
+def start_periodic_job(app, name: str, interval_seconds: float, job):
+    """
+    Roda `job(app)` a cada `interval_seconds` numa thread daemon do processo.
+    Cada rodada tem seu próprio app context / sessão. Chamadas repetidas com o
+    mesmo `name` são ignoradas (um job por processo).
+    """
+    with _lock:
+        if name in _started:
+            return
+        _started.add(name)
+
+    def loop():
+        while True:
+            time.sleep(interval_seconds)
+            with app.app_context():
+                try:
+                    result = job(app)
+                    if result:
+                        app.logger.info("Job %s processou %s registros", name, result)
+                except Exception:  # pragma: no cover - só loga e tenta na próxima rodada
+                    db.session.rollback()
+                    app.logger.exception("Erro no job em background %s", name)
+                finally:
+                    db.session.remove()
+
+    thread = threading.Thread(target=loop, name=f"job-{name}", daemon=True)
+    thread.start()
+    return thread
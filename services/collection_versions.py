@@ -0,0 +1,93 @@
+# backend/services/collection_versions.py
+
+from sqlalchemy import bindparam, event, select
+
+from database import db
+from models import VersaoColecao
+from utils.upsert import upsert_increment
+
+# Tabela alterada -> coleções cujo JSON depende dela
+TABLE_COLLECTIONS = {
+    # Exclusão lógica esconde também as manutenções/notificações do caminhão
+    # e o condutor do usuário (services/soft_delete.py)
+    "caminhoes": ("trucks", "maintenances", "notifications"),
+    "condutores": ("trucks", "notifications"),
+    "caminhoes_condutores": ("notifications",),
+    "manutencoes": ("maintenances",),
+    "notificacoes": ("notifications",),
+    "eventos_notificacao": ("notifications",),
+    "leituras_notificacao": ("notifications",),
+    "usuarios": ("trucks", "notifications"),
+}
+
+# Coleções a incrementar no commit da transação atual (session.info)
+_PENDING = "collection_versions_pending"
+
+_VERSION = select(VersaoColecao.versao).where(VersaoColecao.colecao == bindparam("colecao"))
+
+
+def collection_version(name):
+    """Versão atual da coleção (0 se nunca foi escrita)."""
+    return db.session.scalar(_VERSION, {"colecao": name}) or 0
+
+
+def bump_collection_versions(names):
+    """
+    Marca as coleções para incrementar no commit da transação atual. Os
+    incrementos rodam todos juntos no before_commit, depois de todas as outras
+    escritas: a linha da versão, disputada por todas as transações, fica
+    travada só no fim, e sempre na mesma ordem.
+    """
+    db.session.info.setdefault(_PENDING, set()).update(names)
+
+
+@event.listens_for(db.session, "before_commit")
+def _apply_pending_bumps(session):
+    if session.in_nested_transaction():
+        # Savepoint (begin_nested): só o commit da transação externa incrementa
+        return
+    # O flush final ainda pode marcar coleções (hooks de after_flush)
+    session.flush()
+    names = session.info.pop(_PENDING, None)
+    # Ordem fixa: duas transações nunca travam as linhas em ordens diferentes
+    for name in sorted(names or ()):
+        upsert_increment(VersaoColecao, {"colecao": name}, {"versao": 1})
+
+
+@event.listens_for(db.session, "after_transaction_end")
+def _discard_pending_bumps(session, transaction):
+    # Rollback da transação externa: nada foi gravado, nada a invalidar. Em
+    # savepoint desfeito as marcas ficam (incrementar a mais é inofensivo)
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+
+def _collections_for_tables(tables):
+    names = set()
+    for table in tables:
+        names.update(TABLE_COLLECTIONS.get(table, ()))
+    return names
+
+
+@event.listens_for(db.session, "after_flush")
+def _bump_after_flush(session, flush_context):
+    tables = {obj.__table__.name for obj in session.new}
+    tables.update(obj.__table__.name for obj in session.deleted)
+    tables.update(
+        obj.__table__.name for obj in session.dirty
+        if session.is_modified(obj, include_collections=False)
+    )
+    names = _collections_for_tables(tables)
+    if names:
+        bump_collection_versions(names)
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def _bump_on_bulk_write(orm_execute_state):
+    """UPDATE/DELETE/INSERT em lote via session.execute() não passam pelo flush."""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    names = _collections_for_tables([getattr(table, "name", None)])
+    if names:
+        bump_collection_versions(names)
@@ -1,6 +1,8 @@
 from email.message import EmailMessage
 import smtplib
+import time
 from flask import current_app
+from utils.metrics import EMAIL_SEND_LATENCY
 
 
 def send_email(subject: str, recipients: list[str], body: str, html: str | None = None) -> None:
@@ -27,8 +29,14 @@ def send_email(subject: str, recipients: list[str], body: str, html: str | None
     if html:
         message.add_alternative(html, subtype="html")
 
-    with smtplib.SMTP(mail_server, mail_port) as server:
-        if mail_use_tls:
-            server.starttls()
-        server.login(mail_username, mail_password)
-        server.send_message(message)
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        with smtplib.SMTP(mail_server, mail_port) as server:
+            if mail_use_tls:
+                server.starttls()
+            server.login(mail_username, mail_password)
+            server.send_message(message)
+        outcome = "success"
+    finally:
+        EMAIL_SEND_LATENCY.labels(outcome).observe(time.perf_counter() - started)
@@ -1,9 +1,17 @@
 # backend/services/maintenance_alerts.py
 
+import time
+from collections import Counter
 from datetime import date, timedelta
 from database import db
 from models import Caminhao, Notificacao, Usuario, Condutor, CaminhaoCondutor
-from sqlalchemy import or_
+from sqlalchemy import bindparam, or_, select
+from utils.metrics import record_sweep, record_notifications
+from utils.db_routing import primary_only
+from utils.singleflight import sweeps
+from services.notification_digest import DigestBatch, digest_enabled
+from services.notification_feed import EventBatch, events_mode, publish_event
+from services.status_history import status_origin
 
 
 # def update_truck_status_and_notifications():
@@ -104,44 +112,115 @@ from sqlalchemy import or_
 
 #     db.session.commit()
 
+# Statements montados uma vez, com parâmetros via bindparam: cada chamada só
+# troca os valores e reaproveita a compilação guardada no cache do engine.
+TRUCK_DRIVER_USERS = (
+    select(Usuario)
+    .join(Condutor, Condutor.id_usuario == Usuario.id_usuario)
+    .join(CaminhaoCondutor, CaminhaoCondutor.id_condutor == Condutor.id_condutor)
+    .where(
+        CaminhaoCondutor.id_caminhao == bindparam("truck_id"),
+        or_(
+            CaminhaoCondutor.ativo == True,  # noqa: E712
+            CaminhaoCondutor.data_fim.is_(None),
+            CaminhaoCondutor.data_fim >= bindparam("cutoff"),
+        ),
+    )
+)
+TRUCK_FALLBACK_DRIVER_USER = (
+    select(Usuario)
+    .join(Condutor, Condutor.id_usuario == Usuario.id_usuario)
+    .where(Condutor.id_caminhao == bindparam("truck_id"))
+    .limit(1)
+)
+TRUCKS_DRIVER_USERS = (
+    select(CaminhaoCondutor.id_caminhao, Usuario)
+    .join(Condutor, Condutor.id_usuario == Usuario.id_usuario)
+    .join(CaminhaoCondutor, CaminhaoCondutor.id_condutor == Condutor.id_condutor)
+    .where(
+        CaminhaoCondutor.id_caminhao.in_(bindparam("truck_ids", expanding=True)),
+        or_(
+            CaminhaoCondutor.ativo == True,  # noqa: E712
+            CaminhaoCondutor.data_fim.is_(None),
+            CaminhaoCondutor.data_fim >= bindparam("cutoff"),
+        ),
+    )
+)
+TRUCKS_FALLBACK_DRIVER_USERS = (
+    select(Condutor.id_caminhao, Usuario)
+    .join(Condutor, Condutor.id_usuario == Usuario.id_usuario)
+    .where(Condutor.id_caminhao.in_(bindparam("truck_ids", expanding=True)))
+    .order_by(Condutor.id_condutor)
+)
+UNREAD_NOTIFICATION_EXISTS = (
+    select(Notificacao.id_notificacao)
+    .where(
+        Notificacao.id_usuario == bindparam("user_id"),
+        Notificacao.id_caminhao == bindparam("truck_id"),
+        Notificacao.tipo == bindparam("tipo"),
+        Notificacao.titulo == bindparam("titulo"),
+        Notificacao.visualizado == False,  # noqa: E712
+    )
+    .limit(1)
+)
+
+
 def get_truck_driver_users(truck_id: int, include_history_days: int = 30):
     """Retorna usuários motoristas vinculados (ativos ou recentes) a um caminhão."""
     if not truck_id:
         return []
 
     cutoff = date.today() - timedelta(days=include_history_days)
-    vinculos = (
-        CaminhaoCondutor.query
-        .join(Condutor)
-        .join(Usuario)
-        .filter(
-            CaminhaoCondutor.id_caminhao == truck_id,
-            or_(
-                CaminhaoCondutor.ativo == True,  # noqa: E712
-                CaminhaoCondutor.data_fim.is_(None),
-                CaminhaoCondutor.data_fim >= cutoff,
-            ),
-        )
-        .all()
+    linked_users = db.session.scalars(
+        TRUCK_DRIVER_USERS, {"truck_id": truck_id, "cutoff": cutoff}
     )
 
     users = []
     seen_ids = set()
-    for vinculo in vinculos:
-        usuario = vinculo.condutor.usuario if vinculo.condutor else None
-        if usuario and usuario.id_usuario not in seen_ids:
+    for usuario in linked_users:
+        if usuario.id_usuario not in seen_ids:
             users.append(usuario)
             seen_ids.add(usuario.id_usuario)
 
     # Fallback para bases antigas sem registro em caminhões_condutores
     if not users:
-        condutor = Condutor.query.filter_by(id_caminhao=truck_id).first()
-        if condutor and condutor.usuario and condutor.usuario.id_usuario not in seen_ids:
-            users.append(condutor.usuario)
+        usuario = db.session.scalars(TRUCK_FALLBACK_DRIVER_USER, {"truck_id": truck_id}).first()
+        if usuario:
+            users.append(usuario)
 
     return users
 
 
+def get_drivers_by_truck(truck_ids, include_history_days: int = 30):
+    """
+    Versão em lote de get_truck_driver_users: {id_caminhao: [usuários]} para
+    vários caminhões em uma consulta (mais uma para o fallback).
+    """
+    truck_ids = sorted({truck_id for truck_id in truck_ids if truck_id})
+    if not truck_ids:
+        return {}
+
+    cutoff = date.today() - timedelta(days=include_history_days)
+    drivers = {}
+    for truck_id, usuario in db.session.execute(
+        TRUCKS_DRIVER_USERS, {"truck_ids": truck_ids, "cutoff": cutoff}
+    ):
+        users = drivers.setdefault(truck_id, [])
+        if all(u.id_usuario != usuario.id_usuario for u in users):
+            users.append(usuario)
+
+    # Fallback para bases antigas sem registro em caminhões_condutores
+    missing = [truck_id for truck_id in truck_ids if truck_id not in drivers]
+    if missing:
+        for truck_id, usuario in db.session.execute(TRUCKS_FALLBACK_DRIVER_USERS, {"truck_ids": missing}):
+            drivers.setdefault(truck_id, [usuario])
+
+    return drivers
+
+
+@sweeps.wrap("sweep:maintenance_alerts")
+@primary_only
+@status_origin("sweep:maintenance_alerts")
 def update_truck_status_and_notifications():
     """Atualiza status dos caminhões e gera notificações automáticas
     com base na data_proxima_manutencao.
@@ -149,10 +228,17 @@ def update_truck_status_and_notifications():
     - No dia: status 'pendente' + notificação de dia de manutenção
     - Após a data: status 'bloqueado' + notificação de caminhão bloqueado
 
-    Admins e mecânicos recebem de todos os caminhões.
+    Admins e mecânicos recebem de todos os caminhões (no resumo diário, se
+    NOTIFICATION_DIGEST_ENABLED).
     Motorista recebe apenas do caminhão vinculado a ele (via tabela condutores).
     """
+    started = time.perf_counter()
+    transitions = Counter()
+    inserted = deduplicated = 0
     today = date.today()
+    # Modo events: um evento por alerta, destinatários resolvidos na leitura
+    events = EventBatch("sweep") if events_mode() else None
+    digest = DigestBatch("sweep", today) if events is None and digest_enabled() else None
 
     # Apenas caminhões que têm data_proxima_manutencao definida
     trucks = Caminhao.query.filter(Caminhao.data_proxima_manutencao.isnot(None)).all()
@@ -215,14 +301,23 @@ def update_truck_status_and_notifications():
         # Atualiza o status do caminhão, se mudou
         if new_status != truck.status:
             truck.status = new_status
+            transitions[new_status] += 1
 
         # Se não há notificação pra esse caminhão, passa pro próximo
         if not (notif_type and title and message):
             continue
 
+        if events is not None:
+            events.add(title, message, notif_type, truck.id_caminhao)
+            continue
+
         # ---- DEFINIÇÃO DE DESTINATÁRIOS POR CAMINHÃO ----
-        # Começa com admins/mecânicos
-        recipients = list(base_users)
+        # Admins/mecânicos: uma entrada no resumo do dia ou uma notificação cada
+        if digest is not None:
+            digest.add(base_users, title, message, notif_type, truck.id_caminhao)
+            recipients = []
+        else:
+            recipients = list(base_users)
 
         motoristas = get_truck_driver_users(truck.id_caminhao)
         for motorista in motoristas:
@@ -231,15 +326,14 @@ def update_truck_status_and_notifications():
 
         # Gera notificações (evitando duplicar a mesma notificação enquanto não lida)
         for user in recipients:
-            exists = (
-                Notificacao.query.filter_by(
-                    id_usuario=user.id_usuario,
-                    id_caminhao=truck.id_caminhao,
-                    tipo=notif_type,
-                    titulo=title,
-                )
-                .filter(Notificacao.visualizado == False)
-                .first()
+            exists = db.session.scalar(
+                UNREAD_NOTIFICATION_EXISTS,
+                {
+                    "user_id": user.id_usuario,
+                    "truck_id": truck.id_caminhao,
+                    "tipo": notif_type,
+                    "titulo": title,
+                },
             )
 
             if not exists:
@@ -251,13 +345,35 @@ def update_truck_status_and_notifications():
                     tipo=notif_type,
                 )
                 db.session.add(notif)
-
+                inserted += 1
+            else:
+                deduplicated += 1
+
+    if events is not None:
+        events.flush()
+    if digest is not None:
+        digest.flush()
     db.session.commit()
+    record_sweep("maintenance_alerts", started, transitions)
+    record_notifications("sweep", inserted, deduplicated)
 
 def send_unlock_notification(caminhao):
     if not caminhao:
         return
 
+    if events_mode():
+        publish_event(
+            "unlock",
+            f"Caminhão {caminhao.placa} desbloqueado",
+            f"O caminhão {caminhao.placa} foi desbloqueado e agora pode ser utilizado novamente.",
+            "info",
+            caminhao.id_caminhao,
+            staff=False,
+            dedupe=False,
+        )
+        db.session.commit()
+        return
+
     motoristas = get_truck_driver_users(caminhao.id_caminhao, include_history_days=90)
     if not motoristas:
         return
@@ -275,5 +391,6 @@ def send_unlock_notification(caminhao):
         db.session.add(notificacao)
 
     db.session.commit()
+    record_notifications("unlock", inserted=len(motoristas))
 
 
@@ -0,0 +1,150 @@
+# backend/services/maintenance_calendar.py
+"""
+Calendário de manutenções (GET /maintenances/calendar?month=YYYY-MM).
+
+Por dia do mês: manutenções previstas (caminhoes.data_proxima_manutencao) e
+realizadas (manutencoes.data_manutencao), por tipo, em duas consultas
+agrupadas por range nos índices de data.
+
+Cada mês tem a sua versão em versoes_colecao ("calendar:YYYY-MM"), que entra
+na chave do snapshot da resposta. O after_flush abaixo incrementa só os meses
+das datas alteradas (valor antigo e novo), então editar uma manutenção de
+março não invalida o cache de outubro. UPDATEs em lote que mexam nessas datas
+precisam chamar bump_calendar_months().
+"""
+
+from datetime import date
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm.attributes import get_history
+
+from database import db
+from models import Caminhao, Manutencao, ResumoManutencaoMensal
+from services.collection_versions import bump_collection_versions, collection_version
+
+TYPES = ("preventiva", "corretiva")
+
+
+def parse_month(value):
+    """'YYYY-MM' -> date do dia 1º (ValueError se inválido)."""
+    year, month = value.split("-")
+    return date(int(year), int(month), 1)
+
+
+def _next_month(month_start):
+    if month_start.month == 12:
+        return date(month_start.year + 1, 1, 1)
+    return date(month_start.year, month_start.month + 1, 1)
+
+
+def month_key(value):
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def calendar_version(month_start):
+    return collection_version(f"calendar:{month_key(month_start)}")
+
+
+def bump_calendar_months(dates):
+    bump_collection_versions(f"calendar:{month_key(value)}" for value in dates if value)
+
+
+def _empty_counts():
+    return {**dict.fromkeys(TYPES, 0), "total": 0}
+
+
+def maintenance_calendar(month_start):
+    start, end = month_start, _next_month(month_start)
+    days = {}
+
+    def add(day, kind, tipo, count):
+        entry = days.setdefault(day, {"scheduled": _empty_counts(), "completed": _empty_counts()})
+        entry[kind][tipo] += count
+        entry[kind]["total"] += count
+
+    # Previstas: o caminhão não guarda tipo para a próxima manutenção, que é a
+    # revisão periódica (a tela de Frota registra como preventiva)
+    scheduled = db.session.execute(
+        select(Caminhao.data_proxima_manutencao, func.count(Caminhao.id_caminhao))
+        .where(Caminhao.data_proxima_manutencao >= start, Caminhao.data_proxima_manutencao < end)
+        .group_by(Caminhao.data_proxima_manutencao)
+    )
+    for day, count in scheduled:
+        add(day, "scheduled", "preventiva", count)
+
+    completed = db.session.execute(
+        select(Manutencao.data_manutencao, Manutencao.tipo, func.count(Manutencao.id_manutencao))
+        .where(Manutencao.data_manutencao >= start, Manutencao.data_manutencao < end)
+        .group_by(Manutencao.data_manutencao, Manutencao.tipo)
+    )
+    for day, tipo, count in completed:
+        add(day, "completed", tipo, count)
+
+    totals = {"scheduled": _empty_counts(), "completed": _empty_counts()}
+    for entry in days.values():
+        for kind, counts in entry.items():
+            for key, count in counts.items():
+                totals[kind][key] += count
+
+    return {
+        "month": month_key(month_start),
+        "days": [{"date": day.isoformat(), **days[day]} for day in sorted(days)],
+        "totals": totals,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Invalidação por mês
+# ---------------------------------------------------------------------------
+# Carrega o valor antigo ao atribuir, para invalidar também o mês de origem
+@event.listens_for(Caminhao.data_proxima_manutencao, "set", active_history=True)
+@event.listens_for(Manutencao.data_manutencao, "set", active_history=True)
+def _keep_previous_date(target, value, oldvalue, initiator):
+    pass
+
+
+def _dates(obj, attribute):
+    history = get_history(obj, attribute)
+    return [*(history.added or ()), *(history.unchanged or ()), *(history.deleted or ())]
+
+
+@event.listens_for(db.session, "after_flush")
+def _bump_calendar_after_flush(session, flush_context):
+    dates = set()
+    removed_trucks = set()
+
+    for obj in session.new:
+        if isinstance(obj, Manutencao):
+            dates.add(obj.data_manutencao)
+        elif isinstance(obj, Caminhao):
+            dates.add(obj.data_proxima_manutencao)
+    for obj in session.deleted:
+        if isinstance(obj, Manutencao):
+            dates.update(_dates(obj, "data_manutencao"))
+        elif isinstance(obj, Caminhao):
+            dates.update(_dates(obj, "data_proxima_manutencao"))
+            removed_trucks.add(obj.id_caminhao)
+    for obj in session.dirty:
+        if isinstance(obj, Manutencao):
+            if get_history(obj, "data_manutencao").has_changes() or get_history(obj, "tipo").has_changes():
+                dates.update(_dates(obj, "data_manutencao"))
+        elif isinstance(obj, Caminhao):
+            if get_history(obj, "data_proxima_manutencao").has_changes():
+                dates.update(_dates(obj, "data_proxima_manutencao"))
+            if get_history(obj, "excluido_em").has_changes():
+                # Exclusão lógica esconde todas as manutenções do caminhão
+                dates.update(_dates(obj, "data_proxima_manutencao"))
+                removed_trucks.add(obj.id_caminhao)
+
+    if removed_trucks:
+        # Meses com manutenção do caminhão, pelo rollup (PK começa em id_caminhao)
+        rollups = ResumoManutencaoMensal.__table__
+        dates.update(
+            session.connection().execute(
+                select(rollups.c.mes).where(rollups.c.id_caminhao.in_(removed_trucks)).distinct()
+            ).scalars()
+        )
+
+    dates.discard(None)
+    if dates:
+        bump_calendar_months(dates)
@@ -0,0 +1,139 @@
+# backend/services/maintenance_forecast.py
+
+from datetime import date, datetime
+
+import numpy as np
+from sqlalchemy import delete, insert
+
+from database import db
+from models import Caminhao, Manutencao, PrevisaoManutencao
+
+
+def load_mileage_history():
+    """
+    Carrega o histórico de quilometragem da frota inteira em arrays colunares,
+    ordenados por (caminhão, data). Retorna um dict de arrays NumPy.
+    """
+    rows = (
+        db.session.query(
+            Manutencao.id_caminhao,
+            Manutencao.data_manutencao,
+            Manutencao.quilometragem,
+            Manutencao.tipo,
+        )
+        .filter(
+            Manutencao.quilometragem.isnot(None),
+            Manutencao.data_manutencao.isnot(None),
+        )
+        .order_by(Manutencao.id_caminhao, Manutencao.data_manutencao, Manutencao.id_manutencao)
+        .all()
+    )
+
+    if not rows:
+        return {
+            "truck_ids": np.empty(0, dtype=np.int64),
+            "days": np.empty(0, dtype=np.int64),
+            "km": np.empty(0, dtype=np.float64),
+            "preventive": np.empty(0, dtype=bool),
+        }
+
+    truck_ids, dates, km, tipos = zip(*rows)
+    return {
+        "truck_ids": np.fromiter(truck_ids, dtype=np.int64, count=len(rows)),
+        "days": np.fromiter((d.toordinal() for d in dates), dtype=np.int64, count=len(rows)),
+        "km": np.fromiter(km, dtype=np.float64, count=len(rows)),
+        "preventive": np.fromiter((t == "preventiva" for t in tipos), dtype=bool, count=len(rows)),
+    }
+
+
+def compute_forecasts(history, current_km, interval_km):
+    """
+    Calcula, sem laços por caminhão, a taxa de km/dia (regressão linear
+    km x data de cada caminhão) e a data prevista para atingir a próxima
+    quilometragem de manutenção.
+
+    - history: saída de load_mileage_history()
+    - current_km: dict {id_caminhao: quilometragem_atual}
+    - interval_km: intervalo de km entre manutenções preventivas
+
+    A quilometragem alvo é a da última preventiva + interval_km; sem
+    preventiva registrada, usa o próximo múltiplo de interval_km.
+    """
+    truck_ids = history["truck_ids"]
+    if truck_ids.size == 0:
+        return []
+
+    # Centraliza as datas para não perder precisão nas somas
+    x = (history["days"] - history["days"].min()).astype(np.float64)
+    y = history["km"]
+
+    # Início de cada grupo (caminhão) no array ordenado
+    starts = np.flatnonzero(np.r_[True, truck_ids[1:] != truck_ids[:-1]])
+    ends = np.r_[starts[1:], truck_ids.size] - 1
+    ids = truck_ids[starts]
+    n = np.diff(np.r_[starts, truck_ids.size]).astype(np.float64)
+
+    sx = np.add.reduceat(x, starts)
+    sy = np.add.reduceat(y, starts)
+    sxx = np.add.reduceat(x * x, starts)
+    sxy = np.add.reduceat(x * y, starts)
+
+    denom = n * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.where(denom > 0, (n * sxy - sx * sy) / denom, np.nan)
+    # Hodômetro não anda para trás: taxa <= 0 é dado inconsistente
+    rate = np.where(rate > 0, rate, np.nan)
+
+    last_day = history["days"][ends]
+    last_km = np.maximum.reduceat(y, starts)
+
+    current = np.fromiter((current_km.get(int(i)) or 0 for i in ids), dtype=np.float64, count=ids.size)
+    base_km = np.maximum(last_km, current)
+
+    preventive_km = np.maximum.reduceat(np.where(history["preventive"], y, -np.inf), starts)
+    next_multiple = (np.floor(base_km / interval_km) + 1) * interval_km
+    target_km = np.where(np.isfinite(preventive_km), preventive_km + interval_km, next_multiple)
+
+    # Projeção a partir do último registro datado
+    with np.errstate(invalid="ignore"):
+        due_offset = np.ceil((target_km - last_km) / rate)
+    due_day = last_day + np.nan_to_num(due_offset, nan=0).astype(np.int64)
+    has_due = np.isfinite(due_offset)
+
+    forecasts = []
+    for i in range(ids.size):
+        forecasts.append(
+            {
+                "id_caminhao": int(ids[i]),
+                "km_por_dia": float(rate[i]) if np.isfinite(rate[i]) else None,
+                "quilometragem_base": int(base_km[i]),
+                "quilometragem_alvo": int(target_km[i]),
+                "intervalo_km": int(interval_km),
+                "data_prevista": date.fromordinal(int(due_day[i])) if has_due[i] else None,
+                "amostras": int(n[i]),
+            }
+        )
+    return forecasts
+
+
+def refresh_maintenance_forecasts(interval_km):
+    """Recalcula a previsão da frota inteira e regrava a tabela previsoes_manutencao."""
+    history = load_mileage_history()
+    current_km = dict(
+        db.session.query(Caminhao.id_caminhao, Caminhao.quilometragem_atual).all()
+    )
+    forecasts = compute_forecasts(history, current_km, interval_km)
+
+    # Ignora históricos órfãos (caminhão já removido)
+    forecasts = [f for f in forecasts if f["id_caminhao"] in current_km]
+
+    computed_at = datetime.utcnow()
+    for forecast in forecasts:
+        forecast["calculado_em"] = computed_at
+
+    db.session.execute(delete(PrevisaoManutencao))
+    if forecasts:
+        db.session.execute(insert(PrevisaoManutencao), forecasts)
+    db.session.commit()
+
+    return len(forecasts)
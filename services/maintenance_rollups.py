@@ -0,0 +1,141 @@
+# backend/services/maintenance_rollups.py
+
+from collections import Counter
+from datetime import date
+
+from sqlalchemy import delete, func, insert, select
+
+from database import db
+from models import Manutencao, ResumoManutencaoMensal, ResumoMecanicoMensal
+from utils.upsert import upsert_increment
+
+
+def _month(value):
+    return date(value.year, value.month, 1)
+
+
+def _mechanic(name):
+    return (name or "").strip()[:100]
+
+
+def rollup_key(manutencao):
+    """
+    Fotografia dos campos que definem em quais rollups a manutenção conta.
+    Deve ser tirada ANTES de alterar a manutenção (para poder subtrair).
+    """
+    if manutencao is None or manutencao.data_manutencao is None or manutencao.tipo is None:
+        return None
+    return (
+        manutencao.id_caminhao,
+        _month(manutencao.data_manutencao),
+        manutencao.tipo,
+        _mechanic(manutencao.nome_mecanico),
+    )
+
+
+def apply_rollup_delta(key, delta):
+    """Soma (+1) ou subtrai (-1) uma manutenção dos rollups."""
+    if key is None or not delta:
+        return
+
+    truck_id, month, tipo, mechanic = key
+    upsert_increment(
+        ResumoManutencaoMensal,
+        {"id_caminhao": truck_id, "mes": month, "tipo": tipo},
+        {"total": delta},
+    )
+    column = "preventivas" if tipo == "preventiva" else "corretivas"
+    upsert_increment(
+        ResumoMecanicoMensal,
+        {"nome_mecanico": mechanic, "mes": month},
+        {column: delta},
+    )
+
+
+def record_maintenance_created(manutencao):
+    apply_rollup_delta(rollup_key(manutencao), 1)
+
+
+def record_maintenance_deleted(manutencao):
+    apply_rollup_delta(rollup_key(manutencao), -1)
+
+
+def record_maintenance_updated(old_key, manutencao):
+    new_key = rollup_key(manutencao)
+    if old_key == new_key:
+        return
+    apply_rollup_delta(old_key, -1)
+    apply_rollup_delta(new_key, 1)
+
+
+def subtract_truck_from_mechanic_rollups(truck_id):
+    """
+    Tira dos rollups por mecânico todas as manutenções do caminhão (exclusão
+    lógica: esse rollup não tem id_caminhao para o filtro global esconder).
+    A agregação roda no banco; uma escrita por (mecânico, mês).
+    """
+    year = func.extract("year", Manutencao.data_manutencao)
+    month = func.extract("month", Manutencao.data_manutencao)
+    rows = db.session.execute(
+        select(Manutencao.nome_mecanico, year, month, Manutencao.tipo, func.count())
+        .where(Manutencao.id_caminhao == truck_id, Manutencao.data_manutencao.isnot(None))
+        .group_by(Manutencao.nome_mecanico, year, month, Manutencao.tipo)
+        .execution_options(include_deleted=True)
+    )
+    deltas = Counter()
+    for name, y, m, tipo, total in rows:
+        column = "preventivas" if tipo == "preventiva" else "corretivas"
+        deltas[(_mechanic(name), date(int(y), int(m), 1), column)] += total
+    for (mechanic, month_start, column), total in sorted(deltas.items()):
+        upsert_increment(
+            ResumoMecanicoMensal,
+            {"nome_mecanico": mechanic, "mes": month_start},
+            {column: -total},
+        )
+
+
+def rebuild_maintenance_rollups():
+    """
+    Recalcula os rollups do zero a partir de `manutencoes` (backfill / correção).
+    A agregação roda no banco; só os grupos resultantes passam pelo Python.
+    """
+    year = func.extract("year", Manutencao.data_manutencao)
+    month = func.extract("month", Manutencao.data_manutencao)
+
+    truck_rows = (
+        db.session.query(Manutencao.id_caminhao, year, month, Manutencao.tipo, func.count())
+        .filter(Manutencao.data_manutencao.isnot(None))
+        .group_by(Manutencao.id_caminhao, year, month, Manutencao.tipo)
+        .all()
+    )
+    mechanic_rows = (
+        db.session.query(Manutencao.nome_mecanico, year, month, Manutencao.tipo, func.count())
+        .filter(Manutencao.data_manutencao.isnot(None))
+        .group_by(Manutencao.nome_mecanico, year, month, Manutencao.tipo)
+        .all()
+    )
+
+    truck_rollups = [
+        {"id_caminhao": truck_id, "mes": date(int(y), int(m), 1), "tipo": tipo, "total": total}
+        for truck_id, y, m, tipo, total in truck_rows
+    ]
+
+    # Nomes diferentes podem normalizar para o mesmo (ex.: espaços) → soma em Python
+    mechanic_rollups = {}
+    for name, y, m, tipo, total in mechanic_rows:
+        key = (_mechanic(name), date(int(y), int(m), 1))
+        row = mechanic_rollups.setdefault(
+            key,
+            {"nome_mecanico": key[0], "mes": key[1], "preventivas": 0, "corretivas": 0},
+        )
+        row["preventivas" if tipo == "preventiva" else "corretivas"] += total
+
+    db.session.execute(delete(ResumoManutencaoMensal))
+    db.session.execute(delete(ResumoMecanicoMensal))
+    if truck_rollups:
+        db.session.execute(insert(ResumoManutencaoMensal), truck_rollups)
+    if mechanic_rollups:
+        db.session.execute(insert(ResumoMecanicoMensal), list(mechanic_rollups.values()))
+    db.session.commit()
+
+    return len(truck_rollups), len(mechanic_rollups)
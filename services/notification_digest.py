@@ -0,0 +1,162 @@
+# backend/services/notification_digest.py
+"""
+Resumo diário de alertas para a equipe (admins, gestores e mecânicos).
+
+Em vez de uma Notificacao por caminhão para cada usuário da equipe, cada um tem
+uma linha por dia (data_resumo) com os alertas do dia em `detalhes`; alertas
+novos atualizam essa mesma linha. Motoristas continuam recebendo uma
+notificação por caminhão.
+
+Uso: junte os alertas de uma varredura num DigestBatch e chame flush() antes do
+commit. São um INSERT idempotente dos resumos do dia, uma consulta e no máximo
+uma escrita por usuário da equipe, qualquer que seja o número de caminhões.
+
+Varreduras repetem os mesmos alertas a cada rodada, então por padrão um
+alerta já presente no resumo (mesmo caminhão e título) não entra de novo.
+Ações manuais usam `dedupe=False`: sempre entram e marcam o resumo como não
+lido, como no modo events.
+"""
+
+from datetime import date, datetime
+
+from flask import current_app
+from sqlalchemy import bindparam, select
+
+from database import db
+from models import Notificacao
+from utils.metrics import record_notifications
+from utils.upsert import insert_missing
+
+# Ordem de gravidade para o tipo do resumo (o mais grave do dia)
+_SEVERITY = {"info": 0, "sistema": 0, "alerta": 1, "manutencao": 2}
+# Quantos alertas entram no texto da mensagem (a lista completa fica em detalhes)
+_MESSAGE_ITEMS = 10
+
+DIGESTS_FOR_UPDATE = (
+    select(Notificacao)
+    .where(
+        Notificacao.data_resumo == bindparam("day"),
+        Notificacao.id_usuario.in_(bindparam("user_ids", expanding=True)),
+    )
+    .with_for_update()
+)
+
+
+def digest_enabled():
+    return current_app.config.get("NOTIFICATION_DIGEST_ENABLED", False)
+
+
+def _item_key(item):
+    return item["truckId"], item["title"]
+
+
+def _merge(items, new_items, dedupe=True):
+    """
+    Acrescenta a `items` (no lugar) os alertas de `new_items` que ainda não
+    estão no resumo (mesmo caminhão e mesmo título); com `dedupe=False`,
+    todos. Retorna (novos, repetidos).
+    """
+    seen = {_item_key(item) for item in items}
+    added = skipped = 0
+    for item in new_items:
+        key = _item_key(item)
+        if dedupe and key in seen:
+            skipped += 1
+            continue
+        seen.add(key)
+        items.append(item)
+        added += 1
+    return added, skipped
+
+
+def _summary(items):
+    latest = sorted(items, key=lambda item: item["date"], reverse=True)
+    titles = "; ".join(item["title"] for item in latest[:_MESSAGE_ITEMS])
+    extra = len(items) - _MESSAGE_ITEMS
+    suffix = f" e mais {extra}." if extra > 0 else "."
+    return f"{len(items)} alerta(s) hoje: {titles}{suffix}"
+
+
+def _digest_title(day):
+    return f"Resumo de alertas - {day.strftime('%d/%m/%Y')}"
+
+
+def _ensure_digests(user_ids, day):
+    """
+    Cria os resumos do dia que ainda não existem, sem ler nem travar antes
+    (SELECT FOR UPDATE seguido de INSERT trava o intervalo do índice e dá
+    deadlock entre duas varreduras no MySQL).
+    """
+    insert_missing(
+        Notificacao,
+        [
+            {
+                "id_usuario": user_id,
+                "data_resumo": day,
+                "titulo": _digest_title(day),
+                "mensagem": "",
+                "tipo": "info",
+                "detalhes": [],
+            }
+            for user_id in user_ids
+        ],
+    )
+
+
+class DigestBatch:
+    def __init__(self, source, day=None, dedupe=True):
+        self.source = source
+        self.day = day or date.today()
+        self.dedupe = dedupe
+        self._items = {}
+
+    def add(self, users, title, message, tipo, truck_id=None):
+        item = {
+            "truckId": truck_id,
+            "title": title,
+            "message": message,
+            "type": tipo,
+            "date": datetime.utcnow().isoformat(timespec="seconds"),
+        }
+        for user in users:
+            self._items.setdefault(user.id_usuario, []).append(item)
+
+    def flush(self):
+        """Grava os alertas acumulados nos resumos do dia (sem commit)."""
+        if not self._items:
+            return
+
+        user_ids = sorted(self._items)
+        # Primeiro garante as linhas, depois trava só as que existem
+        _ensure_digests(user_ids, self.day)
+        digests = {
+            digest.id_usuario: digest
+            for digest in db.session.scalars(
+                DIGESTS_FOR_UPDATE, {"day": self.day, "user_ids": user_ids}
+            )
+        }
+
+        inserted = digested = deduplicated = 0
+        for user_id in user_ids:
+            digest = digests[user_id]
+            # Resumo ainda sem alertas: acabou de ser criado por este ou outro processo
+            created = not digest.detalhes
+
+            # JSON não rastreia mutação: monta uma lista nova e reatribui
+            items = list(digest.detalhes or [])
+            added, skipped = _merge(items, self._items[user_id], self.dedupe)
+            deduplicated += skipped
+            if not added:
+                continue
+
+            digest.detalhes = items
+            digest.mensagem = _summary(items)
+            digest.tipo = max((item["type"] for item in items), key=lambda tipo: _SEVERITY.get(tipo, 0))
+            digest.data_envio = datetime.utcnow()
+            digest.visualizado = False
+
+            inserted += 1 if created else 0
+            digested += added - 1 if created else added
+
+        self._items.clear()
+        record_notifications(self.source, inserted, deduplicated, digested)
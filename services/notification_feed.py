@@ -0,0 +1,383 @@
+# backend/services/notification_feed.py
+"""
+Notificações com fan-out na leitura (NOTIFICATION_STORAGE_MODE=events).
+
+Cada alerta vira uma linha em eventos_notificacao, com o público marcado no
+próprio evento: a equipe (admins, gestores, mecânicos), os motoristas
+vinculados ao caminhão e/ou um usuário específico. O feed de um usuário é
+resolvido na leitura pelo perfil e pelos caminhões dele, então gravar um
+alerta custa o mesmo com 3 ou 300 usuários na equipe.
+
+O estado de leitura fica em leituras_notificacao, uma linha por usuário: todos
+os eventos do feed até `ultimo_lido` estão lidos e `excecoes` lista os ids
+acima dele lidos fora de ordem. Quando as exceções alcançam o próximo evento
+não lido, a marca avança e elas somem. A marca só passa por eventos com mais
+de NOTIFICATION_READ_GRACE_SECONDS: um id menor gravado por uma transação
+ainda aberta ficaria abaixo dela e nunca apareceria como não lido. Eventos
+mais novos que isso ficam nas exceções. Excluir um evento só o esconde do
+feed do usuário (`ocultos`): o evento é o mesmo para todos os destinatários.
+"""
+
+from bisect import bisect_right
+from datetime import datetime, time, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, bindparam, func, insert, or_, select
+
+from database import db
+from models import CaminhaoCondutor, Condutor, EventoNotificacao, LeituraNotificacao, Usuario
+from utils.metrics import record_notifications
+from utils.upsert import insert_missing
+
+STAFF_PROFILES = ("administrador", "gestor", "mecanico")
+
+USER_CONDUTOR = select(Condutor).where(Condutor.id_usuario == bindparam("user_id")).limit(1)
+READ_STATE_FOR_UPDATE = (
+    select(LeituraNotificacao)
+    .where(LeituraNotificacao.id_usuario == bindparam("user_id"))
+    .with_for_update()
+)
+
+
+def events_mode():
+    return current_app.config.get("NOTIFICATION_STORAGE_MODE") == "events"
+
+
+def driver_truck_ids(user_id):
+    """Caminhões vinculados ao motorista (histórico de vínculos ou o atual)."""
+    condutor = db.session.scalars(USER_CONDUTOR, {"user_id": user_id}).first()
+    if not condutor:
+        return None
+    truck_ids = {v.id_caminhao for v in condutor.vinculos}
+    if not truck_ids and condutor.id_caminhao:
+        truck_ids.add(condutor.id_caminhao)
+    return truck_ids
+
+
+# --- Escrita -----------------------------------------------------------------
+class EventBatch:
+    """
+    Eventos de uma varredura, gravados num único INSERT em flush(). O mesmo
+    alerta (caminhão + título) sai no máximo uma vez por dia; com
+    `dedupe=False` (ações manuais, como bloquear/desbloquear) sai sempre.
+    """
+
+    def __init__(self, source, dedupe=True):
+        self.source = source
+        self.dedupe = dedupe
+        self._rows = {}
+
+    def add(self, title, message, tipo, truck_id=None, staff=True, drivers=True):
+        self._rows.setdefault((truck_id, title), {
+            "id_caminhao": truck_id,
+            "titulo": title,
+            "mensagem": message,
+            "tipo": tipo,
+            "para_equipe": staff,
+            "para_motoristas": drivers and truck_id is not None,
+        })
+
+    def flush(self):
+        """Grava os eventos novos (sem commit)."""
+        if not self._rows:
+            return
+
+        sent_today = set()
+        if self.dedupe:
+            since = datetime.combine(datetime.utcnow().date(), time.min)
+            sent_today = {
+                (truck_id, title)
+                for truck_id, title in db.session.execute(
+                    select(EventoNotificacao.id_caminhao, EventoNotificacao.titulo).where(
+                        EventoNotificacao.data_envio >= since,
+                        EventoNotificacao.titulo.in_(sorted({title for _, title in self._rows})),
+                    )
+                )
+            }
+
+        now = datetime.utcnow()
+        rows = [dict(row, data_envio=now) for key, row in self._rows.items() if key not in sent_today]
+        if rows:
+            db.session.execute(insert(EventoNotificacao), rows)
+
+        record_notifications(self.source, len(rows), len(self._rows) - len(rows))
+        self._rows.clear()
+
+
+def publish_event(source, title, message, tipo, truck_id=None, staff=True, drivers=True, dedupe=True):
+    batch = EventBatch(source, dedupe)
+    batch.add(title, message, tipo, truck_id, staff, drivers)
+    batch.flush()
+
+
+# --- Leitura -----------------------------------------------------------------
+def _hidden(state):
+    return (state.ocultos or []) if state else []
+
+
+def feed_criteria(user, hidden=()):
+    """
+    Filtro dos eventos que chegam a `user` (dentro de NOTIFICATION_FEED_DAYS),
+    menos os `hidden` (ocultos do estado de leitura dele).
+    """
+    audience = [EventoNotificacao.id_usuario == user.id_usuario]
+    if user.perfil in STAFF_PROFILES:
+        audience.append(EventoNotificacao.para_equipe == True)  # noqa: E712
+    elif user.perfil == "motorista":
+        truck_ids = driver_truck_ids(user.id_usuario)
+        if truck_ids:
+            audience.append(and_(
+                EventoNotificacao.para_motoristas == True,  # noqa: E712
+                EventoNotificacao.id_caminhao.in_(sorted(truck_ids)),
+            ))
+
+    since = datetime.utcnow() - timedelta(days=current_app.config["NOTIFICATION_FEED_DAYS"])
+    criteria = and_(or_(*audience), EventoNotificacao.data_envio >= since)
+    if hidden:
+        criteria = and_(criteria, EventoNotificacao.id_evento.notin_(sorted(hidden)))
+    return criteria
+
+
+def event_to_dict(event, user_id, read):
+    # Mesmo formato de Notificacao.to_dict()
+    return {
+        "id": event.id_evento,
+        "userId": user_id,
+        "truckId": event.id_caminhao,
+        "title": event.titulo,
+        "message": event.mensagem,
+        "type": event.tipo,
+        "date": event.data_envio.isoformat() if event.data_envio else None,
+        "read": read,
+        "digestDate": None,
+        "items": None,
+    }
+
+
+_FEED_COLUMNS = (
+    EventoNotificacao.id_evento,
+    EventoNotificacao.id_caminhao,
+    EventoNotificacao.titulo,
+    EventoNotificacao.mensagem,
+    EventoNotificacao.tipo,
+    EventoNotificacao.data_envio,
+)
+
+
+def list_feed(user, keys):
+    """Feed do usuário (mais recentes primeiro), só com as chaves em `keys`."""
+    stmt = select(*_FEED_COLUMNS).order_by(EventoNotificacao.data_envio.desc())
+    if user is None:
+        # Sem usuário: todos os eventos, sem estado de leitura
+        events = db.session.execute(stmt)
+        items = [event_to_dict(event, None, False) for event in events]
+    else:
+        state = db.session.get(LeituraNotificacao, user.id_usuario)
+        watermark = state.ultimo_lido if state else 0
+        exceptions = set(state.excecoes) if state else set()
+        events = db.session.execute(stmt.where(feed_criteria(user, _hidden(state))))
+        items = [
+            event_to_dict(
+                event, user.id_usuario, event.id_evento <= watermark or event.id_evento in exceptions
+            )
+            for event in events
+        ]
+    return [{key: item[key] for key in keys} for item in items]
+
+
+def unread_count(user):
+    state = db.session.get(LeituraNotificacao, user.id_usuario)
+    criteria = [feed_criteria(user, _hidden(state))]
+    if state:
+        criteria.append(EventoNotificacao.id_evento > state.ultimo_lido)
+        if state.excecoes:
+            criteria.append(EventoNotificacao.id_evento.notin_(state.excecoes))
+    return db.session.scalar(select(func.count(EventoNotificacao.id_evento)).where(*criteria))
+
+
+def _unread(event_ids, state):
+    """Quantos de `event_ids` (ordenados) estão acima da marca e fora das exceções."""
+    watermark, exceptions = state
+    above = event_ids[bisect_right(event_ids, watermark):]
+    return len(above) - len(exceptions.intersection(above)) if exceptions else len(above)
+
+
+def unread_counts_by_role():
+    """
+    Não lidas por perfil, para o dashboard. Em vez de unread_count() por
+    usuário, carrega de uma vez os eventos da janela, os estados de leitura e
+    os caminhões dos motoristas, e conta em memória: número fixo de consultas.
+    """
+    since = datetime.utcnow() - timedelta(days=current_app.config["NOTIFICATION_FEED_DAYS"])
+    recent = EventoNotificacao.data_envio >= since
+
+    staff_events = []
+    driver_events = {}
+    personal_events = {}
+    for event_id, truck_id, user_id, staff, drivers in db.session.execute(
+        select(
+            EventoNotificacao.id_evento,
+            EventoNotificacao.id_caminhao,
+            EventoNotificacao.id_usuario,
+            EventoNotificacao.para_equipe,
+            EventoNotificacao.para_motoristas,
+        )
+        .where(recent)
+        .order_by(EventoNotificacao.id_evento)
+    ):
+        if staff:
+            staff_events.append(event_id)
+        if drivers and truck_id is not None:
+            driver_events.setdefault(truck_id, []).append(event_id)
+        if user_id is not None:
+            personal_events.setdefault(user_id, []).append(event_id)
+
+    states = {}
+    hidden = {}
+    for user_id, watermark, exceptions, hidden_ids in db.session.execute(
+        select(
+            LeituraNotificacao.id_usuario,
+            LeituraNotificacao.ultimo_lido,
+            LeituraNotificacao.excecoes,
+            LeituraNotificacao.ocultos,
+        )
+    ):
+        states[user_id] = (watermark, set(exceptions or ()))
+        if hidden_ids:
+            hidden[user_id] = set(hidden_ids)
+
+    # Mesmo critério de driver_truck_ids(): o primeiro condutor do usuário, os
+    # caminhões dos vínculos dele ou, sem vínculos, o caminhão atual
+    drivers = {}
+    for condutor_id, user_id, truck_id in db.session.execute(
+        select(Condutor.id_condutor, Condutor.id_usuario, Condutor.id_caminhao)
+        .where(Condutor.id_usuario.isnot(None))
+        .order_by(Condutor.id_condutor)
+    ):
+        drivers.setdefault(user_id, (condutor_id, truck_id))
+    linked = {}
+    for condutor_id, truck_id in db.session.execute(
+        select(CaminhaoCondutor.id_condutor, CaminhaoCondutor.id_caminhao)
+    ):
+        linked.setdefault(condutor_id, set()).add(truck_id)
+
+    by_role = {}
+    for user_id, perfil in db.session.execute(select(Usuario.id_usuario, Usuario.perfil)):
+        state = states.get(user_id, (0, set()))
+        personal = personal_events.get(user_id, [])
+        if perfil in STAFF_PROFILES:
+            feed = sorted(set(staff_events).union(personal)) if personal else staff_events
+        elif perfil == "motorista" and user_id in drivers:
+            condutor_id, current_truck = drivers[user_id]
+            truck_ids = linked.get(condutor_id) or ({current_truck} if current_truck else set())
+            feed = set(personal)
+            for truck_id in truck_ids:
+                feed.update(driver_events.get(truck_id, ()))
+            feed = sorted(feed)
+        else:
+            feed = personal
+        if user_id in hidden:
+            feed = [event_id for event_id in feed if event_id not in hidden[user_id]]
+        unread = _unread(feed, state)
+        if unread:
+            by_role[perfil] = by_role.get(perfil, 0) + unread
+    return by_role
+
+
+def _grace_cutoff():
+    return datetime.utcnow() - timedelta(seconds=current_app.config["NOTIFICATION_READ_GRACE_SECONDS"])
+
+
+def _read_state_for_update(user_id):
+    # Cria a linha (se faltar) antes de travar: SELECT FOR UPDATE de uma chave
+    # inexistente trava o intervalo, e dois requests que depois inserem dão
+    # deadlock no MySQL
+    insert_missing(LeituraNotificacao, [{"id_usuario": user_id, "ultimo_lido": 0, "excecoes": [], "ocultos": []}])
+    return db.session.scalars(READ_STATE_FOR_UPDATE, {"user_id": user_id}).one()
+
+
+def mark_event_read(user, event_id):
+    """
+    Marca um evento do feed como lido (sem commit) e devolve o dict dele, ou
+    None se o evento não está no feed do usuário.
+    """
+    state = _read_state_for_update(user.id_usuario)
+    criteria = feed_criteria(user, _hidden(state))
+    event = db.session.execute(
+        select(*_FEED_COLUMNS).where(EventoNotificacao.id_evento == event_id, criteria)
+    ).first()
+    if event is None:
+        return None
+
+    exceptions = set(state.excecoes)
+    if event_id <= state.ultimo_lido or event_id in exceptions:
+        return event_to_dict(event, user.id_usuario, True)
+    exceptions.add(event_id)
+
+    # Avança a marca enquanto os próximos eventos do feed já estiverem lidos
+    # e forem mais antigos que a carência
+    cutoff = _grace_cutoff()
+    watermark = state.ultimo_lido
+    following = db.session.execute(
+        select(EventoNotificacao.id_evento, EventoNotificacao.data_envio)
+        .where(criteria, EventoNotificacao.id_evento > watermark)
+        .order_by(EventoNotificacao.id_evento)
+        .limit(len(exceptions) + 1)
+    )
+    for following_id, sent_at in following:
+        if following_id not in exceptions or sent_at >= cutoff:
+            break
+        watermark = following_id
+
+    state.ultimo_lido = watermark
+    state.excecoes = sorted(e for e in exceptions if e > watermark)
+    return event_to_dict(event, user.id_usuario, True)
+
+
+def mark_all_read(user):
+    """
+    Marca o feed inteiro como lido (sem commit): a marca vai até o evento mais
+    recente fora da carência e os eventos dentro dela entram nas exceções.
+    """
+    state = _read_state_for_update(user.id_usuario)
+    criteria = feed_criteria(user, _hidden(state))
+    cutoff = _grace_cutoff()
+    latest = db.session.scalar(
+        select(func.max(EventoNotificacao.id_evento)).where(criteria, EventoNotificacao.data_envio < cutoff)
+    )
+    if latest and latest > state.ultimo_lido:
+        state.ultimo_lido = latest
+    recent = db.session.scalars(
+        select(EventoNotificacao.id_evento).where(
+            criteria,
+            EventoNotificacao.data_envio >= cutoff,
+            EventoNotificacao.id_evento > state.ultimo_lido,
+        )
+    )
+    state.excecoes = sorted({e for e in state.excecoes if e > state.ultimo_lido}.union(recent))
+
+
+def hide_event(user, event_id):
+    """
+    Tira um evento do feed do usuário (sem commit); os outros destinatários
+    continuam vendo. False se o evento não está no feed dele.
+    """
+    state = _read_state_for_update(user.id_usuario)
+    hidden = _hidden(state)
+    in_feed = db.session.scalar(
+        select(EventoNotificacao.id_evento).where(
+            EventoNotificacao.id_evento == event_id, feed_criteria(user, hidden)
+        )
+    )
+    if in_feed is None:
+        return False
+
+    # Só guarda ids que ainda estão na janela do feed: os mais antigos já saíram
+    since = datetime.utcnow() - timedelta(days=current_app.config["NOTIFICATION_FEED_DAYS"])
+    kept = db.session.scalars(
+        select(EventoNotificacao.id_evento).where(
+            EventoNotificacao.id_evento.in_(sorted(hidden)), EventoNotificacao.data_envio >= since
+        )
+    ) if hidden else []
+    state.ocultos = sorted({*kept, event_id})
+    return True
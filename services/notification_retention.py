@@ -0,0 +1,87 @@
+# backend/services/notification_retention.py
+
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select
+
+from database import db
+from models import Notificacao, NotificacaoArquivo
+
+_ARCHIVED_COLUMNS = (
+    "id_notificacao",
+    "id_usuario",
+    "id_caminhao",
+    "titulo",
+    "mensagem",
+    "tipo",
+    "data_envio",
+    "visualizado",
+    "data_resumo",
+    "detalhes",
+)
+
+
+def archive_read_notifications(
+    retention_days: int,
+    batch_size: int = 500,
+    max_batches: int | None = None,
+    pause_seconds: float = 0,
+):
+    """
+    Move notificações LIDAS com mais de `retention_days` dias para
+    notificacoes_arquivo, em lotes de no máximo `batch_size` linhas.
+
+    Cada lote é uma transação curta (seleciona ids, copia, apaga, commit),
+    então nenhum lock fica preso por muito tempo. `pause_seconds` entre os
+    lotes limita a pressão sobre o banco. Retorna o total arquivado.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    source = Notificacao.__table__
+    archive = NotificacaoArquivo.__table__
+    moved = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        # SKIP LOCKED: vários workers podem rodar o job sem disputar as mesmas linhas
+        ids = db.session.execute(
+            select(source.c.id_notificacao)
+            .where(source.c.visualizado == True, source.c.data_envio < cutoff)  # noqa: E712
+            .order_by(source.c.id_notificacao)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+
+        if not ids:
+            db.session.rollback()
+            break
+
+        columns = [source.c[name] for name in _ARCHIVED_COLUMNS]
+        db.session.execute(
+            insert(archive).from_select(
+                list(_ARCHIVED_COLUMNS),
+                select(*columns).where(source.c.id_notificacao.in_(ids)),
+            )
+        )
+        db.session.execute(delete(source).where(source.c.id_notificacao.in_(ids)))
+        db.session.commit()
+
+        moved += len(ids)
+        batches += 1
+
+        if len(ids) < batch_size:
+            break
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    return moved
+
+
+def run_notification_retention(app):
+    """Executa uma rodada do arquivamento usando as configurações do app."""
+    return archive_read_notifications(
+        retention_days=app.config["NOTIFICATION_RETENTION_DAYS"],
+        batch_size=app.config["NOTIFICATION_ARCHIVE_BATCH_SIZE"],
+        max_batches=app.config["NOTIFICATION_ARCHIVE_MAX_BATCHES"],
+        pause_seconds=app.config["NOTIFICATION_ARCHIVE_PAUSE_SECONDS"],
+    )
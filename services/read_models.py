@@ -0,0 +1,173 @@
+# backend/services/read_models.py
+"""
+Leitura das listagens sem materializar objetos ORM.
+
+Cada ReadModel descreve, campo a campo, a coluna (ou expressão) que alimenta
+a chave do JSON, a conversão aplicada ao valor e os joins de que ela precisa.
+As linhas voltam como tuplas e viram dicts idênticos aos `to_dict()` dos
+models, sem identity map nem rastreamento de mudanças.
+
+Com `?fields=a,b` / `?exclude=c` (ver keys_from_args) só os campos pedidos
+entram no SELECT, e joins que nenhum deles usa ficam de fora.
+"""
+
+from typing import Callable, NamedTuple, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+
+from models import Caminhao, Condutor, Manutencao, Notificacao, Usuario
+
+
+class Field(NamedTuple):
+    column: object
+    convert: Optional[Callable] = None
+    joins: tuple = ()
+
+
+class ReadModel:
+    def __init__(self, entity, fields, joins=None):
+        self.entity = entity
+        self.fields = fields
+        self.joins = joins or {}
+        self._statements = {}
+
+    def keys_from_args(self, args):
+        """
+        Campos pedidos via `fields` e/ou `exclude` (listas separadas por vírgula),
+        na ordem do to_dict(). Sem nenhum dos dois, todos. ValueError se algum
+        nome não existir ou se não sobrar campo.
+        """
+        wanted = _split(args.get("fields"))
+        excluded = _split(args.get("exclude"))
+        unknown = [key for key in (wanted or []) + (excluded or []) if key not in self.fields]
+        if unknown:
+            raise ValueError(f"Campos inválidos: {', '.join(unknown)}")
+
+        keys = tuple(
+            key for key in self.fields
+            if (wanted is None or key in wanted) and (excluded is None or key not in excluded)
+        )
+        if not keys:
+            raise ValueError("Nenhum campo selecionado")
+        return keys
+
+    def select(self, keys=None):
+        """Statement que seleciona só as colunas (e joins) dos campos em `keys`."""
+        keys = tuple(self.fields) if keys is None else tuple(keys)
+        stmt = self._statements.get(keys)
+        if stmt is None:
+            stmt = select(*(self.fields[key].column for key in keys)).select_from(self.entity)
+            applied = set()
+            for key in keys:
+                for join in self.fields[key].joins:
+                    if join not in applied:
+                        stmt = self.joins[join](stmt)
+                        applied.add(join)
+            self._statements[keys] = stmt
+        return stmt
+
+    def to_dicts(self, rows, keys=None):
+        keys = list(self.fields) if keys is None else keys
+        converters = [(i, self.fields[key].convert) for i, key in enumerate(keys) if self.fields[key].convert]
+        items = []
+        for row in rows:
+            if converters:
+                row = list(row)
+                for i, convert in converters:
+                    row[i] = convert(row[i])
+            items.append(dict(zip(keys, row)))
+        return items
+
+
+def _split(value):
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+# --- Caminhões ---------------------------------------------------------------
+# Caminhao.condutor (backref uselist=False) resolve para o condutor de menor id
+_first_driver = (
+    select(Condutor.id_caminhao, func.min(Condutor.id_condutor).label("id_condutor"))
+    .where(Condutor.id_caminhao.isnot(None))
+    .group_by(Condutor.id_caminhao)
+    .subquery("primeiro_condutor")
+)
+_driver = aliased(Condutor, name="condutor_atual")
+
+TRUCKS = ReadModel(
+    Caminhao,
+    {
+        "id": Field(Caminhao.id_caminhao),
+        "plate": Field(Caminhao.placa),
+        "model": Field(Caminhao.modelo),
+        "mileage": Field(Caminhao.quilometragem_atual),
+        "status": Field(Caminhao.status),
+        "lastMaintenance": Field(Caminhao.data_ultima_manutencao, _isoformat),
+        "nextMaintenance": Field(Caminhao.data_proxima_manutencao, _isoformat),
+        "driverName": Field(_driver.nome, joins=("driver",)),
+        "driverId": Field(_driver.id_condutor, joins=("driver",)),
+    },
+    joins={
+        "driver": lambda stmt: stmt.outerjoin(
+            _first_driver, _first_driver.c.id_caminhao == Caminhao.id_caminhao
+        ).outerjoin(_driver, _driver.id_condutor == _first_driver.c.id_condutor),
+    },
+)
+
+# --- Usuários ----------------------------------------------------------------
+USERS = ReadModel(
+    Usuario,
+    {
+        "id": Field(Usuario.id_usuario, str),
+        "name": Field(Usuario.nome),
+        "email": Field(Usuario.email),
+        "profile": Field(Usuario.perfil),
+    },
+)
+
+# --- Manutenções -------------------------------------------------------------
+_maintenance_truck = aliased(Caminhao, name="caminhao_manutencao")
+
+MAINTENANCES = ReadModel(
+    Manutencao,
+    {
+        "id": Field(Manutencao.id_manutencao),
+        "truckId": Field(Manutencao.id_caminhao),
+        "truckPlate": Field(
+            _maintenance_truck.placa, lambda plate: plate if plate is not None else "N/A", ("truck",)
+        ),
+        "date": Field(Manutencao.data_manutencao, _isoformat),
+        "type": Field(Manutencao.tipo),
+        "mileage": Field(Manutencao.quilometragem),
+        "description": Field(Manutencao.descricao),
+        "mechanicName": Field(Manutencao.nome_mecanico),
+    },
+    joins={
+        "truck": lambda stmt: stmt.outerjoin(
+            _maintenance_truck, _maintenance_truck.id_caminhao == Manutencao.id_caminhao
+        ),
+    },
+)
+
+# --- Notificações ------------------------------------------------------------
+NOTIFICATIONS = ReadModel(
+    Notificacao,
+    {
+        "id": Field(Notificacao.id_notificacao),
+        "userId": Field(Notificacao.id_usuario),
+        "truckId": Field(Notificacao.id_caminhao),
+        "title": Field(Notificacao.titulo),
+        "message": Field(Notificacao.mensagem),
+        "type": Field(Notificacao.tipo),
+        "date": Field(Notificacao.data_envio, _isoformat),
+        "read": Field(Notificacao.visualizado),
+        "digestDate": Field(Notificacao.data_resumo, _isoformat),
+        "items": Field(Notificacao.detalhes),
+    },
+)
@@ -0,0 +1,223 @@
+# backend/services/soft_delete.py
+"""
+Exclusão lógica de caminhões e usuários.
+
+Excluir só preenche `excluido_em`: a linha some na hora de todas as consultas
+ORM (filtro global no do_orm_execute abaixo), junto com o que pendura nela
+(manutenções, notificações, previsões e vínculos do caminhão; o condutor do
+usuário), e a requisição não apaga nada. O purgador em background
+(purge_deleted) apaga depois os dependentes em lotes de até `batch_size`
+linhas, cada lote na sua própria transação curta, e por fim a própria linha.
+
+Para enxergar as linhas excluídas numa consulta ORM:
+    db.session.execute(stmt.execution_options(include_deleted=True))
+"""
+
+import time
+from datetime import datetime
+
+from sqlalchemy import delete, event, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import with_loader_criteria
+
+from database import db
+from models import (
+    Caminhao,
+    CaminhaoCondutor,
+    CaminhaoTermoBusca,
+    Condutor,
+    EventoNotificacao,
+    LeituraNotificacao,
+    Manutencao,
+    Notificacao,
+    PrevisaoManutencao,
+    ResumoManutencaoMensal,
+    Usuario,
+)
+from services.maintenance_rollups import subtract_truck_from_mechanic_rollups
+
+_trucks = Caminhao.__table__
+_users = Usuario.__table__
+_drivers = Condutor.__table__
+_maintenances = Manutencao.__table__
+
+# Tabelas Core: o filtro global só age sobre entidades ORM, então estas
+# subconsultas enxergam as linhas excluídas (poucas, pelo índice em excluido_em)
+_DELETED_TRUCKS = select(_trucks.c.id_caminhao).where(_trucks.c.excluido_em.isnot(None))
+_DELETED_USERS = select(_users.c.id_usuario).where(_users.c.excluido_em.isnot(None))
+
+
+def _not_deleted(cls):
+    return cls.excluido_em.is_(None)
+
+
+def _truck_not_deleted(cls):
+    return or_(cls.id_caminhao.is_(None), cls.id_caminhao.notin_(_DELETED_TRUCKS))
+
+
+def _user_not_deleted(cls):
+    return or_(cls.id_usuario.is_(None), cls.id_usuario.notin_(_DELETED_USERS))
+
+
+_HIDDEN = (
+    (Caminhao, _not_deleted),
+    (Usuario, _not_deleted),
+    (CaminhaoCondutor, _truck_not_deleted),
+    (Manutencao, _truck_not_deleted),
+    (Notificacao, _truck_not_deleted),
+    (EventoNotificacao, _truck_not_deleted),
+    (PrevisaoManutencao, _truck_not_deleted),
+    (ResumoManutencaoMensal, _truck_not_deleted),
+    (Condutor, _user_not_deleted),
+)
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def _hide_deleted(orm_execute_state):
+    if (
+        orm_execute_state.is_select
+        and not orm_execute_state.is_column_load
+        and not orm_execute_state.is_relationship_load
+        and not orm_execute_state.execution_options.get("include_deleted", False)
+    ):
+        orm_execute_state.statement = orm_execute_state.statement.options(
+            *(with_loader_criteria(model, criteria, include_aliases=True) for model, criteria in _HIDDEN)
+        )
+
+
+def soft_delete(obj):
+    """
+    Marca como excluído (sem commit). Caminhão: sai na hora dos rollups por
+    mecânico, que não têm id_caminhao para o filtro acima; o rollup por
+    caminhão fica escondido pelo filtro e é apagado pelo purgador.
+    """
+    if isinstance(obj, Caminhao) and obj.excluido_em is None:
+        subtract_truck_from_mechanic_rollups(obj.id_caminhao)
+    obj.excluido_em = datetime.utcnow()
+
+
+# ---------------------------------------------------------------------------
+# Purgador
+# ---------------------------------------------------------------------------
+# Cada passo: (tabela, filtro dado os ids excluídos, ação). Ordem = ordem das FKs.
+
+_TRUCK_STEPS = (
+    (CaminhaoCondutor.__table__, lambda ids: CaminhaoCondutor.__table__.c.id_caminhao.in_(ids), "delete"),
+    (_drivers, lambda ids: _drivers.c.id_caminhao.in_(ids), "unlink"),
+    (_maintenances, lambda ids: _maintenances.c.id_caminhao.in_(ids), "delete"),
+    (ResumoManutencaoMensal.__table__, lambda ids: ResumoManutencaoMensal.__table__.c.id_caminhao.in_(ids), "delete"),
+    (Notificacao.__table__, lambda ids: Notificacao.__table__.c.id_caminhao.in_(ids), "delete"),
+    (EventoNotificacao.__table__, lambda ids: EventoNotificacao.__table__.c.id_caminhao.in_(ids), "delete"),
+    (PrevisaoManutencao.__table__, lambda ids: PrevisaoManutencao.__table__.c.id_caminhao.in_(ids), "delete"),
+    (CaminhaoTermoBusca.__table__, lambda ids: CaminhaoTermoBusca.__table__.c.id_caminhao.in_(ids), "delete"),
+)
+
+_USER_STEPS = (
+    (LeituraNotificacao.__table__, lambda ids: LeituraNotificacao.__table__.c.id_usuario.in_(ids), "delete"),
+    (EventoNotificacao.__table__, lambda ids: EventoNotificacao.__table__.c.id_usuario.in_(ids), "delete"),
+    (Notificacao.__table__, lambda ids: Notificacao.__table__.c.id_usuario.in_(ids), "delete"),
+    (
+        CaminhaoCondutor.__table__,
+        lambda ids: CaminhaoCondutor.__table__.c.id_condutor.in_(
+            select(_drivers.c.id_condutor).where(_drivers.c.id_usuario.in_(ids))
+        ),
+        "delete",
+    ),
+    (_drivers, lambda ids: _drivers.c.id_usuario.in_(ids), "delete"),
+)
+
+
+def _run_step(table, criteria, action, batch_size):
+    """Um lote de um passo; retorna quantas linhas foram afetadas."""
+    if action == "unlink":
+        return db.session.execute(
+            update(table).where(criteria).values(id_caminhao=None)
+        ).rowcount
+
+    primary_key = list(table.primary_key.columns)
+    if len(primary_key) > 1:
+        # PK composta (termos de busca): poucas linhas por caminhão, vai de uma vez
+        return db.session.execute(delete(table).where(criteria)).rowcount
+
+    # SKIP LOCKED: o job roda em todos os workers; cada um apaga lotes diferentes
+    keys = db.session.execute(
+        select(primary_key[0])
+        .where(criteria)
+        .order_by(primary_key[0])
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not keys:
+        return 0
+    db.session.execute(delete(table).where(primary_key[0].in_(keys)))
+    return len(keys)
+
+
+def purge_deleted(
+    batch_size: int = 500,
+    max_batches: int | None = None,
+    pause_seconds: float = 0,
+    rows_per_round: int = 50,
+):
+    """
+    Apaga de vez caminhões e usuários excluídos logicamente: até
+    `rows_per_round` por rodada, primeiro os dependentes (lotes de até
+    `batch_size` linhas, commit a cada lote, `pause_seconds` entre eles) e
+    depois as próprias linhas. Para em `max_batches` lotes; a próxima execução
+    continua de onde parou. Retorna o total de linhas apagadas.
+    """
+    purged = 0
+    batches = 0
+
+    for table, steps in ((_trucks, _TRUCK_STEPS), (_users, _USER_STEPS)):
+        primary_key = list(table.primary_key.columns)[0]
+        while True:
+            ids = db.session.execute(
+                select(primary_key)
+                .where(table.c.excluido_em.isnot(None))
+                .order_by(primary_key)
+                .limit(rows_per_round)
+            ).scalars().all()
+            if not ids:
+                db.session.rollback()
+                break
+
+            for step_table, criteria, action in steps:
+                while True:
+                    if max_batches is not None and batches >= max_batches:
+                        db.session.rollback()
+                        return purged
+                    affected = _run_step(step_table, criteria(ids), action, batch_size)
+                    db.session.commit()
+                    batches += 1
+                    if action == "delete":
+                        purged += affected
+                    if affected < batch_size or action == "unlink":
+                        break
+                    if pause_seconds:
+                        time.sleep(pause_seconds)
+
+            try:
+                purged += db.session.execute(
+                    delete(table).where(primary_key.in_(ids), table.c.excluido_em.isnot(None))
+                ).rowcount
+                db.session.commit()
+            except IntegrityError:
+                # Outro worker ainda está apagando dependentes (lotes pulados
+                # pelo SKIP LOCKED): a próxima execução termina
+                db.session.rollback()
+                return purged
+            batches += 1
+            if pause_seconds:
+                time.sleep(pause_seconds)
+
+    return purged
+
+
+def run_soft_delete_purge(app):
+    """Executa uma rodada do purgador usando as configurações do app."""
+    return purge_deleted(
+        batch_size=app.config["SOFT_DELETE_PURGE_BATCH_SIZE"],
+        max_batches=app.config["SOFT_DELETE_PURGE_MAX_BATCHES"],
+        pause_seconds=app.config["SOFT_DELETE_PURGE_PAUSE_SECONDS"],
+    )
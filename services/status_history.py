@@ -0,0 +1,209 @@
+# backend/services/status_history.py
+"""
+Histórico de status dos caminhões (historico_status_caminhao).
+
+Toda mudança de Caminhao.status que passa pelo flush vira uma linha, gravada
+no after_flush numa única inserção em lote: uma varredura que muda 500
+caminhões faz um INSERT com 500 linhas, na mesma transação. A origem vem de
+`status_origin()` (varreduras, comandos) ou, dentro de uma requisição, do
+endpoint. UPDATEs em lote, que não passam pelo flush, gravam com
+record_status_changes().
+
+availability() calcula quanto tempo cada caminhão passou em cada status num
+período, a partir do status vigente no início e das transições dentro dele.
+Os horários são gravados e consultados em UTC.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from flask import has_request_context, request
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.orm.attributes import get_history
+
+from database import db
+from models import Caminhao, HistoricoStatusCaminhao
+
+STATUSES = ("liberado", "pendente", "bloqueado")
+
+_origin = ContextVar("status_origin", default=None)
+
+
+@contextmanager
+def status_origin(origin):
+    """Marca a origem das mudanças de status feitas dentro do bloco (ou da função decorada)."""
+    token = _origin.set(origin)
+    try:
+        yield
+    finally:
+        _origin.reset(token)
+
+
+def current_origin():
+    origin = _origin.get()
+    if origin:
+        return origin
+    if has_request_context() and request.endpoint:
+        return request.endpoint
+    return "sistema"
+
+
+def record_status_changes(connection, changes, origin=None, changed_at=None):
+    """Grava [(id_caminhao, status_anterior, status_novo), ...] num único INSERT."""
+    changed_at = changed_at or datetime.utcnow()
+    origin = origin or current_origin()
+    rows = [
+        {
+            "id_caminhao": truck_id,
+            "status_anterior": old,
+            "status_novo": new,
+            "alterado_em": changed_at,
+            "origem": origin,
+        }
+        for truck_id, old, new in changes
+        if new and old != new
+    ]
+    if rows:
+        connection.execute(insert(HistoricoStatusCaminhao.__table__), rows)
+    return len(rows)
+
+
+# Carrega o valor antigo ao atribuir, mesmo que o atributo ainda não tenha sido lido
+@event.listens_for(Caminhao.status, "set", active_history=True)
+def _keep_previous_status(target, value, oldvalue, initiator):
+    pass
+
+
+@event.listens_for(db.session, "after_flush")
+def _log_status_after_flush(session, flush_context):
+    changes = []
+    for obj in session.new:
+        if isinstance(obj, Caminhao):
+            changes.append((obj.id_caminhao, None, obj.status))
+    for obj in session.dirty:
+        if isinstance(obj, Caminhao):
+            history = get_history(obj, "status")
+            if history.has_changes():
+                old = history.deleted[0] if history.deleted else None
+                changes.append((obj.id_caminhao, old, obj.status))
+    if changes:
+        record_status_changes(session.connection(), changes)
+
+
+# ---------------------------------------------------------------------------
+# Consultas por período
+# ---------------------------------------------------------------------------
+
+def status_history(truck_id, start, end, limit=None):
+    """Transições de um caminhão em [start, end), mais recentes primeiro."""
+    stmt = (
+        select(HistoricoStatusCaminhao)
+        .where(
+            HistoricoStatusCaminhao.id_caminhao == truck_id,
+            HistoricoStatusCaminhao.alterado_em >= start,
+            HistoricoStatusCaminhao.alterado_em < end,
+        )
+        .order_by(HistoricoStatusCaminhao.alterado_em.desc(), HistoricoStatusCaminhao.id_historico.desc())
+    )
+    if limit:
+        stmt = stmt.limit(limit)
+    return db.session.scalars(stmt).all()
+
+
+def _status_at(start, truck_ids):
+    """
+    Status de cada caminhão no instante `start`: o status_novo do último registro
+    antes dele ou, sem registro anterior, o status_anterior do primeiro depois
+    (None = caminhão ainda não existia). Caminhões sem histórico ficam de fora.
+    """
+    history = HistoricoStatusCaminhao
+    scope = [history.id_caminhao.in_(truck_ids)] if truck_ids is not None else []
+
+    last_before = (
+        select(func.max(history.id_historico))
+        .where(history.alterado_em < start, *scope)
+        .group_by(history.id_caminhao)
+    )
+    states = dict(
+        db.session.execute(
+            select(history.id_caminhao, history.status_novo).where(history.id_historico.in_(last_before))
+        ).all()
+    )
+
+    first_after = (
+        select(func.min(history.id_historico))
+        .where(history.alterado_em >= start, *scope)
+        .group_by(history.id_caminhao)
+    )
+    for truck_id, previous in db.session.execute(
+        select(history.id_caminhao, history.status_anterior).where(history.id_historico.in_(first_after))
+    ):
+        states.setdefault(truck_id, previous)
+    return states
+
+
+def availability(start, end, truck_ids=None):
+    """
+    Tempo (segundos) em cada status por caminhão em [start, end), com
+    disponibilidade (fração do tempo liberado), tempo parado (bloqueado) e
+    quantas vezes foi bloqueado. `end` é limitado a agora.
+    """
+    end = min(end, datetime.utcnow())
+    truck_query = select(Caminhao.id_caminhao, Caminhao.placa, Caminhao.status).order_by(Caminhao.id_caminhao)
+    if truck_ids is not None:
+        truck_query = truck_query.where(Caminhao.id_caminhao.in_(truck_ids))
+    trucks = db.session.execute(truck_query).all()
+
+    history = HistoricoStatusCaminhao
+    transitions = {}
+    if end > start:
+        range_query = (
+            select(history.id_caminhao, history.status_novo, history.alterado_em)
+            .where(history.alterado_em >= start, history.alterado_em < end)
+            .order_by(history.id_caminhao, history.alterado_em, history.id_historico)
+        )
+        if truck_ids is not None:
+            range_query = range_query.where(history.id_caminhao.in_(truck_ids))
+        for truck_id, status, changed_at in db.session.execute(range_query):
+            transitions.setdefault(truck_id, []).append((status, changed_at))
+    initial = _status_at(start, truck_ids)
+
+    fleet = dict.fromkeys(STATUSES, 0.0)
+    items = []
+    for truck_id, plate, current_status in trucks:
+        # Sem histórico nenhum: o status atual vale para o período todo
+        state = initial[truck_id] if truck_id in initial else current_status
+        seconds = dict.fromkeys(STATUSES, 0.0)
+        blocked_periods = 0
+        cursor = start
+        for status, changed_at in transitions.get(truck_id, ()):
+            if state:
+                seconds[state] += (changed_at - cursor).total_seconds()
+            if status == "bloqueado" and state != "bloqueado":
+                blocked_periods += 1
+            state, cursor = status, changed_at
+        if state and end > cursor:
+            seconds[state] += (end - cursor).total_seconds()
+
+        for status in STATUSES:
+            fleet[status] += seconds[status]
+        items.append(_availability_item(seconds, truckId=truck_id, plate=plate, blockedPeriods=blocked_periods))
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat() if end > start else start.isoformat(),
+        "trucks": items,
+        "fleet": _availability_item(fleet),
+    }
+
+
+def _availability_item(seconds, **extra):
+    tracked = sum(seconds.values())
+    return {
+        **extra,
+        "seconds": {status: int(value) for status, value in seconds.items()},
+        "trackedSeconds": int(tracked),
+        "downtimeSeconds": int(seconds["bloqueado"]),
+        "availability": round(seconds["liberado"] / tracked, 4) if tracked else None,
+    }
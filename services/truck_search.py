@@ -0,0 +1,235 @@
+# backend/services/truck_search.py
+
+import re
+import unicodedata
+
+from sqlalchemy import and_, bindparam, case, delete, event, exists, func, insert, select, union_all, update
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.orm.attributes import get_history
+
+from database import db
+from models import Caminhao, CaminhaoTermoBusca, Condutor, normalize_plate
+
+# Ordem de relevância dos resultados (menor = melhor)
+RANK_PLATE_EXACT = 0
+RANK_PLATE_PREFIX = 1
+RANK_MODEL_EXACT = 2
+RANK_MODEL_PREFIX = 3
+RANK_DRIVER_EXACT = 4
+RANK_DRIVER_PREFIX = 5
+
+_MATCHED_ON = {
+    RANK_PLATE_EXACT: "plate",
+    RANK_PLATE_PREFIX: "plate",
+    RANK_MODEL_EXACT: "model",
+    RANK_MODEL_PREFIX: "model",
+    RANK_DRIVER_EXACT: "driver",
+    RANK_DRIVER_PREFIX: "driver",
+}
+
+_TERM_MAX_LENGTH = 50
+
+
+def tokenize(value):
+    """Quebra um texto em termos: minúsculas, sem acentos, só letras/números."""
+    if not value:
+        return []
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(ch for ch in value if not unicodedata.combining(ch)).lower()
+    return [term[:_TERM_MAX_LENGTH] for term in re.split(r"[^0-9a-z]+", value) if term]
+
+
+# ---------------------------------------------------------------------------
+# Manutenção do índice de termos
+# ---------------------------------------------------------------------------
+
+def _term_rows(truck_id, model, driver_names):
+    rows = set()
+    for term in tokenize(model):
+        rows.add((term, truck_id, "modelo"))
+    for name in driver_names:
+        for term in tokenize(name):
+            rows.add((term, truck_id, "motorista"))
+    return [{"termo": t, "id_caminhao": i, "origem": o} for t, i, o in rows]
+
+
+def reindex_trucks(connection, truck_ids):
+    """Regrava os termos de busca dos caminhões informados (estado atual do banco)."""
+    truck_ids = [i for i in set(truck_ids) if i]
+    if not truck_ids:
+        return
+
+    terms = CaminhaoTermoBusca.__table__
+    trucks = Caminhao.__table__
+    drivers = Condutor.__table__
+
+    connection.execute(delete(terms).where(terms.c.id_caminhao.in_(truck_ids)))
+
+    models = dict(
+        connection.execute(
+            select(trucks.c.id_caminhao, trucks.c.modelo).where(trucks.c.id_caminhao.in_(truck_ids))
+        ).all()
+    )
+    names = {}
+    for truck_id, name in connection.execute(
+        select(drivers.c.id_caminhao, drivers.c.nome).where(drivers.c.id_caminhao.in_(truck_ids))
+    ):
+        names.setdefault(truck_id, []).append(name)
+
+    rows = []
+    for truck_id, model in models.items():
+        rows.extend(_term_rows(truck_id, model, names.get(truck_id, [])))
+    if rows:
+        connection.execute(insert(terms), rows)
+
+
+def _changed(obj, attr):
+    return get_history(obj, attr).has_changes()
+
+
+@event.listens_for(db.session, "after_flush")
+def _reindex_after_flush(session, flush_context):
+    """Detecta mudanças de modelo / motorista e atualiza os termos na mesma transação."""
+    truck_ids = set()
+
+    for obj in session.new:
+        if isinstance(obj, Caminhao):
+            truck_ids.add(obj.id_caminhao)
+        elif isinstance(obj, Condutor) and obj.id_caminhao:
+            truck_ids.add(obj.id_caminhao)
+
+    for obj in session.dirty:
+        if isinstance(obj, Caminhao) and _changed(obj, "modelo"):
+            truck_ids.add(obj.id_caminhao)
+        elif isinstance(obj, Condutor):
+            history = get_history(obj, "id_caminhao")
+            if history.has_changes():
+                truck_ids.update(history.added or ())
+                truck_ids.update(history.deleted or ())
+            elif _changed(obj, "nome"):
+                truck_ids.add(obj.id_caminhao)
+
+    for obj in session.deleted:
+        if isinstance(obj, Caminhao):
+            truck_ids.add(obj.id_caminhao)
+        elif isinstance(obj, Condutor):
+            truck_ids.update(get_history(obj, "id_caminhao").deleted or ())
+            truck_ids.add(obj.id_caminhao)
+
+    if truck_ids:
+        reindex_trucks(session.connection(), truck_ids)
+
+
+def rebuild_search_index(batch_size: int = 1000):
+    """Backfill: preenche placa_normalizada e recria todos os termos de busca."""
+    connection = db.session.connection()
+    trucks = Caminhao.__table__
+    terms = CaminhaoTermoBusca.__table__
+
+    connection.execute(delete(terms))
+
+    last_id = 0
+    total = 0
+    while True:
+        batch = connection.execute(
+            select(trucks.c.id_caminhao, trucks.c.placa)
+            .where(trucks.c.id_caminhao > last_id)
+            .order_by(trucks.c.id_caminhao)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            break
+
+        connection.execute(
+            update(trucks)
+            .where(trucks.c.id_caminhao == bindparam("truck_id"))
+            .values(placa_normalizada=bindparam("normalized")),
+            [{"truck_id": truck_id, "normalized": normalize_plate(plate)} for truck_id, plate in batch],
+        )
+        reindex_trucks(connection, [truck_id for truck_id, _ in batch])
+        db.session.commit()
+        connection = db.session.connection()
+
+        total += len(batch)
+        last_id = batch[-1][0]
+
+    return total
+
+
+# ---------------------------------------------------------------------------
+# Consulta
+# ---------------------------------------------------------------------------
+
+def search_trucks(q, page=1, page_size=20):
+    """
+    Busca caminhões por placa (prefixo na placa normalizada) e por palavras do
+    modelo / nome do motorista (prefixo em caminhoes_termos_busca).
+    Retorna (lista de (Caminhao, rank), has_more).
+    """
+    plate_query = normalize_plate(q)
+    terms = tokenize(q)
+
+    candidates = []
+
+    if plate_query:
+        candidates.append(
+            select(
+                Caminhao.id_caminhao.label("id_caminhao"),
+                case(
+                    (Caminhao.placa_normalizada == plate_query, RANK_PLATE_EXACT),
+                    else_=RANK_PLATE_PREFIX,
+                ).label("rank"),
+            ).where(Caminhao.placa_normalizada.like(f"{plate_query}%"))
+        )
+
+    if terms:
+        first, rest = terms[0], terms[1:]
+        term_table = CaminhaoTermoBusca
+        rank = case(
+            (and_(term_table.origem == "modelo", term_table.termo == first), RANK_MODEL_EXACT),
+            (term_table.origem == "modelo", RANK_MODEL_PREFIX),
+            (term_table.termo == first, RANK_DRIVER_EXACT),
+            else_=RANK_DRIVER_PREFIX,
+        )
+        term_query = select(term_table.id_caminhao.label("id_caminhao"), rank.label("rank")).where(
+            term_table.termo.like(f"{first}%")
+        )
+        # Demais palavras da busca: todas precisam casar (AND), via índice (id_caminhao, termo)
+        for term in rest:
+            other = aliased(CaminhaoTermoBusca)
+            term_query = term_query.where(
+                exists().where(
+                    other.id_caminhao == term_table.id_caminhao,
+                    other.termo.like(f"{term}%"),
+                )
+            )
+        candidates.append(term_query)
+
+    if not candidates:
+        return [], False
+
+    matches = union_all(*candidates).subquery()
+    best = (
+        select(matches.c.id_caminhao, func.min(matches.c.rank).label("rank"))
+        .group_by(matches.c.id_caminhao)
+        .subquery()
+    )
+
+    offset = (page - 1) * page_size
+    rows = (
+        db.session.query(Caminhao, best.c.rank)
+        .join(best, best.c.id_caminhao == Caminhao.id_caminhao)
+        # to_dict() lê o condutor: carrega os da página numa consulta só
+        .options(selectinload(Caminhao.condutor))
+        .order_by(best.c.rank, Caminhao.placa)
+        .offset(offset)
+        .limit(page_size + 1)
+        .all()
+    )
+
+    has_more = len(rows) > page_size
+    return rows[:page_size], has_more
+
+
+def matched_on(rank):
+    return _MATCHED_ON.get(rank)
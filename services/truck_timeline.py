@@ -0,0 +1,209 @@
+# backend/services/truck_timeline.py
+"""
+Linha do tempo de um caminhão (GET /trucks/<id>/timeline): manutenções,
+notificações e início/fim de vínculos com motoristas, intercalados por data,
+mais recentes primeiro.
+
+Cada fonte é um gerador que lê a sua tabela em páginas por keyset
+(data desc, id desc) só quando precisa de mais itens; heapq.merge intercala os
+geradores sem carregar nenhuma fonte inteira. Para uma página de N itens, cada
+fonte lê no máximo N + 1 linhas (mais as repetidas do fan-out de notificações).
+
+A ordem total é (data, fonte, id). O cursor guarda a posição do último item
+entregue nessa ordem e cada fonte deriva dela o seu próprio ponto de retomada.
+"""
+
+import base64
+import binascii
+import heapq
+import json
+from datetime import datetime, time
+from itertools import groupby
+
+from sqlalchemy import and_, or_, select
+
+from database import db
+from models import CaminhaoCondutor, Condutor, EventoNotificacao, Manutencao, Notificacao
+from services.notification_feed import events_mode
+
+# Desempate entre fontes na mesma data (maior sai primeiro): no mesmo dia, o
+# início de um vínculo aparece acima do fim do anterior
+DRIVER_UNASSIGNED = 0
+DRIVER_ASSIGNED = 1
+MAINTENANCE = 2
+NOTIFICATION = 3
+
+
+# --- Cursor ------------------------------------------------------------------
+def encode_cursor(key):
+    moment, source, item_id = key
+    payload = json.dumps({"t": moment.isoformat(), "s": source, "id": item_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(value):
+    """Cursor -> (datetime, fonte, id). ValueError se inválido."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)))
+        return datetime.fromisoformat(payload["t"]), int(payload["s"]), int(payload["id"])
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError) as exc:
+        raise ValueError("cursor inválido") from exc
+
+
+# --- Fontes ------------------------------------------------------------------
+def _moment(value):
+    return value if isinstance(value, datetime) else datetime.combine(value, time.min)
+
+
+def _before(sort_column, id_column, source, position, is_date):
+    """Filtro "(data, fonte, id) < position" para as linhas de uma fonte."""
+    moment, position_source, position_id = position
+    if is_date and moment.time() != time.min:
+        # Coluna Date nunca empata com um horário fora da meia-noite
+        return sort_column <= moment.date()
+    bound = moment.date() if is_date else moment
+    if source < position_source:
+        return sort_column <= bound
+    if source > position_source:
+        return sort_column < bound
+    return or_(sort_column < bound, and_(sort_column == bound, id_column < position_id))
+
+
+def _keyset_rows(stmt, sort_column, id_column, source, position, page_size, is_date=False):
+    """
+    Linhas de `stmt` em (sort_column desc, id desc) depois de `position`, em
+    páginas de `page_size`, como ((data, fonte, id), row).
+    """
+    stmt = stmt.where(sort_column.isnot(None)).order_by(sort_column.desc(), id_column.desc()).limit(page_size)
+    while True:
+        page = stmt
+        if position is not None:
+            page = page.where(_before(sort_column, id_column, source, position, is_date))
+        rows = db.session.execute(page).all()
+        for row in rows:
+            position = (_moment(row.sort_value), source, row.item_id)
+            yield position, row
+        if len(rows) < page_size:
+            return
+
+
+def _maintenances(truck_id, position, page_size):
+    stmt = select(
+        Manutencao.data_manutencao.label("sort_value"),
+        Manutencao.id_manutencao.label("item_id"),
+        Manutencao.tipo,
+        Manutencao.quilometragem,
+        Manutencao.descricao,
+        Manutencao.nome_mecanico,
+    ).where(Manutencao.id_caminhao == truck_id)
+    rows = _keyset_rows(
+        stmt, Manutencao.data_manutencao, Manutencao.id_manutencao, MAINTENANCE, position, page_size, is_date=True
+    )
+    for key, row in rows:
+        yield key, {
+            "kind": "maintenance",
+            "id": row.item_id,
+            "date": row.sort_value.isoformat(),
+            "type": row.tipo,
+            "mileage": row.quilometragem,
+            "description": row.descricao,
+            "mechanicName": row.nome_mecanico,
+        }
+
+
+def _notification_item(row, recipients):
+    return {
+        "kind": "notification",
+        "id": row.item_id,
+        "date": row.sort_value.isoformat(),
+        "title": row.titulo,
+        "message": row.mensagem,
+        "type": row.tipo,
+        "recipients": recipients,
+    }
+
+
+def _same_alert(entry):
+    _, row = entry
+    return row.titulo, row.mensagem, row.sort_value.date()
+
+
+def _notifications(truck_id, position, page_size):
+    if events_mode():
+        stmt = select(
+            EventoNotificacao.data_envio.label("sort_value"),
+            EventoNotificacao.id_evento.label("item_id"),
+            EventoNotificacao.titulo,
+            EventoNotificacao.mensagem,
+            EventoNotificacao.tipo,
+        ).where(EventoNotificacao.id_caminhao == truck_id)
+        rows = _keyset_rows(
+            stmt, EventoNotificacao.data_envio, EventoNotificacao.id_evento, NOTIFICATION, position, page_size
+        )
+        for key, row in rows:
+            yield key, _notification_item(row, None)
+        return
+
+    # Modo rows: o mesmo alerta tem uma linha por destinatário, gravadas juntas.
+    # Linhas seguidas com mesmo título/mensagem no mesmo dia viram um item, com
+    # a chave da última linha do grupo (o cursor pula o grupo inteiro).
+    stmt = select(
+        Notificacao.data_envio.label("sort_value"),
+        Notificacao.id_notificacao.label("item_id"),
+        Notificacao.titulo,
+        Notificacao.mensagem,
+        Notificacao.tipo,
+    ).where(Notificacao.id_caminhao == truck_id)
+    rows = _keyset_rows(
+        stmt, Notificacao.data_envio, Notificacao.id_notificacao, NOTIFICATION, position, page_size
+    )
+    for _, group in groupby(rows, key=_same_alert):
+        group = list(group)
+        yield group[-1][0], _notification_item(group[0][1], len(group))
+
+
+def _driver_links(truck_id, position, page_size, column, source, kind):
+    stmt = (
+        select(
+            column.label("sort_value"),
+            CaminhaoCondutor.id_vinculo.label("item_id"),
+            CaminhaoCondutor.id_condutor,
+            Condutor.nome,
+        )
+        .outerjoin(Condutor, Condutor.id_condutor == CaminhaoCondutor.id_condutor)
+        .where(CaminhaoCondutor.id_caminhao == truck_id)
+    )
+    rows = _keyset_rows(stmt, column, CaminhaoCondutor.id_vinculo, source, position, page_size, is_date=True)
+    for key, row in rows:
+        yield key, {
+            "kind": kind,
+            "id": row.item_id,
+            "date": row.sort_value.isoformat(),
+            "driverId": row.id_condutor,
+            "driverName": row.nome,
+        }
+
+
+def truck_timeline(truck_id, limit=50, cursor=None):
+    """Uma página da linha do tempo: (itens, próximo cursor ou None)."""
+    position = decode_cursor(cursor) if cursor else None
+    page_size = limit + 1
+    sources = (
+        _maintenances(truck_id, position, page_size),
+        _notifications(truck_id, position, page_size),
+        _driver_links(
+            truck_id, position, page_size, CaminhaoCondutor.data_inicio, DRIVER_ASSIGNED, "driver_assigned"
+        ),
+        _driver_links(
+            truck_id, position, page_size, CaminhaoCondutor.data_fim, DRIVER_UNASSIGNED, "driver_unassigned"
+        ),
+    )
+
+    entries = []
+    for entry in heapq.merge(*sources, key=lambda entry: entry[0], reverse=True):
+        entries.append(entry)
+        if len(entries) > limit:
+            break
+
+    next_cursor = encode_cursor(entries[limit - 1][0]) if len(entries) > limit else None
+    return [item for _, item in entries[:limit]], next_cursor
@@ -0,0 +1,47 @@
+# utils/cache.py
+import threading
+import time
+
+
+class TTLCache:
+    """Cache em memória (por processo) com expiração por tempo."""
+
+    def __init__(self, ttl_seconds: float = 30, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl_seconds: float | None = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                # Descarta a entrada mais antiga para não crescer sem limite
+                oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                del self._entries[oldest]
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def get_or_set(self, key, factory, ttl_seconds: float | None = None):
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value, ttl_seconds)
+        return value
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
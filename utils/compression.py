@@ -0,0 +1,120 @@
+# utils/compression.py
+"""
+Compressão negociada (Accept-Encoding) das respostas e cache de snapshots.
+
+- init_compression(app): comprime com brotli (se o pacote `brotli` estiver
+  instalado) ou gzip as respostas JSON a partir de COMPRESSION_MIN_BYTES.
+- snapshot_response(version_key, build): para listagens cujo conteúdo só muda
+  quando a versão da coleção muda (services/collection_versions.py). Guarda o
+  JSON já serializado e cada codificação já comprimida; enquanto a versão não
+  mudar, polls repetidos não serializam nem comprimem de novo, e quem manda
+  If-None-Match recebe 304. Requisições idênticas simultâneas são coalescidas
+  (utils/singleflight.py).
+"""
+import gzip
+import hashlib
+
+from flask import Response, current_app, g, jsonify, request
+
+from utils.cache import TTLCache
+from utils.singleflight import list_queries
+
+try:
+    import brotli
+except ImportError:  # opcional: sem o pacote, só gzip
+    brotli = None
+
+_COMPRESSIBLE = ("application/json", "text/")
+
+_snapshots = TTLCache()
+
+
+def negotiate_encoding():
+    """Melhor codificação aceita pelo cliente ('br', 'gzip') ou None."""
+    accepted = request.accept_encodings
+    gzip_quality = accepted.quality("gzip")
+    if brotli is not None:
+        br_quality = accepted.quality("br")
+        if br_quality > 0 and br_quality >= gzip_quality:
+            return "br"
+    return "gzip" if gzip_quality > 0 else None
+
+
+def compress(data, encoding):
+    config = current_app.config
+    if encoding == "br":
+        return brotli.compress(data, quality=config["COMPRESSION_BROTLI_QUALITY"])
+    return gzip.compress(data, compresslevel=config["COMPRESSION_GZIP_LEVEL"], mtime=0)
+
+
+def _apply_encoding(response, data, encoding):
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+
+
+def init_compression(app):
+    _snapshots.max_entries = app.config["SNAPSHOT_CACHE_MAX_ENTRIES"]
+    if not app.config.get("COMPRESSION_ENABLED"):
+        return
+
+    min_bytes = app.config["COMPRESSION_MIN_BYTES"]
+
+    @app.after_request
+    def _compress_response(response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or not response.mimetype.startswith(_COMPRESSIBLE)
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        if response.content_length is None or response.content_length < min_bytes:
+            return response
+        encoding = negotiate_encoding()
+        if encoding:
+            _apply_encoding(response, compress(response.get_data(), encoding), encoding)
+        return response
+
+
+def _build_snapshot(cache_key, build):
+    body = current_app.json.response(build()).get_data()
+    snapshot = {"identity": body, "etag": hashlib.blake2b(body, digest_size=16).hexdigest()}
+    _snapshots.set(cache_key, snapshot, ttl_seconds=current_app.config["SNAPSHOT_CACHE_TTL"])
+    return snapshot
+
+
+def snapshot_response(version_key, build):
+    """
+    Resposta JSON de `build()` guardada por (version_key, URL). `version_key`
+    deve mudar sempre que os dados mudarem (ex.: ("trucks", versão)).
+    """
+    config = current_app.config
+    # Requisições idênticas simultâneas montam a resposta uma vez só (mesma
+    # origem de leitura: quem está fixado no primário não pega dado da réplica)
+    cache_key = (*version_key, request.full_path, g.get("db_route"))
+    label = f"list:{request.endpoint}"
+    if not config.get("SNAPSHOT_CACHE_ENABLED"):
+        return jsonify(list_queries.do(cache_key, build, label=label))
+
+    snapshot = _snapshots.get(cache_key)
+    if snapshot is None:
+        snapshot = list_queries.do(cache_key, lambda: _build_snapshot(cache_key, build), label=label)
+
+    response = Response(mimetype="application/json")
+    response.set_etag(snapshot["etag"])
+    response.vary.add("Accept-Encoding")
+    if request.if_none_match.contains(snapshot["etag"]):
+        response.status_code = 304
+        return response
+
+    body = snapshot["identity"]
+    encoding = negotiate_encoding() if config.get("COMPRESSION_ENABLED") else None
+    if encoding and len(body) >= config["COMPRESSION_MIN_BYTES"]:
+        if encoding not in snapshot:
+            snapshot[encoding] = compress(body, encoding)
+        _apply_encoding(response, snapshot[encoding], encoding)
+    else:
+        response.set_data(body)
+    return response
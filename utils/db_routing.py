@@ -0,0 +1,200 @@
+# utils/db_routing.py
+"""
+Pool de conexões configurável e roteamento de leituras para réplica.
+
+- SQLALCHEMY_ENGINE_OPTIONS é montado a partir de DB_POOL_* (ver config.py).
+- Com DATABASE_REPLICA_URL definido, cria o bind "replica". Os GET dos
+  blueprints de leitura (REPLICA_BLUEPRINTS) passam a ler dele; escritas,
+  flushes e varreduras (@primary_only) continuam no primário.
+- Read-your-writes: depois de uma escrita bem-sucedida, as leituras do
+  usuário vão para o primário por DB_REPLICA_STICKY_SECONDS. O prazo fica no
+  servidor, por usuário (tabela fixacoes_primario, no primário), então vale
+  para qualquer worker e qualquer aba/dispositivo sem mudança no cliente. O
+  usuário vem do token (Authorization: Bearer) ou do userId da requisição;
+  para requisições sem usuário, a resposta ainda traz o prazo no header
+  X-DB-Primary-Until e no cookie db_primary_until, que o cliente pode
+  reenviar. Dentro da mesma requisição, qualquer escrita também fixa o
+  restante no primário.
+"""
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+
+from utils.auth import decode_token
+
+REPLICA_BIND = "replica"
+REPLICA_BLUEPRINTS = ("trucks", "users", "maintenance", "notifications")
+PRIMARY_COOKIE = "db_primary_until"
+PRIMARY_HEADER = "X-DB-Primary-Until"
+
+_READ_METHODS = ("GET", "HEAD")
+
+
+def _is_memory_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def configure_database(app):
+    """Monta as opções do pool e o bind da réplica (chamar antes de db.init_app)."""
+    uri = app.config.get("SQLALCHEMY_DATABASE_URI")
+    options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    options.setdefault("pool_pre_ping", app.config["DB_POOL_PRE_PING"])
+    options.setdefault("pool_recycle", app.config["DB_POOL_RECYCLE"])
+    options.setdefault("query_cache_size", app.config["DB_QUERY_CACHE_SIZE"])
+    # SQLite em memória usa um pool próprio, sem tamanho/timeout
+    if uri and not _is_memory_sqlite(uri):
+        options.setdefault("pool_size", app.config["DB_POOL_SIZE"])
+        options.setdefault("max_overflow", app.config["DB_MAX_OVERFLOW"])
+        options.setdefault("pool_timeout", app.config["DB_POOL_TIMEOUT"])
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+    replica_url = app.config.get("DATABASE_REPLICA_URL")
+    if replica_url:
+        binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+        binds.setdefault(REPLICA_BIND, replica_url)
+        app.config["SQLALCHEMY_BINDS"] = binds
+
+
+def _reads_from_replica():
+    return (
+        has_request_context()
+        and g.get("db_route") == REPLICA_BIND
+        and not g.get("db_wrote")
+    )
+
+
+class RoutingSession(Session):
+    """Session que manda leituras para a réplica quando a requisição permite."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or getattr(clause, "is_dml", False):
+                # A partir da primeira escrita, o resto da requisição lê do primário
+                g.db_wrote = True
+            elif _reads_from_replica():
+                replica = self._db.engines.get(REPLICA_BIND)
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def use_primary():
+    """Força o primário dentro do bloco (ex.: varreduras que leem e depois escrevem)."""
+    if not has_request_context():
+        yield
+        return
+    previous = g.get("db_route")
+    g.db_route = None
+    try:
+        yield
+    finally:
+        g.db_route = previous
+
+
+def primary_only(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with use_primary():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _request_user_id():
+    """Usuário da requisição: o do token ou ?userId= / "userId" no corpo (None se nenhum)."""
+    auth = request.headers.get("Authorization", "")
+    if auth.startswith("Bearer "):
+        payload = decode_token(auth[len("Bearer "):])
+        if payload:
+            try:
+                return int(payload.get("sub"))
+            except (TypeError, ValueError):
+                pass
+
+    user_id = request.args.get("userId")
+    if user_id is None and request.is_json:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            user_id = data.get("userId")
+    try:
+        return int(user_id) if user_id is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _user_primary_until(user_id):
+    """Prazo gravado para o usuário (0 se nenhum). Lê do primário."""
+    from database import db
+    from models import FixacaoPrimario
+
+    deadline = db.session.execute(
+        select(FixacaoPrimario.fixado_ate).where(FixacaoPrimario.id_usuario == user_id)
+    ).scalar()
+    # Encerra a transação para não segurar a conexão do primário no resto do GET
+    db.session.rollback()
+    return deadline or 0
+
+
+def _pin_user_to_primary(user_id, deadline):
+    from database import db
+    from models import FixacaoPrimario
+    from utils.upsert import upsert_values
+
+    try:
+        upsert_values(FixacaoPrimario, {"id_usuario": user_id}, {"fixado_ate": deadline})
+        db.session.commit()
+    except SQLAlchemyError:
+        # A escrita da requisição já foi confirmada; sem o prazo, o pior caso é
+        # uma leitura atrasada pela réplica
+        db.session.rollback()
+        current_app.logger.exception("Falha ao fixar o usuário %s no primário", user_id)
+
+
+def _primary_until():
+    """Maior prazo entre o header reenviado pelo cliente e o cookie (0 se nenhum)."""
+    deadline = 0
+    for value in (request.headers.get(PRIMARY_HEADER), request.cookies.get(PRIMARY_COOKIE)):
+        try:
+            deadline = max(deadline, float(value or 0))
+        except ValueError:
+            pass
+    return deadline
+
+
+def init_replica_routing(app):
+    """Registra os hooks de roteamento; sem réplica configurada não faz nada."""
+    if not app.config.get("DATABASE_REPLICA_URL"):
+        return
+
+    sticky_seconds = app.config["DB_REPLICA_STICKY_SECONDS"]
+
+    @app.before_request
+    def _route_reads_to_replica():
+        if request.method not in _READ_METHODS or request.blueprint not in REPLICA_BLUEPRINTS:
+            return
+        now = time.time()
+        if _primary_until() >= now:
+            return
+        user_id = _request_user_id()
+        if user_id is not None and _user_primary_until(user_id) >= now:
+            return
+        g.db_route = REPLICA_BIND
+
+    @app.after_request
+    def _mark_recent_write(response):
+        if request.method not in _READ_METHODS and request.method != "OPTIONS" and response.status_code < 400:
+            deadline = int(time.time() + sticky_seconds)
+            user_id = _request_user_id()
+            if user_id is not None:
+                _pin_user_to_primary(user_id, deadline)
+            response.headers[PRIMARY_HEADER] = str(deadline)
+            response.set_cookie(PRIMARY_COOKIE, str(deadline), max_age=sticky_seconds, httponly=True)
+        return response
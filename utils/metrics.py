@@ -0,0 +1,222 @@
+# utils/metrics.py
+"""
+Métricas no formato Prometheus, expostas em GET /metrics.
+
+Com gunicorn (vários processos) defina PROMETHEUS_MULTIPROC_DIR para um
+diretório vazio e gravável ANTES de subir os workers: cada processo grava seus
+valores ali e o /metrics agrega todos (ver gunicorn.conf.py).
+"""
+import os
+import time
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.pool import QueuePool
+
+from database import db
+
+REQUEST_COUNT = Counter(
+    "http_requests_total",
+    "Requisições HTTP atendidas",
+    ["blueprint", "endpoint", "method", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP",
+    ["blueprint", "endpoint", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Conexões retiradas do pool")
+# Por bind ("primary", "replica"): cada engine tem o seu pool
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Conexões em uso no momento", ["bind"], multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Conexões além de pool_size abertas no momento", ["bind"], multiprocess_mode="livesum"
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Tempo esperando uma conexão livre no pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+
+DB_STATEMENT_CACHE = Counter(
+    "db_statement_cache_total",
+    "Statements executados por resultado no cache de compilação do SQLAlchemy",
+    ["result"],
+)
+
+SWEEP_DURATION = Histogram(
+    "truck_sweep_duration_seconds",
+    "Duração da varredura de status dos caminhões",
+    ["sweep"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+SWEEP_TRANSITIONS = Counter(
+    "truck_sweep_transitions_total",
+    "Mudanças de status aplicadas pela varredura",
+    ["sweep", "status"],
+)
+
+NOTIFICATIONS_INSERTED = Counter(
+    "notifications_inserted_total", "Notificações gravadas", ["source"]
+)
+NOTIFICATIONS_DIGESTED = Counter(
+    "notifications_digested_total",
+    "Alertas agregados em um resumo diário já existente (sem nova linha)",
+    ["source"],
+)
+NOTIFICATIONS_DEDUPLICATED = Counter(
+    "notifications_deduplicated_total",
+    "Notificações descartadas por já existir uma igual não lida",
+    ["source"],
+)
+
+SINGLEFLIGHT_CALLS = Counter(
+    "singleflight_calls_total",
+    "Chamadas coalescidas por chave: 'leader' executou, 'follower' reaproveitou",
+    ["key", "role"],
+)
+SINGLEFLIGHT_IN_FLIGHT = Gauge(
+    "singleflight_in_flight",
+    "Chamadas executando ou esperando por chave no momento",
+    ["key"],
+    multiprocess_mode="livesum",
+)
+SINGLEFLIGHT_WAIT = Histogram(
+    "singleflight_follower_wait_seconds",
+    "Quanto os seguidores esperaram pelo resultado do líder",
+    ["key"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+EMAIL_SEND_LATENCY = Histogram(
+    "email_send_duration_seconds",
+    "Latência do envio de e-mail via SMTP",
+    ["outcome"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que mede quanto tempo cada checkout esperou por conexão."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - started)
+
+
+def configure_pool_metrics(app):
+    """Usa o pool instrumentado (exceto SQLite em memória, que tem pool próprio)."""
+    uri = app.config.get("SQLALCHEMY_DATABASE_URI")
+    if not uri:
+        return
+    url = make_url(uri)
+    if url.get_backend_name() != "sqlite" or url.database not in (None, "", ":memory:"):
+        options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+        options.setdefault("poolclass", InstrumentedQueuePool)
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+
+def _observe_pool(engine, bind):
+    def update_gauges(pool):
+        if isinstance(pool, QueuePool):
+            DB_POOL_CHECKED_OUT.labels(bind).set(pool.checkedout())
+            DB_POOL_OVERFLOW.labels(bind).set(max(0, pool.overflow()))
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.inc()
+        update_gauges(engine.pool)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        update_gauges(engine.pool)
+
+
+def _observe_statement_cache(engine):
+    """Hit rate = hit / soma; 'miss' alto indica statements montados a cada chamada."""
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _on_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is None or context.compiled is None:
+            result = "raw"
+        elif isinstance(context.cache_hit, CacheStats):
+            result = context.cache_hit.name.lower()
+        else:
+            result = "unknown"
+        DB_STATEMENT_CACHE.labels(result).inc()
+
+
+def _registry():
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    from prometheus_client import REGISTRY
+
+    return REGISTRY
+
+
+def init_metrics(app):
+    """Registra os hooks de requisição, do pool e a rota /metrics."""
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            _observe_pool(engine, bind or "primary")
+            _observe_statement_cache(engine)
+
+    @app.before_request
+    def _metrics_start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _metrics_record(response):
+        started = g.get("metrics_started")
+        blueprint = request.blueprint or ""
+        endpoint = request.endpoint or "unmatched"
+        REQUEST_COUNT.labels(blueprint, endpoint, request.method, str(response.status_code)).inc()
+        if started is not None:
+            REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(
+                time.perf_counter() - started
+            )
+        return response
+
+    def metrics():
+        return Response(generate_latest(_registry()), mimetype=CONTENT_TYPE_LATEST)
+
+    app.add_url_rule("/metrics", "metrics", metrics, methods=["GET"])
+
+
+def record_sweep(name, started, transitions):
+    """
+    Registra uma varredura de status: duração desde `started`
+    (time.perf_counter()) e as transições aplicadas ({status_novo: quantidade}).
+    """
+    SWEEP_DURATION.labels(name).observe(time.perf_counter() - started)
+    for status, count in transitions.items():
+        if count:
+            SWEEP_TRANSITIONS.labels(name, status).inc(count)
+
+
+def record_notifications(source, inserted=0, deduplicated=0, digested=0):
+    if inserted:
+        NOTIFICATIONS_INSERTED.labels(source).inc(inserted)
+    if digested:
+        NOTIFICATIONS_DIGESTED.labels(source).inc(digested)
+    if deduplicated:
+        NOTIFICATIONS_DEDUPLICATED.labels(source).inc(deduplicated)
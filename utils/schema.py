@@ -0,0 +1,44 @@
+# utils/schema.py
+from sqlalchemy import inspect, text
+from database import db
+
+
+def sync_schema():
+    """
+    Cria tabelas, colunas (anuláveis) e índices declarados nos models que ainda
+    não existem no banco. Não altera nem remove nada que já exista.
+    Retorna a lista do que foi criado (para log no comando de CLI).
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            table.create(bind=engine)
+            created.append(f"tabela {table.name}")
+            continue
+
+        existing_columns = {col["name"] for col in inspector.get_columns(table.name)}
+        preparer = engine.dialect.identifier_preparer
+        for column in table.columns:
+            if column.name in existing_columns or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {preparer.format_table(table)} "
+                        f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+                    )
+                )
+            created.append(f"coluna {table.name}.{column.name}")
+
+        existing_indexes = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(bind=engine)
+                created.append(f"índice {index.name}")
+
+    return created
@@ -0,0 +1,96 @@
+# utils/singleflight.py
+"""
+Single-flight: chamadas idênticas simultâneas (mesma chave) dentro do processo
+rodam uma vez só; quem chega enquanto a primeira está em andamento espera e
+recebe o mesmo resultado (ou a mesma exceção).
+
+Métricas por chave em utils/metrics.py: chamadas como líder/seguidor, quantas
+estão esperando/executando agora e quanto os seguidores esperaram.
+"""
+import threading
+import time
+from functools import wraps
+
+from utils.metrics import SINGLEFLIGHT_CALLS, SINGLEFLIGHT_IN_FLIGHT, SINGLEFLIGHT_WAIT
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, label=None, fresh=False):
+        """
+        Executa `func()` uma vez por chave em andamento. `label` é o nome usado
+        nas métricas (padrão: a própria chave; use algo de cardinalidade baixa).
+
+        fresh=True é para quem acabou de escrever: uma execução que já estava em
+        andamento pode ter começado antes da escrita, então espera ela terminar e
+        só então entra (ou inicia) a próxima.
+        """
+        label = str(key) if label is None else label
+        SINGLEFLIGHT_IN_FLIGHT.labels(label).inc()
+        try:
+            while True:
+                with self._lock:
+                    call = self._calls.get(key)
+                    if call is None:
+                        call = self._calls[key] = _Call()
+                        leader = True
+                        break
+                    if not fresh:
+                        leader = False
+                        break
+                call.done.wait()
+                fresh = False
+
+            if leader:
+                SINGLEFLIGHT_CALLS.labels(label, "leader").inc()
+                try:
+                    call.result = func()
+                except BaseException as exc:
+                    call.error = exc
+                finally:
+                    with self._lock:
+                        del self._calls[key]
+                    call.done.set()
+            else:
+                SINGLEFLIGHT_CALLS.labels(label, "follower").inc()
+                started = time.perf_counter()
+                call.done.wait()
+                SINGLEFLIGHT_WAIT.labels(label).observe(time.perf_counter() - started)
+        finally:
+            SINGLEFLIGHT_IN_FLIGHT.labels(label).dec()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def wrap(self, key):
+        """
+        Decorator para funções SEM argumentos (ex.: varreduras). Quem chama pode
+        passar fresh=True logo depois de uma escrita (ver `do`).
+        """
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(fresh=False):
+                return self.do(key, func, fresh=fresh)
+
+            return wrapper
+
+        return decorator
+
+
+# Varreduras de status e listagens idênticas em andamento no processo
+sweeps = SingleFlight()
+list_queries = SingleFlight()
@@ -0,0 +1,123 @@
+# utils/sql_instrumentation.py
+import heapq
+import json
+import logging
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from database import db
+
+logger = logging.getLogger("sql")
+
+_STATEMENT_PREVIEW = 300
+
+
+def _preview(statement):
+    statement = " ".join(statement.split())
+    return statement[:_STATEMENT_PREVIEW]
+
+
+def init_sql_instrumentation(app):
+    """
+    Conta, por requisição, quantos statements SQL rodaram, o tempo total no banco
+    e os mais lentos; devolve isso no header Server-Timing e numa linha de log
+    JSON. Statements acima de SLOW_QUERY_MS vão para o log de queries lentas.
+
+    Desligado (SQL_INSTRUMENTATION_ENABLED=false) nenhum listener é registrado,
+    então não há custo algum por query.
+    """
+    if not app.config.get("SQL_INSTRUMENTATION_ENABLED"):
+        return
+
+    slow_ms = app.config.get("SLOW_QUERY_MS", 200)
+    top_n = app.config.get("SQL_TOP_STATEMENTS", 3)
+
+    with app.app_context():
+        engines = list(db.engines.values())
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+
+        endpoint = None
+        if has_request_context():
+            endpoint = request.endpoint
+            stats = g.get("sql_stats")
+            if stats is None:
+                stats = g.sql_stats = {"count": 0, "total_ms": 0.0, "slowest": []}
+            stats["count"] += 1
+            stats["total_ms"] += elapsed_ms
+            entry = (elapsed_ms, stats["count"], statement)
+            if len(stats["slowest"]) < top_n:
+                heapq.heappush(stats["slowest"], entry)
+            else:
+                heapq.heappushpop(stats["slowest"], entry)
+
+        if elapsed_ms >= slow_ms:
+            logger.warning(
+                json.dumps(
+                    {
+                        "event": "slow_query",
+                        "route": endpoint or "background",
+                        "ms": round(elapsed_ms, 2),
+                        "statement": _preview(statement),
+                    },
+                    ensure_ascii=False,
+                )
+            )
+
+    def handle_error(context):
+        # Statement que falhou não chega no after_cursor_execute: descarta o
+        # início dele, senão a pilha cresce e desalinha os próximos tempos
+        conn = context.connection
+        if conn is not None and context.execution_context is not None:
+            starts = conn.info.get("query_start")
+            if starts:
+                starts.pop()
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+        event.listen(engine, "handle_error", handle_error)
+
+    @app.before_request
+    def _start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _emit_sql_stats(response):
+        stats = g.get("sql_stats") or {"count": 0, "total_ms": 0.0, "slowest": []}
+        started = g.get("request_started")
+        total_ms = (time.perf_counter() - started) * 1000 if started else None
+
+        timing = f'db;dur={stats["total_ms"]:.2f};desc="{stats["count"]} queries"'
+        if total_ms is not None:
+            timing += f", app;dur={total_ms:.2f}"
+        existing = response.headers.get("Server-Timing")
+        response.headers["Server-Timing"] = f"{existing}, {timing}" if existing else timing
+
+        slowest = sorted(stats["slowest"], reverse=True)
+        logger.info(
+            json.dumps(
+                {
+                    "event": "request_sql",
+                    "method": request.method,
+                    "path": request.path,
+                    "route": request.endpoint,
+                    "status": response.status_code,
+                    "queries": stats["count"],
+                    "db_ms": round(stats["total_ms"], 2),
+                    "total_ms": round(total_ms, 2) if total_ms is not None else None,
+                    "slowest": [
+                        {"ms": round(ms, 2), "statement": _preview(sql)}
+                        for ms, _, sql in slowest
+                    ],
+                },
+                ensure_ascii=False,
+            )
+        )
+        return response
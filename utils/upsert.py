@@ -0,0 +1,117 @@
+# utils/upsert.py
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+
+from database import db
+
+
+def upsert_increment(model, keys, deltas):
+    """
+    UPSERT somando `deltas` na linha identificada por `keys`, dentro da
+    transação atual (commit fica por conta de quem chamou).
+    """
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+        stmt = mysql_insert(table).values(**keys, **deltas)
+        stmt = stmt.on_duplicate_key_update(
+            {col: table.c[col] + delta for col, delta in deltas.items()}
+        )
+        db.session.execute(stmt)
+        return
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        stmt = dialect_insert(table).values(**keys, **deltas)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={col: table.c[col] + delta for col, delta in deltas.items()},
+        )
+        db.session.execute(stmt)
+        return
+
+    # Fallback genérico: UPDATE e, se não havia linha, INSERT
+    result = db.session.execute(
+        update(table)
+        .where(*[table.c[col] == value for col, value in keys.items()])
+        .values({col: table.c[col] + delta for col, delta in deltas.items()})
+    )
+    if result.rowcount == 0:
+        db.session.execute(insert(table).values(**keys, **deltas))
+
+
+def upsert_values(model, keys, values):
+    """
+    UPSERT gravando `values` (sobrescreve) na linha identificada por `keys`,
+    dentro da transação atual.
+    """
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+        stmt = mysql_insert(table).values(**keys, **values)
+        db.session.execute(stmt.on_duplicate_key_update(values))
+        return
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        stmt = dialect_insert(table).values(**keys, **values)
+        db.session.execute(stmt.on_conflict_do_update(index_elements=list(keys), set_=values))
+        return
+
+    result = db.session.execute(
+        update(table).where(*[table.c[col] == value for col, value in keys.items()]).values(values)
+    )
+    if result.rowcount == 0:
+        db.session.execute(insert(table).values(**keys, **values))
+
+
+def insert_missing(model, rows):
+    """
+    INSERT das `rows` ignorando as que já existem (mesma chave única), dentro
+    da transação atual. Não lê nem trava nada antes: serve para garantir que
+    as linhas existem e só então travá-las com SELECT ... FOR UPDATE.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+
+        # Atualização sem efeito em vez de INSERT IGNORE, que também engoliria
+        # outros erros (FK, truncamento)
+        column = next(iter(rows[0]))
+        stmt = mysql_insert(table).values(rows)
+        db.session.execute(stmt.on_duplicate_key_update({column: table.c[column]}))
+        return
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        db.session.execute(dialect_insert(table).values(rows).on_conflict_do_nothing())
+        return
+
+    for row in rows:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(table).values(**row))
+        except IntegrityError:
+            pass
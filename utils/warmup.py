@@ -0,0 +1,100 @@
+# utils/warmup.py
+"""
+Aquecimento do app para o primeiro request não pagar o custo de inicialização.
+
+- warm_up_app(app): configura os mappers, faz um GET interno em cada rota
+  de WARMUP_PATHS e executa direto os statements das listagens, o que
+  compila (e guarda no cache do engine) os statements quentes. Com `gunicorn --preload` roda uma vez no master, antes do fork, e
+  os workers herdam tudo pronto.
+
+  As listagens ficam fora de WARMUP_PATHS: GET /trucks/ e /notifications/
+  rodam as varreduras de status (o aquecimento não pode escrever nada a cada
+  deploy/restart) e todas elas leem e serializam a tabela inteira. Os
+  statements delas rodam direto com LIMIT 0, que o banco responde sem ler
+  nenhuma linha.
+- warm_up_worker(app): já dentro do worker, descarta as conexões herdadas do
+  master e abre as conexões do pool antes de aceitar tráfego.
+"""
+import time
+
+from sqlalchemy.orm import configure_mappers
+from sqlalchemy.pool import QueuePool
+
+from database import db
+
+
+def _ms(started):
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def warm_up_app(app):
+    """Configura mappers e compila os statements das rotas quentes. Devolve os tempos."""
+    report = {"event": "warmup"}
+
+    started = time.perf_counter()
+    configure_mappers()
+    report["configure_mappers_ms"] = _ms(started)
+
+    paths = {}
+    client = app.test_client()
+    for path in app.config.get("WARMUP_PATHS") or ():
+        started = time.perf_counter()
+        response = client.get(path)
+        paths[path] = {"status": response.status_code, "ms": _ms(started)}
+    report["paths"] = paths
+
+    started = time.perf_counter()
+    with app.app_context():
+        report["statements"] = _warm_list_statements()
+    report["statements_ms"] = _ms(started)
+
+    # Conexões abertas aqui não podem ser compartilhadas com processos filhos
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+    return report
+
+
+def _warm_list_statements():
+    """
+    Executa as consultas das listagens (sem as varreduras), montadas como nas
+    rotas, com LIMIT 0: prepara mappers, statements cacheados dos read models e
+    conexão sem ler nenhuma linha.
+    """
+    from models import Caminhao, Manutencao, Usuario
+    from routes.notification_routes import notification_list_statement
+    from services.read_models import MAINTENANCES, NOTIFICATIONS, TRUCKS, USERS
+
+    statements = [
+        (TRUCKS.select(tuple(TRUCKS.fields)).order_by(Caminhao.id_caminhao.desc()), {}),
+        (MAINTENANCES.select(tuple(MAINTENANCES.fields)).order_by(Manutencao.id_manutencao), {}),
+        (USERS.select(tuple(USERS.fields)).order_by(Usuario.id_usuario), {}),
+        (notification_list_statement(tuple(NOTIFICATIONS.fields), "all"), {}),
+        (notification_list_statement(tuple(NOTIFICATIONS.fields), "user"), {"user_id": 0}),
+        (notification_list_statement(tuple(NOTIFICATIONS.fields), "driver"), {"user_id": 0, "truck_ids": [0]}),
+    ]
+    try:
+        for stmt, params in statements:
+            db.session.execute(stmt.limit(0), params).close()
+    finally:
+        db.session.rollback()
+    return len(statements)
+
+
+def warm_up_worker(app):
+    """Abre as conexões do pool deste processo (chamar depois do fork)."""
+    report = {"event": "warmup_worker", "connections": 0}
+    started = time.perf_counter()
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False: não fecha os sockets que ainda pertencem ao master
+            engine.dispose(close=False)
+            if not isinstance(engine.pool, QueuePool):
+                continue
+            connections = [engine.connect() for _ in range(engine.pool.size())]
+            for connection in connections:
+                connection.close()
+            report["connections"] += len(connections)
+    report["ms"] = _ms(started)
+    return report